@@ -12,7 +12,10 @@
     'installable': True,
     'auto_install': False,
 
-    'depends': ['base', 'fleet', 'hr'],
+    'depends': ['base', 'bus', 'fleet', 'hr'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
 
     'price':59.99 ,
     'currency': 'USD',
@@ -80,6 +83,7 @@ Location: Cairo / Riyadh Timezone
     'data': [
         'security/tamm_security.xml',
         'security/ir.model.access.csv',
+        'data/tamm_config_parameter.xml',
         'data/tamm_cron.xml',
         'data/tamm_sequence.xml',
         'views/tamm_config_views.xml',
@@ -90,7 +94,12 @@ Location: Cairo / Riyadh Timezone
         'views/tamm_driver_views.xml',
         'views/tamm_route_views.xml',
         'views/tamm_alert_views.xml',
+        'views/tamm_geofence_views.xml',
+        'views/tamm_gazetteer_views.xml',
         'views/tamm_report_views.xml',
+        'views/tamm_tracking_rollup_views.xml',
+        'views/tamm_sync_cursor_views.xml',
+        'views/tamm_sync_run_views.xml',
         'views/tamm_dashboard_views.xml',
         'views/tamm_menu_views.xml',
     ],
@@ -100,6 +109,8 @@ Location: Cairo / Riyadh Timezone
             'Tamm_Integrations/static/src/css/tamm_dashboard.css',
             'Tamm_Integrations/static/src/js/tamm_dashboard.js',
             'Tamm_Integrations/static/src/xml/tamm_dashboard.xml',
+            'Tamm_Integrations/static/src/js/tamm_map.js',
+            'Tamm_Integrations/static/src/xml/tamm_map.xml',
         ],
     },
 
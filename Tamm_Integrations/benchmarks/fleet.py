@@ -0,0 +1,212 @@
+# benchmarks/fleet.py
+"""Deterministic synthetic fleet served by the mock Tamm server.
+
+Every record is computed from (seed, vehicle index, stream, record index),
+so fleets of any size cost no memory and the benchmark runner can rebuild
+the same fleet on the Odoo side from the same parameters.
+
+Run directly to dump a fleet as JSON::
+
+    python fleet.py --vehicles 10 --history 50 > fleet.json
+"""
+import argparse
+import bisect
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Vehicles drive loops around these centres (Riyadh, Jeddah, Dammam)
+CENTRES = [(24.7136, 46.6753), (21.4858, 39.1925), (26.4207, 50.0888)]
+
+# Seconds between two location fixes of a vehicle
+FIX_INTERVAL = 30
+
+ALERT_TYPES = ['speeding', 'harsh_braking', 'harsh_acceleration', 'engine_fault',
+               'low_fuel', 'maintenance_due', 'theft', 'accident']
+SEVERITIES = ['low', 'medium', 'high', 'critical']
+FUEL_TYPES = ['gasoline_91', 'gasoline_95', 'diesel']
+MAINTENANCE_TYPES = ['oil_change', 'tire_rotation', 'tire_replacement', 'brake_service',
+                     'battery_replacement', 'inspection', 'repair', 'cleaning']
+
+# Payload key and time key of every paginated stream
+STREAMS = {
+    'fuel': ('fuel_logs', 'date'),
+    'maintenance': ('maintenance_records', 'date'),
+    'alerts': ('alerts', 'timestamp'),
+}
+
+
+def tamm_vehicle_id(index):
+    return f'BENCH-{index:06d}'
+
+
+def vehicle_index(tamm_id):
+    """Index of a vehicle from its Tamm ID, None if it is not a fleet vehicle"""
+    prefix, _sep, number = tamm_id.partition('-')
+    if prefix != 'BENCH' or not number.isdigit():
+        return None
+    return int(number)
+
+
+class Stream:
+    """History of one stream of one vehicle, in time order.
+
+    Record ``j`` falls in the ``j``-th of ``history`` equal slots of the
+    ``days`` ending at ``end``, so records are sorted by time and can be
+    searched without being built.
+    """
+
+    def __init__(self, fleet, index, stream):
+        self.fleet = fleet
+        self.index = index
+        self.stream = stream
+        self.step = fleet.days * 86400 / max(fleet.history, 1)
+        self.start = fleet.end - timedelta(days=fleet.days)
+
+    def __len__(self):
+        return self.fleet.history
+
+    def _rng(self, j):
+        return random.Random(f'{self.fleet.seed}:{self.index}:{self.stream}:{j}')
+
+    def time(self, j):
+        offset = (j + self._rng(j).random()) * self.step
+        return (self.start + timedelta(seconds=int(offset))).strftime(DATE_FORMAT)
+
+    def __getitem__(self, j):
+        # Value of the record's cursor key; maintenance records carry a date only
+        stamp = self.time(j)
+        return stamp[:10] if self.stream == 'maintenance' else stamp
+
+    def after(self, since):
+        """Index of the first record strictly newer than ``since``"""
+        return bisect.bisect_right(self, since) if since else 0
+
+    def record(self, j):
+        rng = self._rng(j)
+        rng.random()  # consumed by time()
+        stamp = self.time(j)
+        padding = 'x' * self.fleet.padding
+        if self.stream == 'fuel':
+            quantity = round(rng.uniform(20, 80), 2)
+            return {
+                'date': stamp,
+                'quantity': quantity,
+                'price_per_liter': round(rng.uniform(2.1, 2.4), 2),
+                'odometer': round(1000 + j * 120 + rng.uniform(0, 50), 1),
+                'station_name': f'Station {rng.randint(1, 500)}',
+                'invoice_reference': f'INV-{self.index}-{j}',
+                'fuel_type': rng.choice(FUEL_TYPES),
+                'notes': padding,
+            }
+        if self.stream == 'maintenance':
+            kind = rng.choice(MAINTENANCE_TYPES)
+            return {
+                'name': kind.replace('_', ' ').title(),
+                'type': kind,
+                'date': stamp[:10],
+                'due_date': stamp[:10],
+                'odometer': round(1000 + j * 500, 1),
+                'cost': round(rng.uniform(100, 3000), 2),
+                'state': 'completed',
+                'service_center': f'Center {rng.randint(1, 50)}',
+                'notes': padding,
+            }
+        latitude, longitude = self.fleet.position(self.index, j)
+        return {
+            'timestamp': stamp,
+            'alert_type': rng.choice(ALERT_TYPES),
+            'severity': rng.choice(SEVERITIES),
+            'description': f'Synthetic alert {j}{padding}',
+            'latitude': latitude,
+            'longitude': longitude,
+            'address': '',
+        }
+
+
+class Fleet:
+    """``vehicles`` vehicles with ``history`` records per stream over ``days``"""
+
+    def __init__(self, vehicles=100, history=100, days=30, seed=0, padding=0, end=None):
+        self.vehicles = vehicles
+        self.history = history
+        self.days = days
+        self.seed = seed
+        self.padding = padding
+        self.end = (end or datetime.utcnow()).replace(microsecond=0)
+
+    def __contains__(self, index):
+        return index is not None and 0 < index <= self.vehicles
+
+    def vehicle(self, index):
+        """Values to create the fleet.vehicle of a fleet vehicle"""
+        return {
+            'tamm_vehicle_id': tamm_vehicle_id(index),
+            'name': f'Bench Vehicle {index}',
+            'license_plate': f'BEN {index:06d}',
+        }
+
+    def stream(self, index, stream):
+        return Stream(self, index, stream)
+
+    def position(self, index, fix):
+        """Latitude and longitude of fix number ``fix`` of a vehicle"""
+        rng = random.Random(f'{self.seed}:{index}:loop')
+        centre_lat, centre_lon = CENTRES[index % len(CENTRES)]
+        radius = rng.uniform(0.01, 0.15)
+        phase = rng.uniform(0, 2 * math.pi)
+        # One loop every 2 to 6 hours
+        angle = phase + 2 * math.pi * fix * FIX_INTERVAL / rng.uniform(7200, 21600)
+        return (round(centre_lat + radius * math.sin(angle), 6),
+                round(centre_lon + radius * math.cos(angle) / math.cos(math.radians(centre_lat)), 6))
+
+    def location(self, index, fix, when):
+        """Location payload of fix number ``fix`` of a vehicle, taken at ``when``"""
+        rng = random.Random(f'{self.seed}:{index}:fix:{fix}')
+        latitude, longitude = self.position(index, fix)
+        previous = self.position(index, fix - 1)
+        moving = rng.random() < 0.8
+        return {
+            'timestamp': when.strftime(DATE_FORMAT),
+            'latitude': latitude,
+            'longitude': longitude,
+            'speed': round(rng.uniform(20, 110), 1) if moving else 0.0,
+            'heading': round(math.degrees(math.atan2(longitude - previous[1],
+                                                     latitude - previous[0])) % 360, 1),
+            'altitude': round(rng.uniform(500, 700), 1),
+            'engine_status': 'on' if moving else 'off',
+            'address': '',
+        }
+
+    def to_dict(self):
+        vehicles = []
+        for index in range(1, self.vehicles + 1):
+            vehicle = self.vehicle(index)
+            for stream, (key, _time_key) in STREAMS.items():
+                history = self.stream(index, stream)
+                vehicle[key] = [history.record(j) for j in range(len(history))]
+            vehicles.append(vehicle)
+        return {'seed': self.seed, 'days': self.days, 'vehicles': vehicles}
+
+
+def add_arguments(parser):
+    parser.add_argument('--vehicles', type=int, default=100, help='fleet size')
+    parser.add_argument('--history', type=int, default=100,
+                        help='fuel, maintenance and alert records per vehicle')
+    parser.add_argument('--days', type=int, default=30, help='days covered by the history')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--padding', type=int, default=0,
+                        help='extra characters per record, to grow payloads')
+
+
+def from_arguments(args):
+    return Fleet(args.vehicles, args.history, args.days, args.seed, args.padding)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dump a synthetic Tamm fleet as JSON')
+    add_arguments(parser)
+    print(json.dumps(from_arguments(parser.parse_args()).to_dict(), indent=1))
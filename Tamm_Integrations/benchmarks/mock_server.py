@@ -0,0 +1,149 @@
+# benchmarks/mock_server.py
+"""Standalone mock of the Tamm API endpoints used by the integration.
+
+Serves ``/api/v1/health`` and ``/api/v1/vehicles/<id>/<stream>`` for the
+synthetic fleet of ``fleet.py``, with configurable latency, page size and
+error rates::
+
+    python mock_server.py --vehicles 500 --history 200 --latency 80 --error-rate 0.01
+
+Every location request returns the next fix of the vehicle. Fuel,
+maintenance and alerts honour the ``since`` and ``cursor`` parameters the
+integration sends and return ``next_cursor`` while pages remain.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import fleet as synthetic
+
+
+class MockTamm:
+    """Request handling state shared by the server threads"""
+
+    def __init__(self, fleet, latency=0.0, jitter=0.0, page_size=100, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, seed=0):
+        self.fleet = fleet
+        self.latency = latency / 1000.0
+        self.jitter = jitter / 1000.0
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.fixes = {}
+        self.counters = {'requests': 0, 'errors': 0, 'throttled': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def draw(self):
+        with self.lock:
+            return self.random.random(), self.random.gauss(0.0, 1.0)
+
+    def next_fix(self, index):
+        with self.lock:
+            fix = self.fixes[index] = self.fixes.get(index, 0) + 1
+        return fix
+
+    def handle(self, path, query):
+        """Return (status, headers, body) of a GET request"""
+        self.count('requests')
+        chance, noise = self.draw()
+        delay = max(self.latency + noise * self.jitter, 0.0)
+        if delay:
+            time.sleep(delay)
+
+        parts = [part for part in path.split('/') if part]
+        if parts == ['api', 'v1', 'health']:
+            return 200, {}, {'status': 'ok', 'time': datetime.utcnow().strftime(synthetic.DATE_FORMAT)}
+
+        if chance < self.throttle_rate:
+            self.count('throttled')
+            return 429, {'Retry-After': str(self.retry_after)}, {'error': 'rate limited'}
+        if chance < self.throttle_rate + self.error_rate:
+            self.count('errors')
+            return 503, {}, {'error': 'unavailable'}
+
+        if len(parts) != 5 or parts[:3] != ['api', 'v1', 'vehicles']:
+            return 404, {}, {'error': 'not found'}
+        index = synthetic.vehicle_index(parts[3])
+        if index not in self.fleet:
+            return 404, {}, {'error': f'unknown vehicle {parts[3]}'}
+
+        stream = parts[4]
+        if stream == 'location':
+            return 200, {}, self.fleet.location(index, self.next_fix(index), datetime.utcnow())
+        if stream not in synthetic.STREAMS:
+            return 404, {}, {'error': f'unknown stream {stream}'}
+
+        key, _time_key = synthetic.STREAMS[stream]
+        history = self.fleet.stream(index, stream)
+        cursor = query.get('cursor', [None])[0]
+        start = int(cursor) if cursor and cursor.isdigit() else history.after(query.get('since', [None])[0])
+        end = min(start + self.page_size, len(history))
+        return 200, {}, {
+            key: [history.record(j) for j in range(start, end)],
+            'next_cursor': str(end) if end < len(history) else None,
+        }
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, headers, body = mock.handle(url.path, parse_qs(url.query))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Tamm API server')
+    synthetic.add_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=50.0, help='mean response time in ms')
+    parser.add_argument('--jitter', type=float, default=10.0, help='response time deviation in ms')
+    parser.add_argument('--page-size', type=int, default=100, help='records per history page')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 answers')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of 429 answers')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After of 429 answers (s)')
+    args = parser.parse_args()
+
+    mock = MockTamm(synthetic.from_arguments(args), args.latency, args.jitter, args.page_size,
+                    args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mock))
+    server.daemon_threads = True
+    print(f'Mock Tamm API on http://{args.host}:{args.port} '
+          f'({args.vehicles} vehicles, {args.history} records per stream)', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(mock.counters), flush=True)
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# benchmarks/run.py
+"""Time the integration against the mock Tamm server.
+
+Needs an Odoo 18 source tree on the Python path and a throwaway database
+with Tamm_Integrations installed: the runner archives the other Tamm
+configurations of the main company and commits everything it syncs::
+
+    python run.py -c odoo.conf -d tamm_bench --url http://127.0.0.1:8765 \\
+        --vehicles 500 --output results.json --compare baseline.json
+
+Results are written as JSON, one entry per benchmark with the time and SQL
+query count of every run, so two versions can be compared with --compare.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+from lxml import etree
+
+import fleet as synthetic
+
+import odoo
+from odoo.tools import config as odoo_config
+
+KANBAN_VIEW = 'Tamm_Integrations.view_tamm_dashboard_kanban'
+REPORT_MEASURES = ['total_distance', 'total_fuel', 'total_cost', 'fuel_efficiency']
+
+
+def setup(env, fleet, args):
+    """Create the benchmark configuration and the missing fleet vehicles"""
+    company = env.ref('base.main_company')
+    Config = env['tamm.config'].with_context(active_test=False)
+    config = Config.search([('name', '=', 'Benchmark'), ('company_id', '=', company.id)], limit=1)
+    values = {
+        'name': 'Benchmark',
+        'company_id': company.id,
+        'active': True,
+        'api_url': args.url,
+        'api_key': 'benchmark',
+        'api_secret': 'benchmark',
+        'sync_workers': args.workers,
+        'http_pool_size': args.workers,
+        'rate_limit': args.rate,
+        'rate_burst': max(int(args.rate), 1),
+    }
+    if config:
+        config.write(values)
+    else:
+        config = Config.create(values)
+    (Config.search([('company_id', '=', company.id), ('active', '=', True)]) - config).active = False
+    config.action_reset_rate_limit()
+
+    model = env['fleet.vehicle.model'].search([('name', '=', 'Benchmark')], limit=1)
+    if not model:
+        brand = env['fleet.vehicle.model.brand'].create({'name': 'Benchmark'})
+        model = env['fleet.vehicle.model'].create({'name': 'Benchmark', 'brand_id': brand.id})
+    Vehicle = env['fleet.vehicle'].with_company(company)
+    existing = set(Vehicle.search([('tamm_vehicle_id', '=like', 'BENCH-%')]).mapped('tamm_vehicle_id'))
+    Vehicle.create([
+        dict(fleet.vehicle(index), model_id=model.id, company_id=company.id)
+        for index in range(1, fleet.vehicles + 1)
+        if synthetic.tamm_vehicle_id(index) not in existing
+    ])
+    vehicles = Vehicle.search([
+        ('tamm_vehicle_id', 'in', [synthetic.tamm_vehicle_id(index)
+                                   for index in range(1, fleet.vehicles + 1)]),
+    ])
+    # Every run starts from the beginning of the history
+    env['tamm.sync.cursor'].search([('vehicle_id', 'in', vehicles.ids)]).unlink()
+    env.cr.commit()
+    return config, vehicles
+
+
+def measure(env, function, repeat, commit=False):
+    """Run ``function`` ``repeat`` times on a cold cache, return its timings"""
+    runs, queries = [], []
+    for _run in range(repeat):
+        env.invalidate_all()
+        count = env.cr.sql_log_count
+        started = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - started)
+        queries.append(env.cr.sql_log_count - count)
+        if commit:
+            env.cr.commit()
+    return {
+        'runs': runs,
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'max': max(runs),
+        'queries': statistics.median(queries),
+    }
+
+
+def run_benchmarks(env, config, vehicles, args):
+    results = {}
+
+    def sync():
+        vehicles.with_company(config.company_id).sync_with_tamm()
+
+    # The first pass downloads the first history page of every stream, the
+    # next ones the remaining pages and then only new location fixes.
+    results['sync_first_pass'] = measure(env, sync, 1, commit=True)
+    results['sync_first_pass']['report'] = config.last_sync_report
+    results['sync_next_pass'] = measure(env, sync, args.repeat, commit=True)
+    results['sync_next_pass']['report'] = config.last_sync_report
+
+    Report = env['tamm.report']
+    results['report_refresh'] = measure(env, Report._cron_refresh, 1, commit=True)
+    results['report_pivot'] = measure(env, lambda: Report.read_group(
+        [], REPORT_MEASURES, ['vehicle_id', 'date:month'], lazy=False), args.repeat)
+
+    arch = etree.fromstring(env.ref(KANBAN_VIEW).arch)
+    specification = {name: {} for name in arch.xpath('//field/@name')}
+    domain = [('id', 'in', vehicles.ids)]
+    Vehicle = env['fleet.vehicle'].with_company(config.company_id)
+    results['vehicle_kanban'] = measure(env, lambda: Vehicle.web_search_read(
+        domain, specification, limit=args.kanban_limit), args.repeat)
+    results['vehicle_kanban_all'] = measure(env, lambda: Vehicle.web_search_read(
+        domain, specification), args.repeat)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"{'benchmark':<22}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, current in results['benchmarks'].items():
+        previous = baseline['benchmarks'].get(name)
+        if not previous:
+            print(f"{name:<22}{'-':>12}{current['median']:>12.3f}{'new':>10}")
+            continue
+        change = (current['median'] - previous['median']) / previous['median'] * 100 if previous['median'] else 0.0
+        print(f"{name:<22}{previous['median']:>12.3f}{current['median']:>12.3f}{change:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Tamm_Integrations against the mock server')
+    synthetic.add_arguments(parser)
+    parser.add_argument('-c', '--config', required=True, help='Odoo configuration file')
+    parser.add_argument('-d', '--database', required=True, help='throwaway database to benchmark on')
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help='mock server URL')
+    parser.add_argument('--workers', type=int, default=8, help='sync workers and HTTP pool size')
+    parser.add_argument('--rate', type=float, default=1000.0, help='request rate limit (req/s)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark')
+    parser.add_argument('--kanban-limit', type=int, default=40, help='records per kanban page')
+    parser.add_argument('--label', help='name of the version benchmarked')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    args = parser.parse_args()
+
+    odoo_config.parse_config(['-c', args.config, '-d', args.database])
+    fleet = synthetic.from_arguments(args)
+    registry = odoo.modules.registry.Registry(args.database)
+    with registry.cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        config, vehicles = setup(env, fleet, args)
+        benchmarks = run_benchmarks(env, config, vehicles, args)
+
+    results = {
+        'label': args.label,
+        'revision': git_revision(),
+        'date': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {
+            'vehicles': args.vehicles,
+            'history': args.history,
+            'workers': args.workers,
+            'rate': args.rate,
+            'repeat': args.repeat,
+            'url': args.url,
+        },
+        'benchmarks': benchmarks,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# controllers/main.py
+from odoo import http
+from odoo.http import request
+from odoo.tools import consteq
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Largest number of records accepted in one push
+MAX_PUSH_RECORDS = 10000
+
+
+class TammWebhookController(http.Controller):
+    """Receive batched location and alert pushes from Tamm.
+
+    Tamm authenticates with the same headers the module sends to it:
+    ``Authorization: Bearer <API key>`` and ``X-API-Secret``. The body is a
+    JSON array of records, each naming its vehicle by Tamm vehicle ID in
+    ``vehicle_id``.
+    """
+
+    @http.route('/tamm/webhook/location', type='http', auth='public',
+                methods=['POST'], csrf=False, save_session=False)
+    def tamm_push_location(self, **kwargs):
+        return self._tamm_push('tamm.tracking')
+
+    @http.route('/tamm/webhook/alerts', type='http', auth='public',
+                methods=['POST'], csrf=False, save_session=False)
+    def tamm_push_alerts(self, **kwargs):
+        return self._tamm_push('tamm.alert')
+
+    def _tamm_authenticate(self):
+        """Return the active tamm.config matching the request headers"""
+        authorization = request.httprequest.headers.get('Authorization', '')
+        secret = request.httprequest.headers.get('X-API-Secret', '')
+        if not authorization.startswith('Bearer ') or not secret:
+            return None
+        api_key = authorization[len('Bearer '):]
+        configs = request.env['tamm.config'].sudo().search([
+            ('active', '=', True),
+            ('api_key', '=', api_key),
+        ])
+        return next((config for config in configs if consteq(config.api_secret, secret)), None)
+
+    def _tamm_push(self, model_name):
+        config = self._tamm_authenticate()
+        if not config:
+            return request.make_json_response({'error': 'unauthorized'}, status=401)
+
+        try:
+            records = request.get_json_data()
+        except ValueError:
+            return request.make_json_response({'error': 'invalid JSON'}, status=400)
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            return request.make_json_response({'error': 'expected a JSON array of objects'}, status=400)
+        if len(records) > MAX_PUSH_RECORDS:
+            return request.make_json_response(
+                {'error': f'at most {MAX_PUSH_RECORDS} records per push'}, status=413)
+
+        model = request.env[model_name].sudo().with_company(config.company_id)
+        result = model._tamm_ingest_push(config, records)
+        _logger.debug('Tamm push to %s: %s', model_name, result)
+        return request.make_json_response(result)
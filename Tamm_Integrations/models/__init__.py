@@ -1,9 +1,21 @@
 from . import tamm_config
+from . import tamm_ingest_mixin
 from . import fleet_vehicle
 from . import tamm_tracking
+from . import tamm_tracking_rollup
 from . import tamm_maintenance
 from . import tamm_fuel
 from . import tamm_driver
 from . import tamm_route
+from . import tamm_trip_state
+from . import tamm_distance_cache
+from . import tamm_gazetteer
 from . import tamm_alert
-from . import tamm_report
\ No newline at end of file
+from . import tamm_geofence
+from . import tamm_report
+from . import tamm_sync_cursor
+from . import tamm_rate_limit
+from . import tamm_sync_run
+from . import tamm_vehicle_stats
+from . import tamm_vehicle_position
+from . import ir_websocket
@@ -1,193 +1,28 @@
-
-# -*- coding: utf-8 -*-
-{
-    'name': 'Tamm Fleet Management Integration',
-    'version': '18.0.1.0.0',
-    'category': 'Fleet',
-    'summary': 'Integration with Tamm Fleet Management System for Saudi Arabia',
-    'description': '''
-        Tamm Fleet Management Integration for Odoo 18 Community
-        ========================================================
-        * Real-time vehicle tracking and GPS integration
-        * Vehicle management and maintenance scheduling
-        * Fuel consumption monitoring
-        * Driver behavior analysis
-        * Route optimization
-        * Safety and security alerts
-        * Comprehensive reporting and analytics
-    ''',
-    'author': 'Your Company',
-    'website': 'https://www.yourcompany.com',
-    'depends': ['base', 'fleet', 'hr'],
-    'data': [
-        'security/tamm_security.xml',
-        'security/ir.model.access.csv',
-        'data/tamm_cron.xml',
-        'data/tamm_sequence.xml',
-        'views/tamm_config_views.xml',
-        'views/fleet_vehicle_views.xml',
-        'views/tamm_tracking_views.xml',
-        'views/tamm_maintenance_views.xml',
-        'views/tamm_fuel_views.xml',
-        'views/tamm_driver_views.xml',
-        'views/tamm_route_views.xml',
-        'views/tamm_alert_views.xml',
-        'views/tamm_report_views.xml',
-        'views/tamm_dashboard_views.xml',
-        'views/tamm_menu_views.xml',
-    ],
-    'assets': {
-        'web.assets_backend': [
-            'tamm_fleet/static/src/css/tamm_dashboard.css',
-            'tamm_fleet/static/src/js/tamm_dashboard.js',
-            'tamm_fleet/static/src/xml/tamm_dashboard.xml',
-        ],
-    },
-    'installable': True,
-    'application': True,
-    'auto_install': False,
-    'license': 'LGPL-3',
-}
-
-# models/__init__.py
-from . import tamm_config
-from . import fleet_vehicle
-from . import tamm_tracking
-from . import tamm_maintenance
-from . import tamm_fuel
-from . import tamm_driver
-from . import tamm_route
-from . import tamm_alert
-from . import tamm_report
-
-# models/tamm_config.py
+# models/fleet_vehicle.py
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError, ValidationError
-import requests
+from odoo.exceptions import UserError
+from ..tools import rate_limit
+from ..tools.sync_scheduler import SyncScheduler
+from .tamm_sync_cursor import SYNC_MAX_PAGES
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging
-import json
+import time
 
 _logger = logging.getLogger(__name__)
 
-class TammConfig(models.Model):
-    _name = 'tamm.config'
-    _description = 'Tamm System Configuration'
-    _rec_name = 'name'
-    
-    name = fields.Char('Configuration Name', required=True)
-    api_url = fields.Char('Tamm API URL', required=True, 
-                          help='Base URL for Tamm API endpoint')
-    api_key = fields.Char('API Key', required=True)
-    api_secret = fields.Char('API Secret', required=True)
-    company_id = fields.Many2one(
-        'res.company', 
-        'Company', 
-        required=True, 
-        default=lambda self: self.env.company
-    )
-    active = fields.Boolean('Active', default=True)
-    sync_interval = fields.Integer('Sync Interval (minutes)', default=15)
-    last_sync = fields.Datetime('Last Sync', readonly=True)
-    sync_status = fields.Selection([
-        ('success', 'Success'),
-        ('failed', 'Failed'),
-        ('pending', 'Pending')
-    ], 'Sync Status', default='pending', readonly=True)
-    sync_error = fields.Text('Last Sync Error', readonly=True)
-    
-    _sql_constraints = [
-        ('name_company_unique', 'unique(name, company_id)', 
-         'Configuration name must be unique per company!')
-    ]
-    
-    @api.model
-    def get_active_config(self):
-        """Get active Tamm configuration for current company"""
-        return self.search([
-            ('active', '=', True),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-    
-    def _get_headers(self):
-        """Prepare API headers"""
-        self.ensure_one()
-        return {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json',
-            'X-API-Secret': self.api_secret
-        }
-    
-    def test_connection(self):
-        """Test connection to Tamm API"""
-        self.ensure_one()
-        try:
-            response = requests.get(
-                f'{self.api_url}/api/v1/health',
-                headers=self._get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                self.write({
-                    'sync_status': 'success',
-                    'sync_error': False,
-                    'last_sync': fields.Datetime.now()
-                })
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': _('Success'),
-                        'message': _('Connection to Tamm API successful!'),
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                raise UserError(_('API returned status code: %s') % response.status_code)
-                
-        except Exception as e:
-            error_msg = str(e)
-            _logger.error(f'Tamm connection error: {error_msg}')
-            self.write({
-                'sync_status': 'failed',
-                'sync_error': error_msg
-            })
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Error'),
-                    'message': _('Failed to connect: %s') % error_msg,
-                    'type': 'danger',
-                    'sticky': True,
-                }
-            }
-    
-    def action_sync_now(self):
-        """Manual sync trigger"""
-        self.ensure_one()
-        vehicles = self.env['fleet.vehicle'].search([
-            ('tamm_vehicle_id', '!=', False),
-            ('company_id', '=', self.company_id.id)
-        ])
-        vehicles.sync_with_tamm()
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': _('Sync Started'),
-                'message': _('Syncing %s vehicles...') % len(vehicles),
-                'type': 'info',
-            }
-        }
+# Models fed by the per-vehicle Tamm endpoints, in sync order
+TAMM_SYNC_MODELS = ['tamm.tracking', 'tamm.fuel.log', 'tamm.maintenance', 'tamm.alert']
 
-# models/fleet_vehicle.py
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError
-import logging
+# Seconds a scheduled sync run may spend before handing over to a new run
+TAMM_CRON_TIME_BUDGET = 240
 
-_logger = logging.getLogger(__name__)
+def _timed_call(function, *args):
+    """Run ``function`` in a worker thread, return (result, error, seconds)"""
+    started = time.perf_counter()
+    try:
+        return function(*args), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
 
 class FleetVehicle(models.Model):
     _inherit = 'fleet.vehicle'
@@ -229,12 +64,15 @@ class FleetVehicle(models.Model):
     alert_count = fields.Integer('Alerts', compute='_compute_counts')
     open_alert_count = fields.Integer('Open Alerts', compute='_compute_counts')
     
-    # Current Location
-    current_latitude = fields.Float('Current Latitude', digits=(10, 8))
-    current_longitude = fields.Float('Current Longitude', digits=(11, 8))
-    current_speed = fields.Float('Current Speed (km/h)', digits=(5, 2))
-    current_heading = fields.Float('Current Heading (°)', digits=(5, 2))
-    last_location_update = fields.Datetime('Last Location Update')
+    # Current Location, kept in the narrow tamm.vehicle.position table
+    tamm_position_id = fields.Many2one('tamm.vehicle.position', 'Live Position',
+                                       compute='_compute_tamm_position_id')
+    current_latitude = fields.Float('Current Latitude', related='tamm_position_id.latitude')
+    current_longitude = fields.Float('Current Longitude', related='tamm_position_id.longitude')
+    current_speed = fields.Float('Current Speed (km/h)', related='tamm_position_id.speed')
+    current_heading = fields.Float('Current Heading (°)', related='tamm_position_id.heading')
+    last_location_update = fields.Datetime('Last Location Update',
+                                           related='tamm_position_id.timestamp')
     
     # Statistics
     total_distance = fields.Float('Total Distance (km)', 
@@ -247,17 +85,106 @@ class FleetVehicle(models.Model):
     currency_id = fields.Many2one('res.currency', 
                                   default=lambda self: self.env.company.currency_id)
     
+    def _compute_tamm_position_id(self):
+        positions = self.env['tamm.vehicle.position'].sudo().search([
+            ('vehicle_id', 'in', self._origin.ids)
+        ])
+        positions_by_vehicle = {position.vehicle_id.id: position for position in positions}
+        for vehicle in self:
+            vehicle.tamm_position_id = positions_by_vehicle.get(vehicle._origin.id)
+    
+    @api.model
+    def get_latest_positions(self, since=False):
+        """Return the live position of the Tamm vehicles the user can see.
+
+        With ``since``, only positions updated after it are returned.
+        """
+        vehicles = self.search([('tamm_vehicle_id', '!=', False)])
+        domain = [('vehicle_id', 'in', vehicles.ids)]
+        if since:
+            domain.append(('timestamp', '>', since))
+        positions = self.env['tamm.vehicle.position'].sudo().search_fetch(
+            domain, ['vehicle_id', 'latitude', 'longitude', 'speed', 'heading', 'timestamp'])
+        vehicles_by_id = {vehicle.id: vehicle for vehicle in vehicles}
+        return [{
+            'id': position.vehicle_id.id,
+            'name': vehicles_by_id[position.vehicle_id.id].name,
+            'license_plate': vehicles_by_id[position.vehicle_id.id].license_plate,
+            'latitude': position.latitude,
+            'longitude': position.longitude,
+            'speed': position.speed,
+            'heading': position.heading,
+            'timestamp': position.timestamp,
+        } for position in positions]
+    
+    @api.model
+    def get_map_clusters(self, bounds, zoom):
+        """Return the Tamm vehicles of a map viewport, clustered by zoom.
+
+        ``bounds`` is [south, west, north, east]. Cells with several
+        vehicles come back as clusters with a count, lone vehicles with
+        their details.
+        """
+        vehicles = self.search([('tamm_vehicle_id', '!=', False)])
+        rows = self.env['tamm.vehicle.position'].sudo()._get_clusters(vehicles.ids, bounds, int(zoom))
+        single_ids = [vehicle_id for _lat, _lon, _count, vehicle_id in rows if vehicle_id]
+        positions = {
+            position.vehicle_id.id: position
+            for position in self.env['tamm.vehicle.position'].sudo().search_fetch(
+                [('vehicle_id', 'in', single_ids)], ['vehicle_id', 'speed', 'heading', 'timestamp'])
+        }
+        vehicles_by_id = {vehicle.id: vehicle for vehicle in self.browse(single_ids)}
+        result = {'clusters': [], 'vehicles': []}
+        for latitude, longitude, count, vehicle_id in rows:
+            if not vehicle_id:
+                result['clusters'].append({'latitude': latitude, 'longitude': longitude, 'count': count})
+                continue
+            vehicle, position = vehicles_by_id[vehicle_id], positions[vehicle_id]
+            result['vehicles'].append({
+                'id': vehicle_id,
+                'name': vehicle.name,
+                'license_plate': vehicle.license_plate,
+                'latitude': latitude,
+                'longitude': longitude,
+                'speed': position.speed,
+                'heading': position.heading,
+                'timestamp': position.timestamp,
+            })
+        return result
+    
     @api.depends('tracking_ids', 'maintenance_ids', 'fuel_log_ids', 
                  'route_ids', 'alert_ids', 'alert_ids.resolved')
     def _compute_counts(self):
+        # One grouped COUNT per model for the whole recordset, instead of
+        # loading every related record of every vehicle
+        vehicle_ids = self._origin.ids
+        
+        def count_by_vehicle(model_name, domain=None):
+            groups = self.env[model_name]._read_group(
+                [('vehicle_id', 'in', vehicle_ids)] + (domain or []),
+                ['vehicle_id'], ['__count'])
+            return {vehicle.id: count for vehicle, count in groups}
+        
+        tracking_counts = count_by_vehicle('tamm.tracking')
+        maintenance_counts = count_by_vehicle('tamm.maintenance')
+        fuel_log_counts = count_by_vehicle('tamm.fuel.log')
+        route_counts = count_by_vehicle('tamm.route')
+        alert_groups = self.env['tamm.alert']._read_group(
+            [('vehicle_id', 'in', vehicle_ids)], ['vehicle_id', 'resolved'], ['__count'])
+        alert_counts, open_alert_counts = {}, {}
+        for alert_vehicle, resolved, count in alert_groups:
+            alert_counts[alert_vehicle.id] = alert_counts.get(alert_vehicle.id, 0) + count
+            if not resolved:
+                open_alert_counts[alert_vehicle.id] = count
+        
         for vehicle in self:
-            vehicle.tracking_count = len(vehicle.tracking_ids)
-            vehicle.maintenance_count = len(vehicle.maintenance_ids)
-            vehicle.fuel_log_count = len(vehicle.fuel_log_ids)
-            vehicle.route_count = len(vehicle.route_ids)
-            vehicle.alert_count = len(vehicle.alert_ids)
-            vehicle.open_alert_count = len(vehicle.alert_ids.filtered(
-                lambda a: not a.resolved))
+            vehicle_id = vehicle._origin.id
+            vehicle.tracking_count = tracking_counts.get(vehicle_id, 0)
+            vehicle.maintenance_count = maintenance_counts.get(vehicle_id, 0)
+            vehicle.fuel_log_count = fuel_log_counts.get(vehicle_id, 0)
+            vehicle.route_count = route_counts.get(vehicle_id, 0)
+            vehicle.alert_count = alert_counts.get(vehicle_id, 0)
+            vehicle.open_alert_count = open_alert_counts.get(vehicle_id, 0)
     
     @api.depends('maintenance_ids', 'maintenance_ids.state', 
                  'maintenance_ids.due_date')
@@ -277,61 +204,309 @@ class FleetVehicle(models.Model):
     
     @api.depends('tracking_ids.distance')
     def _compute_distance_stats(self):
+        stats = self._get_tamm_stats()
+        first_day = fields.Date.today().replace(day=1)
         for vehicle in self:
-            vehicle.total_distance = sum(vehicle.tracking_ids.mapped('distance'))
+            vehicle_stats = stats.get(vehicle._origin.id)
+            vehicle.total_distance = vehicle_stats.lifetime_distance if vehicle_stats else 0.0
             
-            # Calculate monthly distance
-            first_day = fields.Date.today().replace(day=1)
-            monthly_tracking = vehicle.tracking_ids.filtered(
-                lambda t: t.timestamp and 
-                fields.Date.to_date(t.timestamp) >= first_day
-            )
-            vehicle.monthly_distance = sum(monthly_tracking.mapped('distance'))
+            # The ledger month is rolled over on the first tracking of a new month
+            if vehicle_stats and vehicle_stats.month_start == first_day:
+                vehicle.monthly_distance = vehicle_stats.month_distance
+            else:
+                vehicle.monthly_distance = 0.0
     
     @api.depends('fuel_log_ids.quantity', 'fuel_log_ids.total_cost', 
                  'total_distance')
     def _compute_fuel_stats(self):
+        stats = self._get_tamm_stats()
         for vehicle in self:
-            total_fuel = sum(vehicle.fuel_log_ids.mapped('quantity'))
-            vehicle.total_fuel_cost = sum(vehicle.fuel_log_ids.mapped('total_cost'))
+            vehicle_stats = stats.get(vehicle._origin.id)
+            total_fuel = vehicle_stats.fuel_quantity if vehicle_stats else 0.0
+            vehicle.total_fuel_cost = vehicle_stats.fuel_cost if vehicle_stats else 0.0
             
             if total_fuel > 0 and vehicle.total_distance > 0:
                 vehicle.average_fuel_consumption = (total_fuel / vehicle.total_distance) * 100
             else:
                 vehicle.average_fuel_consumption = 0.0
     
+    def _get_tamm_stats(self):
+        """Return the statistics ledger rows of the vehicles by vehicle id"""
+        stats = self.env['tamm.vehicle.stats'].sudo().search([('vehicle_id', 'in', self._origin.ids)])
+        return {vehicle_stats.vehicle_id.id: vehicle_stats for vehicle_stats in stats}
+    
+    def write(self, vals):
+        if 'tamm_vehicle_id' in vals:
+            # A different Tamm vehicle starts from a full history download
+            self.env['tamm.sync.cursor'].search([
+                ('vehicle_id', 'in', self.filtered(
+                    lambda v: v.tamm_vehicle_id != vals['tamm_vehicle_id']).ids)
+            ]).unlink()
+        return super().write(vals)
+    
     def sync_with_tamm(self):
         """Sync vehicle data with Tamm system"""
         config = self.env['tamm.config'].get_active_config()
         if not config:
             raise UserError(_('No active Tamm configuration found. Please configure Tamm integration first.'))
         
-        success_count = 0
-        for vehicle in self.filtered(lambda v: v.tamm_vehicle_id):
-            try:
-                # Sync location
-                self.env['tamm.tracking'].sync_vehicle_location(vehicle, config)
-                
-                # Sync fuel data
-                self.env['tamm.fuel.log'].sync_fuel_data(vehicle, config)
-                
-                # Sync maintenance
-                self.env['tamm.maintenance'].sync_maintenance(vehicle, config)
+        self._tamm_sync_vehicles(config)
+        return True
+    
+    @api.model
+    def _cron_sync_tamm_data(self):
+        """Sync all Tamm vehicles in committed, resumable batches.
+
+        Each active configuration walks its company's vehicles by ID from
+        its checkpoint. Every batch is committed with the new checkpoint,
+        so a killed run only loses the batch in progress. When the time
+        budget is spent the cron is re-triggered to continue the pass.
+        While syncs are queued from "Sync Now", only the queued
+        configurations are synced, each until its pass completes.
+        """
+        started = time.monotonic()
+        RateLimit = self.env['tamm.rate.limit'].sudo()
+        configs = self.env['tamm.config'].search([('active', '=', True)])
+        # A queued configuration paused by its breaker does not hold back the others
+        requested = configs.filtered(lambda config: config.sync_requested and not RateLimit._is_open(config))
+        for config in requested or configs:
+            trigger = 'manual' if config.sync_requested else 'cron'
+            if RateLimit._is_open(config):
+                _logger.info('Tamm sync of %s paused by its circuit breaker', config.name)
+                continue
+            Vehicle = self.with_company(config.company_id)
+            while True:
+                batch = Vehicle.search([
+                    ('tamm_vehicle_id', '!=', False),
+                    ('company_id', '=', config.company_id.id),
+                    ('id', '>', config.sync_checkpoint),
+                ], order='id', limit=config.sync_batch_size)
+                if not batch:
+                    # Pass complete, the next run starts over
+                    config.write({'sync_checkpoint': 0, 'sync_requested': False})
+                    self.env.cr.commit()
+                    break
                 
-                # Sync alerts
-                self.env['tamm.alert'].sync_alerts(vehicle, config)
+                result = batch._tamm_sync_vehicles(config, trigger=trigger,
+                                                   deadline=started + TAMM_CRON_TIME_BUDGET)
+                if result['paused']:
+                    # Keep what was stored; the batch is synced again after the cooldown
+                    self.env.cr.commit()
+                    break
+                config.sync_checkpoint = batch[-1].id
+                self.env.cr.commit()
                 
-                success_count += 1
+                if time.monotonic() - started > TAMM_CRON_TIME_BUDGET:
+                    _logger.info('Tamm sync paused after vehicle %s, continuing in a new run',
+                                 config.sync_checkpoint)
+                    self.env.ref('Tamm_Integrations.ir_cron_sync_tamm_data')._trigger()
+                    return
+    
+    def _tamm_sync_vehicles(self, config, trigger='manual', deadline=None):
+        """Fetch every Tamm stream of the vehicles concurrently.
+
+        HTTP requests run in a bounded thread pool, paced by the shared rate
+        limit of the configuration and by a concurrency window that halves
+        whenever Tamm throttles or fails. Throttled and failing requests are
+        retried with backoff; payloads are stored on the current cursor, one
+        at a time, as soon as they arrive. A stream with more pages is
+        fetched again from its next cursor, up to SYNC_MAX_PAGES pages and
+        until the ``deadline`` (a time.monotonic() value); the remaining
+        pages wait for the next sync. Too many consecutive failures open
+        the circuit breaker of the configuration and end the sync. Every sync
+        that sends requests is logged as a ``tamm.sync.run``.
+        """
+        started = time.monotonic()
+        started_at = fields.Datetime.now()
+        vehicles = self.filtered(lambda v: v.tamm_vehicle_id)
+        stream_models = [self.env[model_name] for model_name in TAMM_SYNC_MODELS]
+        job = {
+            'stats': {
+                model._tamm_stream: {'requests': 0, 'failed': 0, 'retried': 0,
+                                     'fetched': 0, 'inserted': 0, 'skipped': 0}
+                for model in stream_models
+            },
+            'latencies': {model._tamm_stream: [] for model in stream_models},
+            'failed_vehicles': set(),
+            'positions': {},
+            'last_error': None,
+            'succeeded': False,
+            'trailing_failures': 0,
+            'paused': False,
+            'deadline': deadline,
+        }
+        
+        RateLimit = self.env['tamm.rate.limit'].sudo()
+        if RateLimit._is_open(config):
+            _logger.warning('Tamm sync of %s skipped: paused by its circuit breaker', config.name)
+            return {
+                'vehicles': len(vehicles),
+                'succeeded': 0,
+                'failed': 0,
+                'duration': 0.0,
+                'streams': job['stats'],
+                'status': 'failed',
+                'paused': True,
+            }
+        
+        # The client only holds plain values, so threads can share it
+        client = config._get_tamm_client()
+        # Query parameters of the next page of every (vehicle id, stream)
+        job['params'] = self.env['tamm.sync.cursor']._get_request_params(vehicles, stream_models)
+        workers = max(config.sync_workers, 1)
+        # Items are (vehicle, model, attempt, page)
+        scheduler = SyncScheduler(
+            [(vehicle, model, 0, 0) for vehicle in vehicles for model in stream_models], workers)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while scheduler:
+                scheduler.release_due()
+                wanted = scheduler.wanted_tokens()
+                if wanted:
+                    scheduler.add_tokens(*RateLimit._acquire(config, wanted))
+                for item in scheduler.take():
+                    vehicle, model = item[:2]
+                    future = executor.submit(
+                        _timed_call, client.fetch_vehicle_stream,
+                        vehicle.tamm_vehicle_id, model._tamm_stream,
+                        job['params'].get((vehicle.id, model._tamm_stream)))
+                    scheduler.start(future, item)
+                    job['stats'][model._tamm_stream]['requests'] += 1
                 
-            except Exception as e:
-                _logger.error(f'Error syncing vehicle {vehicle.name}: {str(e)}')
+                timeout = scheduler.timeout()
+                if not scheduler.in_flight:
+                    time.sleep(timeout or 0.0)
+                    continue
+                done, _running = wait(scheduler.in_flight, timeout=timeout,
+                                      return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = scheduler.finish(future)
+                    data, e, latency = future.result()
+                    job['latencies'][item[1]._tamm_stream].append(latency)
+                    if e is not None:
+                        self._tamm_sync_handle_error(config, scheduler, job, item, e)
+                    else:
+                        scheduler.limiter.on_success()
+                        self._tamm_sync_store(scheduler, job, item, data)
                 
+                if job['trailing_failures'] >= config.breaker_threshold and not job['paused']:
+                    # Give up on what is left; cursors of those streams stay put
+                    job['paused'] = True
+                    for vehicle, model, _attempt, _page in scheduler.drop_waiting():
+                        job['stats'][model._tamm_stream]['failed'] += 1
+                        job['failed_vehicles'].add(vehicle.id)
+        
+        # Hand the tokens taken ahead back to the other workers
+        RateLimit._release(config, scheduler.tokens)
+        return self._tamm_sync_finish(config, trigger, vehicles, job, started, started_at)
+    
+    def _tamm_sync_handle_error(self, config, scheduler, job, item, error):
+        """Slow down on throttling, then schedule the retry of a failed
+        request or give its data up for this sync"""
+        vehicle, model, attempt, page = item
+        stream_stats = job['stats'][model._tamm_stream]
+        status = rate_limit.error_status(error)
+        if status == 429 or (status or 0) >= 500:
+            scheduler.limiter.on_overload()
+        delay = rate_limit.retry_after(error)
+        if delay:
+            self.env['tamm.rate.limit'].sudo()._pause(config, delay)
+        if status != 429:
+            job['trailing_failures'] += 1
+        job['last_error'] = f'{model._tamm_stream} / {vehicle.name}: {str(error)}'
+        if rate_limit.is_retryable(error) and attempt < config.max_retries:
+            stream_stats['retried'] += 1
+            scheduler.retry((vehicle, model, attempt + 1, page),
+                            delay or rate_limit.backoff_delay(attempt))
+            return
+        stream_stats['failed'] += 1
+        job['failed_vehicles'].add(vehicle.id)
+        _logger.error(f'Error syncing {model._tamm_stream} for vehicle {vehicle.name}: {str(error)}')
+    
+    def _tamm_sync_store(self, scheduler, job, item, data):
+        """Store a fetched payload, remember the cursor position it reached
+        and queue its next page while the sync has time for it"""
+        vehicle, model, _attempt, page = item
+        stream_stats = job['stats'][model._tamm_stream]
+        job['succeeded'] = True
+        job['trailing_failures'] = 0
+        records = data.get(model._tamm_records_key) if model._tamm_records_key else [data]
+        stream_stats['fetched'] += len(records or [])
+        try:
+            with self.env.cr.savepoint():
+                inserted, skipped = model._tamm_process_payload(vehicle, data)
+            stream_stats['inserted'] += inserted
+            stream_stats['skipped'] += skipped
+            if model._tamm_records_key:
+                key = (vehicle.id, model._tamm_stream)
+                previous_since = job['positions'].get(key, (False, False))[1]
+                job['positions'][key] = self.env['tamm.sync.cursor']._get_payload_position(
+                    model, data, previous_since)
+                cursor = job['positions'][key][0]
+                if cursor and page + 1 < SYNC_MAX_PAGES and (
+                        job['deadline'] is None or time.monotonic() < job['deadline']):
+                    job['params'][key] = {'cursor': cursor}
+                    scheduler.add((vehicle, model, 0, page + 1))
+        except Exception as e:
+            stream_stats['failed'] += 1
+            job['failed_vehicles'].add(vehicle.id)
+            job['last_error'] = f'{model._tamm_stream} / {vehicle.name}: {str(e)}'
+            _logger.error(f'Error storing {model._tamm_stream} for vehicle {vehicle.name}: {str(e)}')
+    
+    def _tamm_sync_finish(self, config, trigger, vehicles, job, started, started_at):
+        """Advance the cursors, report the sync on the configuration and
+        log it; return the result of the sync"""
+        stats = job['stats']
+        sent = any(values['requests'] for values in stats.values())
+        if sent:
+            self.env['tamm.rate.limit'].sudo()._record_outcome(
+                config, job['succeeded'], job['trailing_failures'])
+        self.env['tamm.sync.cursor']._advance(job['positions'])
+        
+        duration = time.monotonic() - started
+        failed_vehicles = job['failed_vehicles']
+        success_count = len(vehicles) - len(failed_vehicles)
+        report_lines = [
+            _('%(done)s/%(total)s vehicles synced in %(duration).2fs',
+              done=success_count, total=len(vehicles), duration=duration),
+        ] + [
+            _('%(stream)s: %(requests)s requests, %(failed)s failed, %(retried)s retried, '
+              '%(fetched)s fetched, %(inserted)s inserted, %(skipped)s skipped',
+              stream=stream, **values)
+            for stream, values in stats.items()
+        ]
+        if job['paused']:
+            report_lines.append(_('Stopped after %(failures)s consecutive failures',
+                                  failures=job['trailing_failures']))
+        _logger.info('Tamm sync finished: %s', '; '.join(report_lines))
+        
+        if failed_vehicles:
+            sync_status = 'partial' if success_count else 'failed'
+            error = _('%(failed)s of %(total)s vehicles failed, last error: %(error)s',
+                      failed=len(failed_vehicles), total=len(vehicles), error=job['last_error'])
+        else:
+            sync_status, error = 'success', False
         config.write({
             'last_sync': fields.Datetime.now(),
-            'sync_status': 'success' if success_count > 0 else 'failed'
+            'sync_status': sync_status,
+            'sync_error': error,
+            'last_sync_duration': duration,
+            'last_sync_report': '\n'.join(report_lines),
         })
         
-        return True
+        result = {
+            'vehicles': len(vehicles),
+            'succeeded': success_count,
+            'failed': len(failed_vehicles),
+            'duration': duration,
+            'streams': stats,
+            'status': sync_status,
+            'paused': job['paused'],
+        }
+        if sent:
+            self.env['tamm.sync.run']._log_run(config, trigger, started_at, duration,
+                                               result, job['latencies'], error=error or None)
+        return result
     
     def action_view_tracking(self):
         self.ensure_one()
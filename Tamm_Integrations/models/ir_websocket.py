@@ -0,0 +1,13 @@
+# models/ir_websocket.py
+from odoo import models
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+    
+    def _build_bus_channel_list(self, channels):
+        # Live positions are published per company, only to Tamm users
+        if 'tamm_positions' in channels:
+            channels = [channel for channel in channels if channel != 'tamm_positions']
+            if self.env.user.has_group('Tamm_Integrations.group_tamm_user'):
+                channels.extend((company, 'tamm_positions') for company in self.env.user.company_ids)
+        return super()._build_bus_channel_list(channels)
@@ -1,16 +1,24 @@
 
 # models/tamm_alert.py
 from odoo import models, fields, api, _
-import requests
 import logging
 
 _logger = logging.getLogger(__name__)
 
 class TammAlert(models.Model):
     _name = 'tamm.alert'
+    _inherit = ['tamm.ingest.mixin']
     _description = 'Vehicle Alert'
     _order = 'timestamp desc'
     _rec_name = 'display_name'
+    _tamm_stream = 'alerts'
+    _tamm_records_key = 'alerts'
+    _tamm_cursor_key = 'timestamp'
+    _tamm_natural_key = ['vehicle_id', 'timestamp', 'alert_type', 'geofence_id']
+    _tamm_report_date_field = 'timestamp'
+    _tamm_address_field = 'location_address'
+    _tamm_push_required = ('timestamp', 'alert_type')
+    _tamm_driver_fields = ('vehicle_id', 'timestamp', 'driver_id', 'alert_type')
     
     vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
                                  required=True, index=True)
@@ -43,6 +51,12 @@ class TammAlert(models.Model):
     latitude = fields.Float('Latitude', digits=(10, 8))
     longitude = fields.Float('Longitude', digits=(11, 8))
     location_address = fields.Char('Location Address')
+    geofence_id = fields.Many2one('tamm.geofence', 'Geofence', index='btree_not_null',
+                                  ondelete='set null')
+    geofence_event = fields.Selection([
+        ('entry', 'Entry'),
+        ('exit', 'Exit')
+    ], 'Geofence Event')
     resolved = fields.Boolean('Resolved', default=False, index=True)
     resolved_date = fields.Datetime('Resolved Date')
     resolved_by = fields.Many2one('res.users', 'Resolved By')
@@ -62,40 +76,28 @@ class TammAlert(models.Model):
             return False
             
         try:
-            response = requests.get(
-                f'{config.api_url}/api/v1/vehicles/{vehicle.tamm_vehicle_id}/alerts',
-                headers=config._get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                for alert in data.get('alerts', []):
-                    existing = self.search([
-                        ('vehicle_id', '=', vehicle.id),
-                        ('timestamp', '=', alert.get('timestamp')),
-                        ('alert_type', '=', alert.get('alert_type'))
-                    ], limit=1)
-                    
-                    if not existing:
-                        self.create({
-                            'vehicle_id': vehicle.id,
-                            'timestamp': alert.get('timestamp'),
-                            'alert_type': alert.get('alert_type'),
-                            'severity': alert.get('severity', 'medium'),
-                            'description': alert.get('description', ''),
-                            'latitude': alert.get('latitude'),
-                            'longitude': alert.get('longitude'),
-                            'location_address': alert.get('address', ''),
-                        })
-                
-                return True
+            self.env['tamm.sync.cursor']._sync_stream(self, vehicle, config)
+            return True
                 
         except Exception as e:
             _logger.error(f'Error syncing alerts for {vehicle.name}: {str(e)}')
             
         return False
     
+    @api.model
+    def _tamm_prepare_values(self, vehicle, alert):
+        """Map a Tamm alert record to alert values"""
+        return {
+            'vehicle_id': vehicle.id,
+            'timestamp': alert.get('timestamp'),
+            'alert_type': alert.get('alert_type'),
+            'severity': alert.get('severity', 'medium'),
+            'description': alert.get('description', ''),
+            'latitude': alert.get('latitude'),
+            'longitude': alert.get('longitude'),
+            'location_address': alert.get('address', ''),
+        }
+    
     def action_resolve(self):
         """Mark alert as resolved"""
         self.write({
@@ -1,11 +1,13 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
-import requests
 import logging
 import json
 
+from ..tools.tamm_client import TammClient
+
 _logger = logging.getLogger(__name__)
 
+
 class TammConfig(models.Model):
     _name = 'tamm.config'
     _description = 'Tamm System Configuration'
@@ -27,16 +29,95 @@ class TammConfig(models.Model):
     last_sync = fields.Datetime('Last Sync', readonly=True)
     sync_status = fields.Selection([
         ('success', 'Success'),
+        ('partial', 'Partial'),
         ('failed', 'Failed'),
         ('pending', 'Pending')
     ], 'Sync Status', default='pending', readonly=True)
     sync_error = fields.Text('Last Sync Error', readonly=True)
+    sync_workers = fields.Integer('Sync Workers', default=8,
+                                  help='Number of concurrent Tamm API requests '
+                                       'during a sync. Use 1 to sync sequentially.')
+    last_sync_duration = fields.Float('Last Sync Duration (s)', readonly=True,
+                                      digits=(10, 2))
+    last_sync_report = fields.Text('Last Sync Report', readonly=True)
+    sync_batch_size = fields.Integer('Sync Batch Size', default=100,
+                                     help='Vehicles synced and committed together by the scheduled sync.')
+    sync_checkpoint = fields.Integer('Sync Checkpoint', readonly=True, default=0,
+                                     help='ID of the last vehicle synced by the running scheduled sync. '
+                                          'The next batch starts after it; 0 means a new pass.')
+    sync_requested = fields.Boolean('Sync Queued', readonly=True, copy=False,
+                                    help='A manual sync of this configuration is queued; the next '
+                                         'scheduled sync run only syncs the queued configurations.')
+    
+    # Trip detection
+    trip_stop_minutes = fields.Integer('Trip Stop Duration (min)', default=10,
+                                       help='A trip ends once the vehicle has not moved for this long.')
+    trip_min_distance = fields.Float('Minimum Trip Distance (km)', default=0.5,
+                                     help='Shorter detected trips are discarded.')
+    
+    # Connection tuning
+    http_pool_size = fields.Integer('HTTP Pool Size', default=16,
+                                    help='Maximum number of keep-alive connections kept open to Tamm.')
+    timeout_health = fields.Float('Health Timeout (s)', default=5.0)
+    timeout_location = fields.Float('Location Timeout (s)', default=10.0)
+    timeout_fuel = fields.Float('Fuel Timeout (s)', default=10.0)
+    timeout_maintenance = fields.Float('Maintenance Timeout (s)', default=10.0)
+    timeout_alerts = fields.Float('Alerts Timeout (s)', default=10.0)
+    
+    # Rate limiting
+    rate_limit = fields.Float('Request Rate (req/s)', default=10.0,
+                              help='Sustained Tamm API request rate, shared by every worker syncing this configuration.')
+    rate_burst = fields.Integer('Request Burst', default=20,
+                                help='Requests that may be sent at once after an idle period.')
+    max_retries = fields.Integer('Max Retries', default=3,
+                                 help='Retries of a request rejected as throttled (429) or failing with a '
+                                      'server or network error before its data is given up for this sync.')
+    breaker_threshold = fields.Integer('Breaker Threshold', default=20,
+                                       help='Consecutive failed requests after which the configuration is paused.')
+    breaker_cooldown = fields.Integer('Breaker Cooldown (s)', default=300,
+                                      help='How long a configuration stays paused once its breaker opened.')
+    rate_limit_state_ids = fields.One2many('tamm.rate.limit', 'config_id', 'Rate Limit State')
+    paused_until = fields.Datetime('Paused Until', related='rate_limit_state_ids.open_until')
     
     _sql_constraints = [
         ('name_company_unique', 'unique(name, company_id)', 
-         'Configuration name must be unique per company!')
+         'Configuration name must be unique per company!'),
+        ('sync_workers_positive', 'CHECK(sync_workers > 0)',
+         'Sync workers must be at least 1!'),
+        ('sync_batch_size_positive', 'CHECK(sync_batch_size > 0)',
+         'Sync batch size must be at least 1!'),
+        ('trip_stop_minutes_positive', 'CHECK(trip_stop_minutes > 0)',
+         'Trip stop duration must be at least 1 minute!'),
+        ('rate_limit_positive', 'CHECK(rate_limit > 0)',
+         'Request rate must be positive!'),
+        ('rate_burst_positive', 'CHECK(rate_burst > 0)',
+         'Request burst must be at least 1!'),
+        ('max_retries_positive', 'CHECK(max_retries >= 0)',
+         'Max retries cannot be negative!'),
+        ('breaker_threshold_positive', 'CHECK(breaker_threshold > 0)',
+         'Breaker threshold must be at least 1!'),
+        ('breaker_cooldown_positive', 'CHECK(breaker_cooldown > 0)',
+         'Breaker cooldown must be positive!'),
     ]
     
+    # Fields the cached Tamm client is built from
+    _tamm_client_fields = {
+        'api_url', 'api_key', 'api_secret', 'http_pool_size', 'timeout_health',
+        'timeout_location', 'timeout_fuel', 'timeout_maintenance', 'timeout_alerts',
+    }
+    
+    def write(self, vals):
+        res = super().write(vals)
+        if self._tamm_client_fields.intersection(vals):
+            # Drop the cached clients in every worker
+            self.env.registry.clear_cache()
+        return res
+    
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+    
     @api.model
     def get_active_config(self):
         """Get active Tamm configuration for current company"""
@@ -54,15 +135,36 @@ class TammConfig(models.Model):
             'X-API-Secret': self.api_secret
         }
     
+    def _get_tamm_client(self):
+        """Return the shared Tamm client of this configuration"""
+        self.ensure_one()
+        return self._get_tamm_client_cached()
+    
+    @tools.ormcache('self.id')
+    def _get_tamm_client_cached(self):
+        return TammClient(
+            self.api_url, self.api_key, self.api_secret,
+            pool_size=self.http_pool_size,
+            timeouts={
+                'health': self.timeout_health,
+                'location': self.timeout_location,
+                'fuel': self.timeout_fuel,
+                'maintenance': self.timeout_maintenance,
+                'alerts': self.timeout_alerts,
+            },
+        )
+    
+    def _tamm_fetch(self, tamm_vehicle_id, stream, params=None):
+        """Fetch one vehicle stream payload from Tamm"""
+        self.ensure_one()
+        return self._get_tamm_client().fetch_vehicle_stream(
+            tamm_vehicle_id, stream, params=params)
+    
     def test_connection(self):
         """Test connection to Tamm API"""
         self.ensure_one()
         try:
-            response = requests.get(
-                f'{self.api_url}/api/v1/health',
-                headers=self._get_headers(),
-                timeout=10
-            )
+            response = self._get_tamm_client().health()
             
             if response.status_code == 200:
                 self.write({
@@ -101,6 +203,37 @@ class TammConfig(models.Model):
                 }
             }
     
+    def action_distance_cache_statistics(self):
+        """Show the hit/miss statistics of the distance cache"""
+        return self.env['tamm.distance.cache'].action_show_statistics()
+    
+    def action_clear_distance_cache(self):
+        """Empty the distance cache"""
+        return self.env['tamm.distance.cache'].sudo().action_clear()
+    
+    def action_view_sync_runs(self):
+        self.ensure_one()
+        return {
+            'name': _('Sync Runs'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'tamm.sync.run',
+            'view_mode': 'list,graph,form',
+            'domain': [('config_id', '=', self.id)],
+        }
+    
+    def action_reset_rate_limit(self):
+        """Close the circuit breaker so the next sync runs again"""
+        return self.rate_limit_state_ids.sudo().action_reset()
+    
+    @api.model
+    def action_queue_sync(self):
+        """Queue a sync of the active configuration of the current company"""
+        config = self.get_active_config()
+        if not config:
+            raise UserError(_('No active Tamm configuration found. Please configure Tamm integration first.'))
+        # Fleet users may sync vehicles but not edit the configuration
+        return config.sudo().action_sync_now()
+    
     def action_sync_now(self):
         """Manual sync trigger"""
         self.ensure_one()
@@ -108,13 +241,16 @@ class TammConfig(models.Model):
             ('tamm_vehicle_id', '!=', False),
             ('company_id', '=', self.company_id.id)
         ])
-        vehicles.sync_with_tamm()
+        # Queue a new pass of this configuration only, run in the background
+        # batch by batch
+        self.write({'sync_checkpoint': 0, 'sync_requested': True})
+        self.env.ref('Tamm_Integrations.ir_cron_sync_tamm_data')._trigger()
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': _('Sync Started'),
-                'message': _('Syncing %s vehicles...') % len(vehicles),
+                'title': _('Sync Queued'),
+                'message': _('Sync of %s vehicles queued.') % len(vehicles),
                 'type': 'info',
             }
-        }
\ No newline at end of file
+        }
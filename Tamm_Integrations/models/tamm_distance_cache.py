@@ -0,0 +1,122 @@
+# models/tamm_distance_cache.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+import logging
+
+from ..tools.distance_cache import DistanceCache
+from ..tools.geo import geohash_encode
+
+_logger = logging.getLogger(__name__)
+
+# In-memory caches of this worker, by database
+_memory_caches = {}
+
+class TammDistanceCache(models.Model):
+    _name = 'tamm.distance.cache'
+    _description = 'Distance Matrix Cache'
+    _rec_name = 'cell_a'
+    
+    cell_a = fields.Char('From Cell', required=True, readonly=True)
+    cell_b = fields.Char('To Cell', required=True, readonly=True)
+    distance = fields.Float('Distance (km)', digits=(10, 3), readonly=True)
+    
+    _sql_constraints = [
+        ('cells_unique', 'unique(cell_a, cell_b)', 
+         'A distance is cached once per pair of cells!')
+    ]
+    
+    @api.model
+    def _get_settings(self):
+        params = self.env['ir.config_parameter'].sudo()
+        return {
+            'precision': int(params.get_param('Tamm_Integrations.distance_cache_precision', 7)),
+            'max_entries': int(params.get_param('Tamm_Integrations.distance_cache_size', 200000)),
+            'persistent': params.get_param('Tamm_Integrations.distance_cache_persistent', 'True') == 'True',
+        }
+    
+    @api.model
+    def _get_memory_cache(self, max_entries):
+        cache = _memory_caches.get(self.env.cr.dbname)
+        if cache is None or cache.max_entries != max_entries:
+            cache = _memory_caches[self.env.cr.dbname] = DistanceCache(max_entries)
+        return cache
+    
+    @api.model
+    def _load(self, keys):
+        """Return the persisted distances of (cell, cell) keys"""
+        found = {}
+        for start in range(0, len(keys), 10000):
+            chunk = keys[start:start + 10000]
+            self.env.cr.execute(SQL("""
+                SELECT c.cell_a, c.cell_b, c.distance
+                  FROM tamm_distance_cache c
+                  JOIN (VALUES %s) AS k(cell_a, cell_b)
+                    ON k.cell_a = c.cell_a AND k.cell_b = c.cell_b
+            """, SQL(", ").join(SQL("(%s, %s)", cell_a, cell_b) for cell_a, cell_b in chunk)))
+            found.update(((cell_a, cell_b), distance) for cell_a, cell_b, distance in self.env.cr.fetchall())
+        return found
+    
+    @api.model
+    def _persist(self, values):
+        items = list(values.items())
+        for start in range(0, len(items), 10000):
+            self.env.cr.execute(SQL("""
+                INSERT INTO tamm_distance_cache (cell_a, cell_b, distance,
+                                                 create_uid, create_date, write_uid, write_date)
+                SELECT v.cell_a, v.cell_b, v.distance,
+                       %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+                  FROM (VALUES %(values)s) AS v(cell_a, cell_b, distance)
+                ON CONFLICT (cell_a, cell_b) DO NOTHING
+            """, uid=self.env.uid, values=SQL(", ").join(
+                SQL("(%s, %s, %s::float8)", cell_a, cell_b, distance)
+                for (cell_a, cell_b), distance in items[start:start + 10000]
+            )))
+    
+    @api.model
+    def _get_distance_matrix(self, lats, lons):
+        """Distance matrix (km) between points, rounded to geohash cells.
+
+        Served from the worker's LRU, then from the persistent table when
+        enabled; the remaining pairs are computed in one vectorized batch.
+        Points of the same cell are measured exactly.
+        """
+        settings = self._get_settings()
+        cache = self._get_memory_cache(settings['max_entries'])
+        cells = [geohash_encode(lat, lon, settings['precision']) for lat, lon in zip(lats, lons)]
+        loader = self._load if settings['persistent'] else None
+        matrix, computed = cache.matrix(cells, loader, lats, lons)
+        if settings['persistent'] and computed:
+            self._persist(computed)
+        return matrix
+    
+    @api.model
+    def _get_statistics(self):
+        settings = self._get_settings()
+        statistics = self._get_memory_cache(settings['max_entries']).statistics()
+        statistics['persisted'] = self.sudo().search_count([]) if settings['persistent'] else 0
+        return statistics
+    
+    @api.model
+    def action_show_statistics(self):
+        """Notify the hit/miss statistics of the distance cache"""
+        statistics = self._get_statistics()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Distance Cache'),
+                'message': _(
+                    '%(entries)s of %(max_entries)s entries in memory, %(persisted)s persisted. '
+                    '%(hits)s hits, %(misses)s misses (%(ratio).1f%% hit ratio), %(evictions)s evictions.',
+                    ratio=statistics['hit_ratio'] * 100, **statistics),
+                'type': 'info',
+                'sticky': True,
+            }
+        }
+    
+    @api.model
+    def action_clear(self):
+        """Empty the persisted distance cache and the memory of this worker"""
+        self._get_memory_cache(self._get_settings()['max_entries']).clear()
+        self.env.cr.execute(SQL("TRUNCATE tamm_distance_cache"))
+        return True
@@ -1,7 +1,26 @@
 
 
 # models/tamm_driver.py
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Longest gap in seconds between two points still counted as driving or idle time
+DRIVER_MAX_POINT_GAP = 600
+
+# Days of metrics computed and committed together
+DRIVER_DAYS_PER_BATCH = 7
+
+# Employee of the driver contact of every vehicle, credited with the points
+# and alerts that name no driver
+VEHICLE_DRIVER_QUERY = SQL("""
+    SELECT DISTINCT ON (v.id) v.id AS vehicle_id, e.id AS employee_id
+      FROM fleet_vehicle v
+      JOIN hr_employee e ON e.work_contact_id = v.driver_id
+  ORDER BY v.id, e.id
+""")
 
 class TammDriver(models.Model):
     _name = 'tamm.driver'
@@ -36,26 +55,242 @@ class TammDriver(models.Model):
     notes = fields.Text('Notes')
     display_name = fields.Char('Display Name', compute='_compute_display_name', store=True)
     
+    _sql_constraints = [
+        ('employee_date_unique', 'unique(employee_id, date)', 
+         'Only one performance record per driver and day is allowed!')
+    ]
+    
+    # Score lost per event and lowest score of each category, shared by the
+    # record compute and the SQL of _refresh
+    _score_penalties = {
+        'speeding_count': 5,
+        'harsh_braking_count': 3,
+        'harsh_acceleration_count': 2,
+    }
+    _score_categories = [(90, 'excellent'), (75, 'good'), (60, 'average')]
+    
+    def _auto_init(self):
+        # Versions without the unique constraint could store several rows
+        # per driver and day, and the constraint cannot be added over them:
+        # keep the newest row of each pair, with the notes of all of them,
+        # and queue it for recomputation.
+        cr = self.env.cr
+        cr.execute(SQL("""
+            CREATE TABLE IF NOT EXISTS %s (
+                employee_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                PRIMARY KEY (employee_id, date)
+            )
+        """, SQL.identifier(f'{self._table}_dirty')))
+        if tools.table_exists(cr, self._table) and not tools.constraint_definition(
+                cr, self._table, f'{self._table}_employee_date_unique'):
+            if tools.column_exists(cr, self._table, 'notes'):
+                cr.execute(SQL("""
+                    UPDATE %(table)s newest
+                       SET notes = merged.notes
+                      FROM (
+                          SELECT MAX(id) AS id,
+                                 string_agg(notes, E'\\n\\n' ORDER BY id)
+                                     FILTER (WHERE trim(notes) != '') AS notes
+                            FROM %(table)s
+                           GROUP BY employee_id, date
+                          HAVING COUNT(*) > 1
+                      ) merged
+                     WHERE newest.id = merged.id
+                       AND merged.notes IS NOT NULL
+                """, table=SQL.identifier(self._table)))
+            cr.execute(SQL("""
+                WITH duplicates AS (
+                    DELETE FROM %(table)s older
+                     USING %(table)s newer
+                     WHERE newer.employee_id = older.employee_id
+                       AND newer.date = older.date
+                       AND newer.id > older.id
+                 RETURNING older.employee_id, older.date
+                )
+                INSERT INTO %(dirty)s (employee_id, date)
+                SELECT DISTINCT employee_id, date FROM duplicates
+                ON CONFLICT DO NOTHING
+            """, table=SQL.identifier(self._table),
+                 dirty=SQL.identifier(f'{self._table}_dirty')))
+            if cr.rowcount:
+                _logger.warning('Merged duplicate driver performance records of %s driver days',
+                                cr.rowcount)
+        return super()._auto_init()
+    
+    def init(self):
+        # Queue the days changed since the last run of the id watermarks
+        # used by previous versions
+        params = self.env['ir.config_parameter'].sudo()
+        for table in ('tamm_tracking', 'tamm_alert'):
+            key = f'Tamm_Integrations.driver_metrics_{table}_id'
+            since = params.get_param(key)
+            if since:
+                self._mark_dirty_rows(table, SQL("t.id > %s", int(since)))
+                params.set_param(key, False)
+    
+    @api.model
+    def _mark_dirty_rows(self, table, condition):
+        """Queue the (driver, day) pairs of the rows of ``table``, tracking
+        points or alerts, matching the SQL ``condition`` on alias ``t``"""
+        self.env.cr.execute(SQL("""
+            INSERT INTO %(dirty)s (employee_id, date)
+            SELECT DISTINCT COALESCE(t.driver_id, vd.employee_id), t.timestamp::date
+              FROM %(table)s t
+         LEFT JOIN (%(vehicle_driver)s) vd ON vd.vehicle_id = t.vehicle_id
+             WHERE %(condition)s
+               AND COALESCE(t.driver_id, vd.employee_id) IS NOT NULL
+            ON CONFLICT DO NOTHING
+        """, dirty=SQL.identifier(f'{self._table}_dirty'), table=SQL.identifier(table),
+             vehicle_driver=VEHICLE_DRIVER_QUERY, condition=condition))
+    
     @api.depends('speeding_count', 'harsh_braking_count', 'harsh_acceleration_count')
     def _compute_safety_score(self):
         for driver in self:
             base_score = 100.0
-            penalties = (driver.speeding_count * 5) + \
-                       (driver.harsh_braking_count * 3) + \
-                       (driver.harsh_acceleration_count * 2)
+            penalties = sum(driver[fname] * penalty for fname, penalty in self._score_penalties.items())
             driver.safety_score = max(0.0, base_score - penalties)
             
             # Determine category
-            if driver.safety_score >= 90:
-                driver.score_category = 'excellent'
-            elif driver.safety_score >= 75:
-                driver.score_category = 'good'
-            elif driver.safety_score >= 60:
-                driver.score_category = 'average'
-            else:
-                driver.score_category = 'poor'
+            driver.score_category = next(
+                (category for threshold, category in self._score_categories
+                 if driver.safety_score >= threshold), 'poor')
     
     @api.depends('employee_id.name', 'date')
     def _compute_display_name(self):
         for record in self:
             record.display_name = f"{record.employee_id.name} - {record.date}"
+    
+    @api.model
+    def _refresh(self, employee_dates):
+        """Recompute the performance of the given (employee id, date) pairs.
+
+        Metrics are grouped in SQL from tracking points and alerts; points
+        and alerts without a driver go to the employee of the vehicle's
+        driver. Rows are upserted with their score in a single statement;
+        rows of pairs left without points or alerts are reset.
+        """
+        if not employee_dates:
+            return
+        self.env.flush_all()
+        dates = sorted({date for _employee, date in employee_dates})
+        keys = SQL(", ").join(
+            SQL("(%s, %s::date)", employee_id, date) for employee_id, date in employee_dates)
+        self.env.cr.execute(SQL("""
+            UPDATE %s
+               SET speeding_count = 0, harsh_braking_count = 0, harsh_acceleration_count = 0,
+                   idle_time = 0, driving_time = 0, distance_driven = 0,
+                   safety_score = 100, score_category = 'excellent',
+                   write_uid = %s, write_date = now() AT TIME ZONE 'UTC'
+             WHERE (employee_id, date) IN (VALUES %s)
+        """, SQL.identifier(self._table), self.env.uid, keys))
+        penalties = SQL(" + ").join(
+            SQL("m.%s * %s", SQL.identifier(fname), penalty)
+            for fname, penalty in self._score_penalties.items()
+        )
+        categories = SQL(" ").join(
+            SQL("WHEN s.safety_score >= %s THEN %s", threshold, category)
+            for threshold, category in self._score_categories
+        )
+        self.env.cr.execute(SQL("""
+            WITH vehicle_driver AS (
+                %(vehicle_driver)s
+            ), points AS (
+                SELECT COALESCE(t.driver_id, vd.employee_id) AS employee_id,
+                       t.vehicle_id, t.timestamp::date AS day, t.distance, t.engine_status,
+                       LEAST(EXTRACT(EPOCH FROM LEAD(t.timestamp) OVER w - t.timestamp),
+                             %(max_gap)s) AS duration
+                  FROM tamm_tracking t
+             LEFT JOIN vehicle_driver vd ON vd.vehicle_id = t.vehicle_id
+                 WHERE t.timestamp >= %(first)s::date
+                   AND t.timestamp < %(last)s::date + 1
+                   AND t.timestamp::date = ANY(%(dates)s::date[])
+                WINDOW w AS (PARTITION BY t.vehicle_id, t.timestamp::date ORDER BY t.timestamp)
+            ), driving AS (
+                SELECT employee_id, day,
+                       mode() WITHIN GROUP (ORDER BY vehicle_id) AS vehicle_id,
+                       COALESCE(SUM(duration) FILTER (WHERE engine_status = 'on'), 0) / 3600.0 AS driving_time,
+                       COALESCE(SUM(duration) FILTER (WHERE engine_status = 'idle'), 0) / 3600.0 AS idle_time,
+                       COALESCE(SUM(distance), 0) AS distance_driven
+                  FROM points
+                 WHERE employee_id IS NOT NULL
+              GROUP BY employee_id, day
+            ), events AS (
+                SELECT COALESCE(a.driver_id, vd.employee_id) AS employee_id,
+                       a.timestamp::date AS day,
+                       mode() WITHIN GROUP (ORDER BY a.vehicle_id) AS vehicle_id,
+                       COUNT(*) FILTER (WHERE a.alert_type = 'speeding') AS speeding_count,
+                       COUNT(*) FILTER (WHERE a.alert_type = 'harsh_braking') AS harsh_braking_count,
+                       COUNT(*) FILTER (WHERE a.alert_type = 'harsh_acceleration') AS harsh_acceleration_count
+                  FROM tamm_alert a
+             LEFT JOIN vehicle_driver vd ON vd.vehicle_id = a.vehicle_id
+                 WHERE a.timestamp >= %(first)s::date
+                   AND a.timestamp < %(last)s::date + 1
+                   AND a.timestamp::date = ANY(%(dates)s::date[])
+                   AND COALESCE(a.driver_id, vd.employee_id) IS NOT NULL
+              GROUP BY 1, 2
+            ), metrics AS (
+                SELECT COALESCE(d.employee_id, ev.employee_id) AS employee_id,
+                       COALESCE(d.day, ev.day) AS day,
+                       COALESCE(d.vehicle_id, ev.vehicle_id) AS vehicle_id,
+                       COALESCE(ev.speeding_count, 0) AS speeding_count,
+                       COALESCE(ev.harsh_braking_count, 0) AS harsh_braking_count,
+                       COALESCE(ev.harsh_acceleration_count, 0) AS harsh_acceleration_count,
+                       COALESCE(d.idle_time, 0) AS idle_time,
+                       COALESCE(d.driving_time, 0) AS driving_time,
+                       COALESCE(d.distance_driven, 0) AS distance_driven
+                  FROM driving d
+       FULL OUTER JOIN events ev ON ev.employee_id = d.employee_id AND ev.day = d.day
+            ), scored AS (
+                SELECT m.*, GREATEST(0.0, 100.0 - (%(penalties)s)) AS safety_score
+                  FROM metrics m
+                 WHERE (m.employee_id, m.day) IN (VALUES %(keys)s)
+            )
+            INSERT INTO tamm_driver (employee_id, vehicle_id, date, speeding_count,
+                                     harsh_braking_count, harsh_acceleration_count,
+                                     idle_time, driving_time, distance_driven,
+                                     safety_score, score_category, display_name,
+                                     create_uid, create_date, write_uid, write_date)
+            SELECT s.employee_id, s.vehicle_id, s.day, s.speeding_count,
+                   s.harsh_braking_count, s.harsh_acceleration_count,
+                   s.idle_time, s.driving_time, s.distance_driven,
+                   s.safety_score, CASE %(categories)s ELSE 'poor' END,
+                   e.name || ' - ' || s.day::text,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM scored s
+              JOIN hr_employee e ON e.id = s.employee_id
+            ON CONFLICT (employee_id, date) DO UPDATE SET
+                vehicle_id = EXCLUDED.vehicle_id,
+                speeding_count = EXCLUDED.speeding_count,
+                harsh_braking_count = EXCLUDED.harsh_braking_count,
+                harsh_acceleration_count = EXCLUDED.harsh_acceleration_count,
+                idle_time = EXCLUDED.idle_time,
+                driving_time = EXCLUDED.driving_time,
+                distance_driven = EXCLUDED.distance_driven,
+                safety_score = EXCLUDED.safety_score,
+                score_category = EXCLUDED.score_category,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, vehicle_driver=VEHICLE_DRIVER_QUERY, max_gap=DRIVER_MAX_POINT_GAP,
+            first=min(dates), last=max(dates), dates=[str(date) for date in dates],
+            keys=keys, penalties=penalties, categories=categories, uid=self.env.uid))
+        self.invalidate_model()
+    
+    @api.model
+    def _cron_compute_driver_metrics(self):
+        """Recompute driver performance of the (driver, day) pairs queued by
+        changes to tracking points and alerts, a few days per commit"""
+        count = 0
+        while True:
+            self.env.cr.execute(SQL("""
+                DELETE FROM %(dirty)s
+                 WHERE date IN (SELECT DISTINCT date FROM %(dirty)s ORDER BY date LIMIT %(limit)s)
+             RETURNING employee_id, date
+            """, dirty=SQL.identifier(f'{self._table}_dirty'), limit=DRIVER_DAYS_PER_BATCH))
+            employee_dates = self.env.cr.fetchall()
+            if not employee_dates:
+                break
+            self._refresh(employee_dates)
+            self.env.cr.commit()
+            count += len(employee_dates)
+        _logger.info('Tamm driver performance refreshed for %s driver days', count)
@@ -1,15 +1,21 @@
 # models/tamm_fuel.py
 from odoo import models, fields, api, _
-import requests
 import logging
 
 _logger = logging.getLogger(__name__)
 
 class TammFuelLog(models.Model):
     _name = 'tamm.fuel.log'
+    _inherit = ['tamm.ingest.mixin']
     _description = 'Fuel Log'
     _order = 'date desc'
     _rec_name = 'display_name'
+    _tamm_stream = 'fuel'
+    _tamm_records_key = 'fuel_logs'
+    _tamm_cursor_key = 'date'
+    _tamm_natural_key = ['vehicle_id', 'date', 'quantity', 'invoice_reference']
+    _tamm_report_date_field = 'date'
+    _tamm_report_fields = ('quantity', 'price_per_liter', 'total_cost', 'currency_id')
     
     vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
                                  required=True, ondelete='cascade', index=True)
@@ -35,6 +41,28 @@ class TammFuelLog(models.Model):
     ], 'Fuel Type', default='gasoline_91')
     display_name = fields.Char('Display Name', compute='_compute_display_name', store=True)
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.flush_recordset()
+        self.env['tamm.vehicle.stats']._add_fuel(records)
+        return records
+    
+    def write(self, vals):
+        if not {'vehicle_id', 'quantity', 'price_per_liter'}.intersection(vals):
+            return super().write(vals)
+        vehicle_ids = set(self.vehicle_id.ids)
+        res = super().write(vals)
+        vehicle_ids.update(self.vehicle_id.ids)
+        self.env['tamm.vehicle.stats']._recompute(vehicle_ids)
+        return res
+    
+    def unlink(self):
+        vehicle_ids = set(self.vehicle_id.ids)
+        res = super().unlink()
+        self.env['tamm.vehicle.stats']._recompute(vehicle_ids)
+        return res
+    
     @api.depends('quantity', 'price_per_liter')
     def _compute_total_cost(self):
         for log in self:
@@ -52,38 +80,25 @@ class TammFuelLog(models.Model):
             return False
             
         try:
-            response = requests.get(
-                f'{config.api_url}/api/v1/vehicles/{vehicle.tamm_vehicle_id}/fuel',
-                headers=config._get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                for fuel in data.get('fuel_logs', []):
-                    existing = self.search([
-                        ('vehicle_id', '=', vehicle.id),
-                        ('date', '=', fuel.get('date')),
-                        ('quantity', '=', fuel.get('quantity')),
-                        ('invoice_reference', '=', fuel.get('invoice_reference'))
-                    ], limit=1)
-                    
-                    if not existing:
-                        self.create({
-                            'vehicle_id': vehicle.id,
-                            'date': fuel.get('date'),
-                            'quantity': fuel.get('quantity'),
-                            'price_per_liter': fuel.get('price_per_liter', 0.0),
-                            'odometer': fuel.get('odometer', 0.0),
-                            'station_name': fuel.get('station_name', ''),
-                            'invoice_reference': fuel.get('invoice_reference', ''),
-                            'notes': fuel.get('notes', ''),
-                            'fuel_type': fuel.get('fuel_type', 'gasoline_91'),
-                        })
-                
-                return True
+            self.env['tamm.sync.cursor']._sync_stream(self, vehicle, config)
+            return True
                 
         except Exception as e:
             _logger.error(f'Error syncing fuel data for {vehicle.name}: {str(e)}')
             
         return False
+    
+    @api.model
+    def _tamm_prepare_values(self, vehicle, fuel):
+        """Map a Tamm fuel record to fuel log values"""
+        return {
+            'vehicle_id': vehicle.id,
+            'date': fuel.get('date'),
+            'quantity': fuel.get('quantity'),
+            'price_per_liter': fuel.get('price_per_liter', 0.0),
+            'odometer': fuel.get('odometer', 0.0),
+            'station_name': fuel.get('station_name', ''),
+            'invoice_reference': fuel.get('invoice_reference', ''),
+            'notes': fuel.get('notes', ''),
+            'fuel_type': fuel.get('fuel_type', 'gasoline_91'),
+        }
@@ -0,0 +1,193 @@
+# models/tamm_gazetteer.py
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+import logging
+
+from ..tools.geo import geohash_encode, geohash_center
+from ..tools.geocoder import Gazetteer
+
+_logger = logging.getLogger(__name__)
+
+# Parameter counting the changes of the gazetteer; cached addresses of
+# another generation are ignored
+GENERATION_PARAM = 'Tamm_Integrations.gazetteer_generation'
+
+class TammGazetteer(models.Model):
+    _name = 'tamm.gazetteer'
+    _description = 'Gazetteer Place'
+    _order = 'place_type, name'
+    
+    name = fields.Char('Name', required=True)
+    active = fields.Boolean('Active', default=True)
+    place_type = fields.Selection([
+        ('city', 'City'),
+        ('district', 'District'),
+        ('road', 'Road Segment')
+    ], 'Type', required=True, default='city', index=True)
+    latitude = fields.Float('Latitude', required=True, digits=(10, 8))
+    longitude = fields.Float('Longitude', required=True, digits=(11, 8))
+    end_latitude = fields.Float('End Latitude', digits=(10, 8),
+                                help='Other end of a road segment.')
+    end_longitude = fields.Float('End Longitude', digits=(11, 8),
+                                 help='Other end of a road segment.')
+    
+    # Places feed the cached index and addresses, drop both when they change
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['tamm.geocode.cache']._invalidate()
+        return records
+    
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['tamm.geocode.cache']._invalidate()
+        return res
+    
+    def unlink(self):
+        res = super().unlink()
+        self.env['tamm.geocode.cache']._invalidate()
+        return res
+    
+    @api.model
+    @tools.ormcache()
+    def _get_index(self):
+        """Geocoder over all active places, with its address LRU"""
+        places = self.sudo().search_fetch([], ['place_type', 'name', 'latitude', 'longitude',
+                                               'end_latitude', 'end_longitude'])
+        cache_size = int(self.env['ir.config_parameter'].sudo().get_param(
+            'Tamm_Integrations.geocode_cache_size', 100000))
+        return Gazetteer([
+            (place.place_type, place.name, place.latitude, place.longitude,
+             place.end_latitude if place.place_type == 'road' else None,
+             place.end_longitude if place.place_type == 'road' else None)
+            for place in places
+        ], cache_size=cache_size)
+
+    @api.model
+    def action_show_geocode_statistics(self):
+        """Show the hit/miss statistics of the address cache"""
+        return self.env['tamm.geocode.cache'].action_show_statistics()
+
+class TammGeocodeCache(models.Model):
+    _name = 'tamm.geocode.cache'
+    _description = 'Reverse Geocoding Cache'
+    _rec_name = 'geohash'
+    
+    geohash = fields.Char('Geohash', required=True, readonly=True)
+    address = fields.Char('Address', readonly=True)
+    generation = fields.Integer('Gazetteer Generation', readonly=True, default=0)
+    
+    _sql_constraints = [
+        ('geohash_unique', 'unique(geohash)', 
+         'An address is cached once per geohash cell!')
+    ]
+    
+    @api.model
+    def _generation(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(GENERATION_PARAM, 0))
+    
+    @api.model
+    def _invalidate(self):
+        """Drop the index and the cached addresses when the transaction commits.
+
+        However many places an import changes, the generation is bumped
+        once. Cached rows are not deleted: lookups ignore rows of older
+        generations, which are overwritten when resolved again and deleted
+        by the autovacuum.
+        """
+        data = self.env.cr.precommit.data
+        if not data.get('tamm.gazetteer.changed'):
+            data['tamm.gazetteer.changed'] = True
+            self.env.cr.precommit.add(self._bump_generation)
+    
+    def _bump_generation(self):
+        params = self.env['ir.config_parameter'].sudo()
+        # Also clears the index of every worker
+        params.set_param(GENERATION_PARAM, self._generation() + 1)
+        params.flush_model()
+    
+    @api.autovacuum
+    def _gc_stale_addresses(self):
+        """Delete the addresses resolved against an older gazetteer"""
+        self.env.cr.execute(SQL("DELETE FROM tamm_geocode_cache WHERE generation IS DISTINCT FROM %s",
+                                self._generation()))
+    
+    @api.model
+    def _resolve(self, geohashes):
+        """Return {geohash: address} of geohash cells.
+
+        Looked up in the worker's LRU, then in the cache table; the rest is
+        resolved against the gazetteer and stored in both.
+        """
+        index = self.env['tamm.gazetteer']._get_index()
+        if not index or not geohashes:
+            return {}
+        addresses = index.get_cached(geohashes)
+        missing = [geohash for geohash in geohashes if geohash not in addresses]
+        if missing:
+            generation = self._generation()
+            self.env.cr.execute(SQL("""
+                SELECT geohash, address FROM tamm_geocode_cache
+                 WHERE geohash = ANY(%s) AND generation = %s
+            """, missing, generation))
+            stored = dict(self.env.cr.fetchall())
+            resolved = {
+                geohash: index.resolve(*geohash_center(geohash))
+                for geohash in missing if geohash not in stored
+            }
+            if resolved:
+                self.env.cr.execute(SQL("""
+                    INSERT INTO tamm_geocode_cache (geohash, address, generation,
+                                                    create_uid, create_date, write_uid, write_date)
+                    SELECT v.geohash, v.address, %(generation)s,
+                           %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+                      FROM (VALUES %(values)s) AS v(geohash, address)
+                    ON CONFLICT (geohash) DO UPDATE SET
+                        address = EXCLUDED.address,
+                        generation = EXCLUDED.generation,
+                        write_date = EXCLUDED.write_date
+                     WHERE tamm_geocode_cache.generation < EXCLUDED.generation
+                """, uid=self.env.uid, generation=generation, values=SQL(", ").join(
+                    SQL("(%s, %s)", geohash, address) for geohash, address in resolved.items())))
+            index.store({**stored, **resolved})
+            addresses.update(stored)
+            addresses.update(resolved)
+        return addresses
+    
+    @api.model
+    def _fill_addresses(self, vals_list, fname):
+        """Set ``fname`` of the values that have coordinates but no address"""
+        precision = int(self.env['ir.config_parameter'].sudo().get_param(
+            'Tamm_Integrations.geocode_precision', 7))
+        pending = [
+            (vals, geohash_encode(float(vals['latitude']), float(vals['longitude']), precision))
+            for vals in vals_list
+            if not vals.get(fname) and vals.get('latitude') and vals.get('longitude')
+        ]
+        if not pending:
+            return
+        addresses = self._resolve(list({geohash for _vals, geohash in pending}))
+        for vals, geohash in pending:
+            if addresses.get(geohash):
+                vals[fname] = addresses[geohash]
+    
+    @api.model
+    def action_show_statistics(self):
+        """Notify the hit/miss statistics of the address cache"""
+        index = self.env['tamm.gazetteer']._get_index()
+        lookups = index.hits + index.misses
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Address Cache'),
+                'message': _(
+                    '%(entries)s addresses in memory, %(persisted)s persisted. '
+                    '%(hits)s hits, %(misses)s misses (%(ratio).1f%% hit ratio).',
+                    entries=len(index.cache), persisted=self.sudo().search_count([]),
+                    hits=index.hits, misses=index.misses,
+                    ratio=index.hits / lookups * 100 if lookups else 0.0),
+                'type': 'info',
+                'sticky': True,
+            }
+        }
@@ -0,0 +1,173 @@
+# models/tamm_geofence.py
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError
+import logging
+import json
+
+from ..tools.geo import GeofenceIndex
+
+_logger = logging.getLogger(__name__)
+
+class TammGeofence(models.Model):
+    _name = 'tamm.geofence'
+    _description = 'Geofence'
+    _order = 'name'
+    
+    name = fields.Char('Name', required=True)
+    active = fields.Boolean('Active', default=True)
+    company_id = fields.Many2one('res.company', 'Company',
+                                 default=lambda self: self.env.company,
+                                 help='Leave empty to apply the geofence to all companies.')
+    shape = fields.Selection([
+        ('circle', 'Circle'),
+        ('polygon', 'Polygon')
+    ], 'Shape', required=True, default='circle')
+    center_latitude = fields.Float('Center Latitude', digits=(10, 8))
+    center_longitude = fields.Float('Center Longitude', digits=(11, 8))
+    radius = fields.Float('Radius (m)', default=500.0)
+    polygon = fields.Text('Polygon',
+                          help='JSON list of [latitude, longitude] vertices, e.g. '
+                               '[[24.71, 46.67], [24.72, 46.69], [24.70, 46.70]]')
+    alert_on = fields.Selection([
+        ('entry', 'Entry'),
+        ('exit', 'Exit'),
+        ('both', 'Entry and Exit')
+    ], 'Alert On', required=True, default='both')
+    severity = fields.Selection([
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('high', 'High'),
+        ('critical', 'Critical')
+    ], 'Severity', required=True, default='medium')
+    alert_count = fields.Integer('Alerts', compute='_compute_alert_count')
+    
+    _sql_constraints = [
+        ('radius_positive', "CHECK(shape != 'circle' OR radius > 0)",
+         'The radius of a circular geofence must be positive!'),
+    ]
+    
+    @api.constrains('shape', 'polygon')
+    def _check_polygon(self):
+        for fence in self.filtered(lambda f: f.shape == 'polygon'):
+            try:
+                fence._get_vertices()
+            except (ValueError, TypeError):
+                raise ValidationError(_(
+                    'Geofence "%s" needs a polygon of at least three [latitude, longitude] vertices.',
+                    fence.name))
+    
+    def _get_vertices(self):
+        self.ensure_one()
+        vertices = [(float(lat), float(lon)) for lat, lon in json.loads(self.polygon or '')]
+        if len(vertices) < 3:
+            raise ValueError('not enough vertices')
+        return vertices
+    
+    def _compute_alert_count(self):
+        counts = dict(self.env['tamm.alert']._read_group(
+            [('geofence_id', 'in', self.ids)], ['geofence_id'], ['__count']))
+        for fence in self:
+            fence.alert_count = counts.get(fence, 0)
+    
+    # The spatial index is cached per worker, drop it whenever fences change
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+    
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+    
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+    
+    @api.model
+    @tools.ormcache()
+    def _get_spatial_index(self):
+        """Grid index of all active geofences"""
+        index = GeofenceIndex()
+        for fence in self.sudo().with_context(active_test=True).search([]):
+            if fence.shape == 'circle':
+                index.add_circle(fence.id, fence.company_id.id, fence.center_latitude,
+                                 fence.center_longitude, fence.radius)
+            else:
+                index.add_polygon(fence.id, fence.company_id.id, fence._get_vertices())
+        return index
+    
+    @api.model
+    def _evaluate_tracking(self, tracking):
+        """Create entry/exit alerts for a batch of new tracking points.
+
+        The fences a vehicle was in before the batch come from its previous
+        stored point, so transitions are detected across batches as well.
+        """
+        index = self._get_spatial_index()
+        if not index.fences or not tracking:
+            return self.env['tamm.alert']
+        
+        points = {}
+        for record in tracking.sorted('timestamp'):
+            points.setdefault(record.vehicle_id, []).append(record)
+        previous = self.env['tamm.tracking']._tamm_previous_points({
+            vehicle.id: records[0].timestamp for vehicle, records in points.items()
+        })
+        
+        transitions = []
+        for vehicle, records in points.items():
+            company_id = vehicle.company_id.id
+            inside = set()
+            if vehicle.id in previous:
+                _timestamp, lat, lon = previous[vehicle.id]
+                inside = index.lookup(lat, lon, company_id=company_id)
+            for record in records:
+                current = index.lookup(record.latitude, record.longitude, company_id=company_id)
+                transitions.extend((record, fence_id, 'entry') for fence_id in current - inside)
+                transitions.extend((record, fence_id, 'exit') for fence_id in inside - current)
+                inside = current
+        if not transitions:
+            return self.env['tamm.alert']
+        
+        fences = self.sudo().browse({fence_id for _record, fence_id, _event in transitions})
+        fences = {fence.id: fence for fence in fences}
+        vals_list = []
+        for record, fence_id, event in transitions:
+            fence = fences[fence_id]
+            if fence.alert_on not in (event, 'both'):
+                continue
+            if event == 'entry':
+                description = _('%(vehicle)s entered geofence %(fence)s',
+                                vehicle=record.vehicle_id.name, fence=fence.name)
+            else:
+                description = _('%(vehicle)s left geofence %(fence)s',
+                                vehicle=record.vehicle_id.name, fence=fence.name)
+            vals_list.append({
+                'vehicle_id': record.vehicle_id.id,
+                'driver_id': record.driver_id.id,
+                'timestamp': record.timestamp,
+                'alert_type': 'geofence_violation',
+                'geofence_id': fence.id,
+                'geofence_event': event,
+                'severity': fence.severity,
+                'description': description,
+                'latitude': record.latitude,
+                'longitude': record.longitude,
+                'location_address': record.address,
+            })
+        alerts, _skipped = self.env['tamm.alert'].sudo()._tamm_ingest(vals_list)
+        return alerts
+    
+    def action_view_alerts(self):
+        """View the alerts raised by this geofence"""
+        self.ensure_one()
+        return {
+            'name': _('Geofence Alerts'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'tamm.alert',
+            'view_mode': 'list,form',
+            'domain': [('geofence_id', '=', self.id)],
+        }
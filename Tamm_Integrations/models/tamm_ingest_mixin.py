@@ -0,0 +1,262 @@
+# models/tamm_ingest_mixin.py
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from psycopg2.errors import UniqueViolation
+import logging
+
+_logger = logging.getLogger(__name__)
+
+class TammIngestMixin(models.AbstractModel):
+    _name = 'tamm.ingest.mixin'
+    _description = 'Tamm Bulk Ingest Mixin'
+    
+    # Fields identifying a Tamm record; the first two must be the vehicle
+    # and the record time, they are used to prefetch existing rows.
+    _tamm_natural_key = ['vehicle_id']
+    # Date field feeding tamm.report, whose rows are refreshed on changes
+    _tamm_report_date_field = None
+    # Other fields aggregated by tamm.report; writing any other field
+    # leaves the report alone
+    _tamm_report_fields = ()
+    # Fields feeding tamm.driver; changing one queues the (driver, day)
+    # pairs of the records for recomputation. Models listing them have
+    # timestamp and driver_id fields.
+    _tamm_driver_fields = ()
+    # Address field filled from the local gazetteer when Tamm sends none
+    _tamm_address_field = None
+    # Payload keys every pushed record must carry; without its time a
+    # redelivered record could not be recognized
+    _tamm_push_required = ()
+    
+    # Columns of the unique index of ingested records; a partitioned table
+    # must add its partition key
+    _tamm_key_index_columns = ('tamm_key',)
+    
+    tamm_key = fields.Char('Tamm Key', readonly=True, copy=False,
+                           help='Natural key of a record received from Tamm; '
+                                'empty on records entered by hand.')
+    
+    def init(self):
+        super().init()
+        if not self._abstract:
+            self._tamm_create_key_index()
+    
+    @api.model
+    def _tamm_create_key_index(self):
+        """Keep a record received from Tamm from being stored twice.
+
+        Only rows that came from Tamm are constrained: records entered by
+        hand, and rows stored before the key was kept, may share a natural
+        key.
+        """
+        cr = self.env.cr
+        index = f'{self._table}_tamm_key_unique'
+        # Index of previous versions over the natural key of every row
+        cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(f'{self._table}_tamm_key_index')))
+        if not tools.sql.index_exists(cr, index):
+            cr.execute(SQL("CREATE UNIQUE INDEX %s ON %s (%s) WHERE tamm_key IS NOT NULL",
+                           SQL.identifier(index), SQL.identifier(self._table),
+                           SQL(", ").join(map(SQL.identifier, self._tamm_key_index_columns))))
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._tamm_mark_report_dirty()
+        records._tamm_mark_driver_dirty()
+        return records
+    
+    def write(self, vals):
+        # The rows the records leave must be refreshed too
+        report_moved = bool(self._tamm_report_date_field) and (
+            'vehicle_id' in vals or self._tamm_report_date_field in vals)
+        driver_moved = any(fname in vals for fname in ('vehicle_id', 'timestamp', 'driver_id')
+                           if fname in self._tamm_driver_fields)
+        if report_moved:
+            self._tamm_mark_report_dirty()
+        if driver_moved:
+            self._tamm_mark_driver_dirty()
+        res = super().write(vals)
+        if report_moved or (self._tamm_report_date_field
+                            and any(fname in vals for fname in self._tamm_report_fields)):
+            self._tamm_mark_report_dirty()
+        if any(fname in vals for fname in self._tamm_driver_fields):
+            self._tamm_mark_driver_dirty()
+        return res
+    
+    def unlink(self):
+        self._tamm_mark_report_dirty()
+        self._tamm_mark_driver_dirty()
+        return super().unlink()
+    
+    def _tamm_mark_report_dirty(self):
+        """Queue the report rows of the records for refresh"""
+        if self._tamm_report_date_field:
+            self.env['tamm.report']._mark_dirty({
+                (record.vehicle_id.id, record[self._tamm_report_date_field])
+                for record in self
+            })
+    
+    def _tamm_mark_driver_dirty(self):
+        """Queue the driver performance days of the records for refresh"""
+        if self._tamm_driver_fields and self:
+            self.flush_recordset(list(self._tamm_driver_fields))
+            self.env['tamm.driver']._mark_dirty_rows(self._table, SQL("t.id = ANY(%s)", self.ids))
+    
+    @api.model
+    def _tamm_prepare_values(self, vehicle, record):
+        """Return the create values of one record of a Tamm payload.
+
+        By default the payload keys naming stored, non-computed, non
+        relational fields are copied as they are; models override it to
+        rename keys or provide defaults.
+        """
+        values = {
+            key: value for key, value in record.items()
+            if key in self._fields and key not in models.MAGIC_COLUMNS and key != 'tamm_key'
+            and self._fields[key].store and not self._fields[key].compute
+            and not self._fields[key].relational
+        }
+        values['vehicle_id'] = vehicle.id
+        return values
+    
+    @api.model
+    def _tamm_process_payload(self, vehicle, data):
+        """Store a Tamm payload, return the (inserted, skipped) counts"""
+        vals_list = [
+            self._tamm_prepare_values(vehicle, record)
+            for record in data.get(self._tamm_records_key) or []
+        ]
+        inserted, skipped = self._tamm_ingest(vals_list)
+        return len(inserted), skipped
+    
+    @api.model
+    def _tamm_ingest_push(self, config, records):
+        """Store records pushed by Tamm for the vehicles of ``config``'s company.
+
+        Every record names its vehicle by Tamm vehicle ID in ``vehicle_id``.
+        Invalid records are rejected one by one without failing the push.
+        Returns the inserted, skipped, unknown vehicle and rejected counts,
+        and the position and reason of every rejected record.
+        """
+        tamm_ids = {str(record['vehicle_id']) for record in records if record.get('vehicle_id')}
+        vehicles = self.env['fleet.vehicle'].search([
+            ('tamm_vehicle_id', 'in', list(tamm_ids)),
+            ('company_id', '=', config.company_id.id),
+        ])
+        vehicles_by_tamm_id = {vehicle.tamm_vehicle_id: vehicle for vehicle in vehicles}
+        
+        vals_list = []
+        unknown = 0
+        errors = []
+        for index, record in enumerate(records):
+            missing = [key for key in ('vehicle_id',) + tuple(self._tamm_push_required)
+                       if record.get(key) in (None, '')]
+            if missing:
+                errors.append({'index': index, 'error': f"missing {', '.join(missing)}"})
+                continue
+            vehicle = vehicles_by_tamm_id.get(str(record['vehicle_id']))
+            if not vehicle:
+                unknown += 1
+                continue
+            vals = self._tamm_prepare_values(vehicle, record)
+            error = self._tamm_validate_values(vals)
+            if error:
+                errors.append({'index': index, 'error': error})
+                continue
+            vals_list.append(vals)
+        
+        inserted, skipped = self._tamm_ingest(vals_list)
+        return {
+            'inserted': len(inserted),
+            'skipped': skipped,
+            'unknown_vehicles': unknown,
+            'rejected': len(errors),
+            'errors': errors,
+        }
+    
+    @api.model
+    def _tamm_validate_values(self, vals):
+        """Return why ``vals`` cannot be stored, None if they can"""
+        for fname, value in vals.items():
+            field = self._fields[fname]
+            empty = value is None or value is False or value == ''
+            if field.required and empty:
+                return f'missing {fname}'
+            if field.relational or empty:
+                continue
+            try:
+                field.convert_to_cache(value, self)
+            except (ValueError, TypeError):
+                return f'invalid {fname}: {value!r}'
+        return None
+    
+    @api.model
+    def _tamm_ingest(self, vals_list):
+        """Entry point of every Tamm ingestion, polled or pushed.
+
+        Returns the created records and the number of skipped values;
+        override to post-process new records.
+        """
+        if self._tamm_address_field:
+            self.env['tamm.geocode.cache']._fill_addresses(vals_list, self._tamm_address_field)
+        return self._tamm_bulk_ingest(vals_list)
+    
+    @api.model
+    def _tamm_key_value(self, fname, value):
+        """Normalize a natural key value so payload and database values compare"""
+        field = self._fields[fname]
+        if field.type == 'many2one':
+            return value.id if isinstance(value, models.BaseModel) else (value or False)
+        return field.convert_to_cache(value, self) or False
+    
+    @api.model
+    def _tamm_bulk_ingest(self, vals_list):
+        """Create the rows of ``vals_list`` that do not exist yet.
+
+        Existing natural keys are prefetched with a single query and the new
+        rows are created with a single batched create. The push webhook and
+        the sync may ingest the same records concurrently: new rows carry
+        their natural key in ``tamm_key``, and when its unique index rejects
+        the batch, the rows are created one by one and the ones already
+        stored by the other transaction are skipped. Returns the created
+        records and the number of skipped values.
+        """
+        if not vals_list:
+            return self.browse(), 0
+        
+        key_fields = self._tamm_natural_key
+        vehicle_field, time_field = key_fields[0], key_fields[1]
+        
+        def make_key(vals):
+            return tuple(self._tamm_key_value(fname, vals.get(fname)) for fname in key_fields)
+        
+        existing = self.search_fetch([
+            (vehicle_field, 'in', list({vals[vehicle_field] for vals in vals_list})),
+            (time_field, 'in', list({vals[time_field] for vals in vals_list if vals.get(time_field)})),
+        ], key_fields)
+        seen = {
+            tuple(self._tamm_key_value(fname, record[fname]) for fname in key_fields)
+            for record in existing
+        }
+        
+        new_vals_list = []
+        for vals in vals_list:
+            key = make_key(vals)
+            if key not in seen:
+                seen.add(key)
+                new_vals_list.append({**vals, 'tamm_key': '|'.join(map(str, key))})
+        
+        if not new_vals_list:
+            return self.browse(), len(vals_list)
+        try:
+            with self.env.cr.savepoint():
+                records = self.create(new_vals_list)
+        except UniqueViolation:
+            records = self.browse()
+            for vals in new_vals_list:
+                try:
+                    with self.env.cr.savepoint():
+                        records |= self.create(vals)
+                except UniqueViolation:
+                    continue
+        return records, len(vals_list) - len(records)
@@ -2,16 +2,20 @@
 # models/tamm_maintenance.py
 from odoo import models, fields, api, _
 from dateutil.relativedelta import relativedelta
-import requests
 import logging
 
 _logger = logging.getLogger(__name__)
 
 class TammMaintenance(models.Model):
     _name = 'tamm.maintenance'
+    _inherit = ['tamm.ingest.mixin']
     _description = 'Vehicle Maintenance'
     _order = 'due_date desc, date desc'
     _rec_name = 'name'
+    _tamm_stream = 'maintenance'
+    _tamm_records_key = 'maintenance_records'
+    _tamm_cursor_key = 'date'
+    _tamm_natural_key = ['vehicle_id', 'date', 'name']
     
     name = fields.Char('Maintenance Type', required=True)
     vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
@@ -54,43 +58,30 @@ class TammMaintenance(models.Model):
             return False
             
         try:
-            response = requests.get(
-                f'{config.api_url}/api/v1/vehicles/{vehicle.tamm_vehicle_id}/maintenance',
-                headers=config._get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                for maint in data.get('maintenance_records', []):
-                    # Check if exists
-                    existing = self.search([
-                        ('vehicle_id', '=', vehicle.id),
-                        ('name', '=', maint.get('name')),
-                        ('date', '=', maint.get('date'))
-                    ], limit=1)
-                    
-                    if not existing:
-                        self.create({
-                            'vehicle_id': vehicle.id,
-                            'name': maint.get('name'),
-                            'date': maint.get('date'),
-                            'due_date': maint.get('due_date'),
-                            'odometer': maint.get('odometer', 0.0),
-                            'cost': maint.get('cost', 0.0),
-                            'notes': maint.get('notes', ''),
-                            'state': maint.get('state', 'scheduled'),
-                            'maintenance_type': maint.get('type', 'other'),
-                            'service_center': maint.get('service_center', ''),
-                        })
-                
-                return True
+            self.env['tamm.sync.cursor']._sync_stream(self, vehicle, config)
+            return True
                 
         except Exception as e:
             _logger.error(f'Error syncing maintenance for {vehicle.name}: {str(e)}')
             
         return False
     
+    @api.model
+    def _tamm_prepare_values(self, vehicle, maint):
+        """Map a Tamm maintenance record to maintenance values"""
+        return {
+            'vehicle_id': vehicle.id,
+            'name': maint.get('name'),
+            'date': maint.get('date'),
+            'due_date': maint.get('due_date'),
+            'odometer': maint.get('odometer', 0.0),
+            'cost': maint.get('cost', 0.0),
+            'notes': maint.get('notes', ''),
+            'state': maint.get('state', 'scheduled'),
+            'maintenance_type': maint.get('type', 'other'),
+            'service_center': maint.get('service_center', ''),
+        }
+    
     @api.model
     def _cron_check_due_maintenance(self):
         """Check and update due maintenance status"""
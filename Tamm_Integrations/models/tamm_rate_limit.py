@@ -0,0 +1,133 @@
+# models/tamm_rate_limit.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+class TammRateLimit(models.Model):
+    _name = 'tamm.rate.limit'
+    _description = 'Tamm API Rate Limit State'
+    _rec_name = 'config_id'
+    
+    config_id = fields.Many2one('tamm.config', 'Configuration', 
+                                required=True, ondelete='cascade', readonly=True)
+    tokens = fields.Float('Tokens', readonly=True)
+    refilled_at = fields.Datetime('Refilled At', readonly=True)
+    consecutive_failures = fields.Integer('Consecutive Failures', readonly=True)
+    open_until = fields.Datetime('Paused Until', readonly=True,
+                                 help='The circuit breaker skips the configuration until then.')
+    
+    _sql_constraints = [
+        ('config_unique', 'unique(config_id)', 
+         'Only one rate limit state per configuration is allowed!')
+    ]
+    
+    # The state is shared by every worker syncing a configuration, so it is
+    # read and written in short transactions of their own, committed at once.
+    
+    @api.model
+    def _execute(self, config, query, ensure=True):
+        """Run ``query`` on the state of ``config`` in its own transaction"""
+        with self.env.registry.cursor() as cr:
+            if ensure:
+                cr.execute(SQL("""
+                    INSERT INTO tamm_rate_limit (config_id, tokens, refilled_at, consecutive_failures,
+                                                 create_uid, create_date, write_uid, write_date)
+                    VALUES (%(config)s, %(burst)s, clock_timestamp() AT TIME ZONE 'UTC', 0,
+                            %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC')
+                    ON CONFLICT (config_id) DO NOTHING
+                """, config=config.id, burst=float(config.rate_burst), uid=self.env.uid))
+            cr.execute(query)
+            return cr.fetchone() if cr.description else None
+    
+    @api.model
+    def _acquire(self, config, wanted):
+        """Take up to ``wanted`` request tokens from the bucket of ``config``.
+
+        Returns the number of tokens granted and, when none were, the
+        seconds until the next one is available.
+        """
+        rate, burst = float(config.rate_limit), float(config.rate_burst)
+        granted, tokens = self._execute(config, SQL("""
+            WITH bucket AS (
+                SELECT id, LEAST(%(burst)s, tokens + %(rate)s * EXTRACT(EPOCH FROM
+                           (clock_timestamp() AT TIME ZONE 'UTC') - refilled_at)) AS tokens
+                  FROM tamm_rate_limit
+                 WHERE config_id = %(config)s
+                   FOR UPDATE
+            )
+            UPDATE tamm_rate_limit r
+               SET tokens = b.tokens - GREATEST(0, LEAST(floor(b.tokens), %(wanted)s)),
+                   refilled_at = clock_timestamp() AT TIME ZONE 'UTC'
+              FROM bucket b
+             WHERE r.id = b.id
+         RETURNING GREATEST(0, LEAST(floor(b.tokens), %(wanted)s))::int, b.tokens::float8
+        """, config=config.id, burst=burst, rate=rate, wanted=int(wanted))) or (0, 0.0)
+        wait = 0.0 if granted else max(1.0 - (tokens or 0.0), 0.0) / rate
+        return granted, wait
+    
+    @api.model
+    def _release(self, config, tokens):
+        """Give back tokens taken but not spent"""
+        if tokens > 0:
+            self._execute(config, SQL("""
+                UPDATE tamm_rate_limit
+                   SET tokens = LEAST(%(burst)s, tokens + %(tokens)s)
+                 WHERE config_id = %(config)s
+            """, config=config.id, burst=float(config.rate_burst), tokens=float(tokens)), ensure=False)
+    
+    @api.model
+    def _pause(self, config, seconds):
+        """Empty the bucket of ``config`` for ``seconds`` (Retry-After)"""
+        self._execute(config, SQL("""
+            UPDATE tamm_rate_limit
+               SET tokens = LEAST(tokens, -%(rate)s * %(seconds)s),
+                   refilled_at = clock_timestamp() AT TIME ZONE 'UTC'
+             WHERE config_id = %(config)s
+        """, config=config.id, rate=float(config.rate_limit), seconds=float(seconds)))
+        _logger.warning('Tamm API asked %s to wait %.0fs', config.name, seconds)
+    
+    @api.model
+    def _is_open(self, config):
+        """Whether the circuit breaker of ``config`` currently pauses it"""
+        row = self._execute(config, SQL("""
+            SELECT open_until > clock_timestamp() AT TIME ZONE 'UTC'
+              FROM tamm_rate_limit
+             WHERE config_id = %s
+        """, config.id), ensure=False)
+        return bool(row and row[0])
+    
+    @api.model
+    def _record_outcome(self, config, succeeded, trailing_failures):
+        """Update the circuit breaker after a sync.
+
+        ``trailing_failures`` counts the failures since the last success of
+        the sync. The breaker opens for the cooldown once the consecutive
+        failures reach the threshold, and any success closes it.
+        """
+        row = self._execute(config, SQL("""
+            UPDATE tamm_rate_limit
+               SET consecutive_failures = CASE WHEN %(succeeded)s THEN %(failures)s
+                                               ELSE consecutive_failures + %(failures)s END,
+                   open_until = CASE
+                       WHEN (CASE WHEN %(succeeded)s THEN %(failures)s
+                                  ELSE consecutive_failures + %(failures)s END) >= %(threshold)s
+                       THEN clock_timestamp() AT TIME ZONE 'UTC' + make_interval(secs => %(cooldown)s)
+                       WHEN %(succeeded)s THEN NULL
+                       ELSE open_until END
+             WHERE config_id = %(config)s
+         RETURNING open_until > clock_timestamp() AT TIME ZONE 'UTC'
+        """, config=config.id, succeeded=bool(succeeded), failures=int(trailing_failures),
+            threshold=config.breaker_threshold, cooldown=float(config.breaker_cooldown)))
+        if row and row[0]:
+            _logger.warning('Tamm circuit breaker opened for %s for %ss',
+                            config.name, config.breaker_cooldown)
+    
+    def action_reset(self):
+        """Close the circuit breaker and refill the bucket"""
+        for state in self:
+            state.write({'consecutive_failures': 0, 'open_until': False,
+                         'tokens': state.config_id.rate_burst,
+                         'refilled_at': fields.Datetime.now()})
+        return True
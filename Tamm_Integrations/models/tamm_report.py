@@ -1,4 +1,8 @@
 from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
 
 class TammReport(models.Model):
     _name = 'tamm.report'
@@ -18,34 +22,165 @@ class TammReport(models.Model):
     idle_time = fields.Float('Idle Time (hours)', readonly=True, digits=(5, 2))
     alert_count = fields.Integer('Number of Alerts', readonly=True)
 
+    # Columns of the report table and their information_schema data type
+    _report_columns = {
+        'id': 'integer',
+        'vehicle_id': 'integer',
+        'date': 'date',
+        'currency_id': 'integer',
+        'total_distance': 'numeric',
+        'total_fuel': 'numeric',
+        'total_cost': 'numeric',
+        'average_speed': 'numeric',
+        'fuel_efficiency': 'numeric',
+        'driving_time': 'numeric',
+        'idle_time': 'numeric',
+        'alert_count': 'integer',
+    }
+
     def init(self):
+        # The report used to be a view joining raw rows; it is now a table
+        # refreshed per (vehicle, date), see _refresh(). The table only holds
+        # derived data, so when its columns differ from _report_columns it is
+        # dropped and rebuilt rather than altered.
         tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute("""
-            CREATE OR REPLACE VIEW %s AS (
-                SELECT
-                    row_number() OVER () AS id,
-                    t.vehicle_id,
-                    DATE(t.timestamp) AS date,
-                    COALESCE(MAX(f.currency_id), NULL) AS currency_id,
-                    SUM(t.distance) AS total_distance,
-                    COALESCE(SUM(f.quantity), 0) AS total_fuel,
-                    COALESCE(SUM(f.total_cost), 0) AS total_cost,
-                    AVG(t.speed) AS average_speed,
-                    CASE 
-                        WHEN SUM(f.quantity) > 0 
-                        THEN SUM(t.distance) / SUM(f.quantity)
-                        ELSE 0
-                    END AS fuel_efficiency,
-                    SUM(CASE WHEN t.engine_status = 'on' THEN 1 ELSE 0 END) / 60.0 AS driving_time,
-                    SUM(CASE WHEN t.engine_status = 'idle' THEN 1 ELSE 0 END) / 60.0 AS idle_time,
-                    COUNT(a.id) AS alert_count
-                FROM tamm_tracking t
-                LEFT JOIN tamm_fuel_log f 
-                    ON f.vehicle_id = t.vehicle_id 
-                    AND DATE(f.date) = DATE(t.timestamp)
-                LEFT JOIN tamm_alert a 
-                    ON a.vehicle_id = t.vehicle_id 
-                    AND DATE(a.timestamp) = DATE(t.timestamp)
-                GROUP BY t.vehicle_id, DATE(t.timestamp)
+        self.env.cr.execute(SQL("""
+            SELECT column_name, data_type
+              FROM information_schema.columns
+             WHERE table_schema = current_schema() AND table_name = %s
+        """, self._table))
+        columns = dict(self.env.cr.fetchall())
+        if columns == self._report_columns:
+            return
+        if columns:
+            _logger.info('Rebuilding %s after a change of its columns', self._table)
+        self.env.cr.execute(SQL("""
+            DROP TABLE IF EXISTS %(table)s;
+            CREATE TABLE %(table)s (
+                id SERIAL PRIMARY KEY,
+                vehicle_id INTEGER NOT NULL REFERENCES fleet_vehicle(id) ON DELETE CASCADE,
+                date DATE NOT NULL,
+                currency_id INTEGER,
+                total_distance NUMERIC,
+                total_fuel NUMERIC,
+                total_cost NUMERIC,
+                average_speed NUMERIC,
+                fuel_efficiency NUMERIC,
+                driving_time NUMERIC,
+                idle_time NUMERIC,
+                alert_count INTEGER
+            );
+            CREATE UNIQUE INDEX %(index)s ON %(table)s (vehicle_id, date);
+            CREATE TABLE IF NOT EXISTS %(dirty)s (
+                vehicle_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                PRIMARY KEY (vehicle_id, date)
+            );
+        """, table=SQL.identifier(self._table),
+             index=SQL.identifier(f'{self._table}_vehicle_date_index'),
+             dirty=SQL.identifier(f'{self._table}_dirty')))
+        self._refresh()
+
+    @api.model
+    def _mark_dirty(self, vehicle_dates):
+        """Queue (vehicle id, date or datetime) pairs for the next refresh"""
+        rows = [
+            SQL("(%s, %s::date)", vehicle_id, value)
+            for vehicle_id, value in vehicle_dates if vehicle_id and value
+        ]
+        if not rows:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO %s (vehicle_id, date) VALUES %s
+            ON CONFLICT DO NOTHING
+        """, SQL.identifier(f'{self._table}_dirty'), SQL(", ").join(rows)))
+
+    @api.model
+    def _refresh(self, vehicle_dates=None):
+        """Recompute the report rows of the given (vehicle id, date) pairs.
+
+        Tracking, fuel and alerts are aggregated on their own per vehicle
+        and date before being joined, so no source multiplies another.
+        Without pairs the whole report is rebuilt.
+        """
+        self.env.flush_all()
+        if vehicle_dates is None:
+            keys = None
+            self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        else:
+            if not vehicle_dates:
+                return
+            keys = SQL(", ").join(
+                SQL("(%s, %s::date)", vehicle_id, date) for vehicle_id, date in vehicle_dates)
+            self.env.cr.execute(SQL(
+                "DELETE FROM %s WHERE (vehicle_id, date) IN (VALUES %s)",
+                SQL.identifier(self._table), keys))
+
+        def restrict(vehicle_column, date_expression):
+            if keys is None:
+                return SQL("TRUE")
+            return SQL("(%s, %s) IN (VALUES %s)", vehicle_column, date_expression, keys)
+
+        self.env.cr.execute(SQL("""
+            INSERT INTO %(table)s (vehicle_id, date, currency_id, total_distance, total_fuel,
+                                   total_cost, average_speed, fuel_efficiency, driving_time,
+                                   idle_time, alert_count)
+            WITH tracking AS (
+                SELECT vehicle_id,
+                       period_start::date AS date,
+                       SUM(distance) AS distance,
+                       SUM(speed_sum) AS speed_sum,
+                       SUM(point_count) AS point_count,
+                       SUM(engine_on_minutes) AS engine_on_minutes,
+                       SUM(idle_minutes) AS idle_minutes
+                  FROM tamm_tracking_daily
+                 WHERE %(tracking_keys)s
+                 GROUP BY vehicle_id, period_start::date
+            ), fuel AS (
+                SELECT vehicle_id,
+                       DATE(date) AS date,
+                       MAX(currency_id) AS currency_id,
+                       SUM(quantity) AS quantity,
+                       SUM(total_cost) AS total_cost
+                  FROM tamm_fuel_log
+                 WHERE %(fuel_keys)s
+                 GROUP BY vehicle_id, DATE(date)
+            ), alerts AS (
+                SELECT vehicle_id,
+                       DATE(timestamp) AS date,
+                       COUNT(*) AS alert_count
+                  FROM tamm_alert
+                 WHERE %(alert_keys)s
+                 GROUP BY vehicle_id, DATE(timestamp)
             )
-        """ % self._table)
+            SELECT t.vehicle_id,
+                   t.date,
+                   f.currency_id,
+                   t.distance,
+                   COALESCE(f.quantity, 0),
+                   COALESCE(f.total_cost, 0),
+                   t.speed_sum / NULLIF(t.point_count, 0),
+                   CASE
+                       WHEN f.quantity > 0
+                       THEN t.distance / f.quantity
+                       ELSE 0
+                   END,
+                   t.engine_on_minutes / 60.0,
+                   t.idle_minutes / 60.0,
+                   COALESCE(a.alert_count, 0)
+              FROM tracking t
+              LEFT JOIN fuel f ON f.vehicle_id = t.vehicle_id AND f.date = t.date
+              LEFT JOIN alerts a ON a.vehicle_id = t.vehicle_id AND a.date = t.date
+        """, table=SQL.identifier(self._table),
+             tracking_keys=restrict(SQL("vehicle_id"), SQL("period_start::date")),
+             fuel_keys=restrict(SQL("vehicle_id"), SQL("DATE(date)")),
+             alert_keys=restrict(SQL("vehicle_id"), SQL("DATE(timestamp)"))))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh(self):
+        """Refresh the report rows queued by changes to their sources"""
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s RETURNING vehicle_id, date",
+            SQL.identifier(f'{self._table}_dirty')))
+        self._refresh(self.env.cr.fetchall())
@@ -1,6 +1,11 @@
 
 # models/tamm_route.py
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from datetime import timedelta
+import numpy as np
+
+from ..tools.route_optimizer import solve_route
 
 class TammRoute(models.Model):
     _name = 'tamm.route'
@@ -40,6 +45,11 @@ class TammRoute(models.Model):
     currency_id = fields.Many2one('res.currency', 
                                   default=lambda self: self.env.company.currency_id)
     notes = fields.Text('Notes')
+    detected = fields.Boolean('Detected from Tracking', readonly=True,
+                              help='Created automatically from the tracking history of the vehicle.')
+    stop_ids = fields.One2many('tamm.route.stop', 'route_id', 'Stops', copy=True)
+    planning_speed = fields.Float('Planning Speed (km/h)', default=50.0,
+                                  help='Average speed used to estimate travel times when optimizing.')
     
     @api.depends('start_time', 'end_time')
     def _compute_duration(self):
@@ -64,3 +74,98 @@ class TammRoute(models.Model):
     
     def action_cancel(self):
         self.write({'status': 'cancelled'})
+    
+    def _get_start_point(self):
+        """Start coordinates of the route, else the live position of the vehicle"""
+        self.ensure_one()
+        if self.start_latitude or self.start_longitude:
+            return self.start_latitude, self.start_longitude
+        if self.vehicle_id.tamm_position_id:
+            return self.vehicle_id.current_latitude, self.vehicle_id.current_longitude
+        raise UserError(_('Set a start location or wait for a position of %s before optimizing.',
+                          self.vehicle_id.name))
+    
+    def action_optimize(self):
+        """Order the stops of planned routes and fill their estimates.
+
+        Stops are ordered with a nearest-neighbour tour improved by 2-opt
+        and or-opt moves, never missing more of the stop time windows.
+        """
+        for route in self:
+            if route.status != 'planned':
+                raise UserError(_('Only planned routes can be optimized.'))
+            stops = route.stop_ids
+            if not stops:
+                raise UserError(_('Add stops to route %s before optimizing it.', route.name))
+            
+            start_lat, start_lon = route._get_start_point()
+            fixed_end = bool(route.end_latitude or route.end_longitude)
+            lats = [start_lat] + stops.mapped('latitude')
+            lons = [start_lon] + stops.mapped('longitude')
+            windows = [(-np.inf, np.inf)] + [stop._get_window() for stop in stops]
+            service = [0.0] + [stop.service_minutes / 60.0 for stop in stops]
+            if fixed_end:
+                lats.append(route.end_latitude)
+                lons.append(route.end_longitude)
+                windows.append((-np.inf, np.inf))
+                service.append(0.0)
+            
+            local_start = fields.Datetime.context_timestamp(route, route.start_time)
+            start_hour = local_start.hour + local_start.minute / 60.0 + local_start.second / 3600.0
+            has_windows = any(stop.window_end for stop in stops)
+            matrix = self.env['tamm.distance.cache']._get_distance_matrix(lats, lons)
+            order, distance, arrivals, _lateness = solve_route(
+                lats, lons, max(route.planning_speed, 1.0),
+                windows=np.array(windows) if has_windows else None,
+                service=np.array(service), start_time=start_hour, fixed_end=fixed_end,
+                matrix=matrix)
+            
+            for sequence, (node, arrival) in enumerate(zip(order, arrivals)):
+                if 1 <= node <= len(stops):
+                    stop = stops[node - 1]
+                    stop.write({
+                        'sequence': sequence,
+                        'eta': route.start_time + timedelta(hours=arrival - start_hour),
+                        'late': bool(stop.window_end) and arrival > stop.window_end,
+                    })
+            
+            stats = route.vehicle_id._get_tamm_stats().get(route.vehicle_id.id)
+            fuel_estimate = distance * route.vehicle_id.average_fuel_consumption / 100.0
+            price_per_liter = stats.fuel_cost / stats.fuel_quantity if stats and stats.fuel_quantity else 0.0
+            route.write({
+                'optimized': True,
+                'planned_distance': distance,
+                'duration_estimate': arrivals[-1] - start_hour,
+                'fuel_estimate': fuel_estimate,
+                'cost_estimate': fuel_estimate * price_per_liter,
+            })
+        return True
+
+class TammRouteStop(models.Model):
+    _name = 'tamm.route.stop'
+    _description = 'Route Stop'
+    _order = 'route_id, sequence, id'
+    
+    route_id = fields.Many2one('tamm.route', 'Route', 
+                               required=True, ondelete='cascade', index=True)
+    sequence = fields.Integer('Sequence', default=10)
+    name = fields.Char('Stop', required=True)
+    address = fields.Char('Address')
+    latitude = fields.Float('Latitude', required=True, digits=(10, 8))
+    longitude = fields.Float('Longitude', required=True, digits=(11, 8))
+    window_start = fields.Float('Window Start', help='Earliest arrival time, in hours of the route day.')
+    window_end = fields.Float('Window End', help='Latest arrival time, in hours of the route day. '
+                                                 'Leave empty for no time window.')
+    service_minutes = fields.Float('Service Time (min)', default=0.0)
+    eta = fields.Datetime('Estimated Arrival', readonly=True)
+    late = fields.Boolean('Late', readonly=True,
+                          help='The optimized route reaches the stop after its time window.')
+    
+    _sql_constraints = [
+        ('window_valid', 'CHECK(window_end = 0 OR window_end >= window_start)',
+         'The time window of a stop must end after it starts!'),
+    ]
+    
+    def _get_window(self):
+        self.ensure_one()
+        return (self.window_start, self.window_end or np.inf)
@@ -0,0 +1,149 @@
+# models/tamm_sync_cursor.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Pages of one vehicle stream followed in a single sync; the cursor of
+# the next page is kept for the next sync
+SYNC_MAX_PAGES = 50
+
+class TammSyncCursor(models.Model):
+    _name = 'tamm.sync.cursor'
+    _description = 'Tamm Sync Cursor'
+    _order = 'vehicle_id, stream'
+    _rec_name = 'stream'
+    
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
+                                 required=True, ondelete='cascade', index=True)
+    stream = fields.Selection([
+        ('fuel', 'Fuel'),
+        ('maintenance', 'Maintenance'),
+        ('alerts', 'Alerts')
+    ], 'Stream', required=True)
+    cursor = fields.Char('Cursor', readonly=True,
+                         help='Opaque cursor returned by Tamm for the next page of records.')
+    since = fields.Datetime('Since', readonly=True,
+                            help='Time of the newest record ingested for this stream.')
+    last_sync = fields.Datetime('Last Sync', readonly=True)
+    
+    _sql_constraints = [
+        ('vehicle_stream_unique', 'unique(vehicle_id, stream)', 
+         'Only one cursor per vehicle and stream is allowed!')
+    ]
+    
+    def _auto_init(self):
+        # Previous versions stored ``since`` as text
+        cr = self.env.cr
+        cr.execute(SQL("""
+            SELECT data_type FROM information_schema.columns
+             WHERE table_name = %s AND column_name = 'since'
+        """, self._table))
+        row = cr.fetchone()
+        if row and row[0] == 'character varying':
+            cr.execute(SQL("""
+                ALTER TABLE %s ALTER COLUMN since TYPE timestamp
+                USING CASE WHEN since ~ %s THEN replace(left(since, 19), 'T', ' ')::timestamp END
+            """, SQL.identifier(self._table), r'^\d{4}-\d{2}-\d{2}'))
+        return super()._auto_init()
+    
+    @api.model
+    def _get_request_params(self, vehicles, stream_models):
+        """Return the Tamm query parameters of every (vehicle id, stream)
+        pair of ``stream_models``"""
+        models_by_stream = {model._tamm_stream: model for model in stream_models}
+        params = {}
+        for cursor in self.search([
+            ('vehicle_id', 'in', vehicles.ids),
+            ('stream', 'in', list(models_by_stream)),
+        ]):
+            if cursor.cursor:
+                params[cursor.vehicle_id.id, cursor.stream] = {'cursor': cursor.cursor}
+            elif cursor.since:
+                params[cursor.vehicle_id.id, cursor.stream] = {
+                    'since': self._format_since(models_by_stream[cursor.stream], cursor.since),
+                }
+        return params
+    
+    @api.model
+    def _format_since(self, model, since):
+        """Format ``since`` the way the records of ``model`` carry their time"""
+        if model._fields[model._tamm_cursor_key].type == 'date':
+            return fields.Date.to_string(since)
+        return fields.Datetime.to_string(since)
+    
+    @api.model
+    def _get_payload_position(self, model, data, since=None):
+        """Return the (cursor, since) a payload of ``model`` ends at.
+
+        ``since`` is the newest time of the previous pages, kept when the
+        payload holds no newer record.
+        """
+        records = data.get(model._tamm_records_key) or []
+        stamps = [since] if since else []
+        for record in records:
+            value = record.get(model._tamm_cursor_key)
+            try:
+                stamp = fields.Datetime.to_datetime(str(value)[:19].replace('T', ' ')) if value else None
+            except ValueError:
+                _logger.warning('Ignoring unreadable %s time %r', model._tamm_stream, value)
+                continue
+            if stamp:
+                stamps.append(stamp)
+        return data.get('next_cursor') or False, max(stamps) if stamps else False
+    
+    @api.model
+    def _advance(self, positions):
+        """Store new positions given as {(vehicle id, stream): (cursor, since)}.
+
+        Written with a single upsert. The cursor is replaced, cleared after
+        the last page; the since time only moves forward.
+        """
+        rows = [
+            SQL("(%s, %s, %s, %s::timestamp)", vehicle_id, stream, cursor or None, since or None)
+            for (vehicle_id, stream), (cursor, since) in positions.items()
+        ]
+        if not rows:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO tamm_sync_cursor (vehicle_id, stream, cursor, since, last_sync,
+                                          create_uid, create_date, write_uid, write_date)
+            SELECT v.vehicle_id, v.stream, v.cursor, v.since, now() AT TIME ZONE 'UTC',
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM (VALUES %(rows)s) AS v(vehicle_id, stream, cursor, since)
+            ON CONFLICT (vehicle_id, stream) DO UPDATE SET
+                cursor = EXCLUDED.cursor,
+                since = GREATEST(tamm_sync_cursor.since, EXCLUDED.since),
+                last_sync = EXCLUDED.last_sync,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, uid=self.env.uid, rows=SQL(", ").join(rows)))
+        self.invalidate_model()
+    
+    @api.model
+    def _sync_stream(self, model, vehicle, config):
+        """Fetch, store and advance one vehicle stream, following up to
+        SYNC_MAX_PAGES pages.
+
+        Returns the (inserted, skipped) counts of the stored payloads.
+        """
+        key = (vehicle.id, model._tamm_stream)
+        params = self._get_request_params(vehicle, [model]).get(key)
+        inserted = skipped = 0
+        for _page in range(SYNC_MAX_PAGES):
+            data = config._tamm_fetch(vehicle.tamm_vehicle_id, model._tamm_stream, params=params)
+            counts = model._tamm_process_payload(vehicle, data)
+            inserted += counts[0]
+            skipped += counts[1]
+            cursor, since = self._get_payload_position(model, data)
+            self._advance({key: (cursor, since)})
+            if not cursor:
+                break
+            params = {'cursor': cursor}
+        return inserted, skipped
+    
+    def action_reset(self):
+        """Forget the cursor so the next sync downloads the full history"""
+        self.write({'cursor': False, 'since': False})
+        return True
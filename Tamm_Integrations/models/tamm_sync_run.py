@@ -0,0 +1,128 @@
+# models/tamm_sync_run.py
+from odoo import models, fields, api, _
+from datetime import timedelta
+import logging
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+SYNC_STREAMS = [
+    ('location', 'Location'),
+    ('fuel', 'Fuel'),
+    ('maintenance', 'Maintenance'),
+    ('alerts', 'Alerts'),
+]
+
+class TammSyncRun(models.Model):
+    _name = 'tamm.sync.run'
+    _description = 'Tamm Sync Run'
+    _order = 'date_start desc, id desc'
+    _rec_name = 'date_start'
+    
+    config_id = fields.Many2one('tamm.config', 'Configuration',
+                                required=True, ondelete='cascade', index=True, readonly=True)
+    company_id = fields.Many2one(related='config_id.company_id', store=True)
+    trigger = fields.Selection([
+        ('cron', 'Scheduled'),
+        ('manual', 'Manual')
+    ], 'Trigger', readonly=True)
+    date_start = fields.Datetime('Started', required=True, index=True, readonly=True)
+    date_end = fields.Datetime('Ended', readonly=True)
+    duration = fields.Float('Duration (s)', digits=(10, 2), readonly=True, aggregator='avg')
+    status = fields.Selection([
+        ('success', 'Success'),
+        ('partial', 'Partial'),
+        ('failed', 'Failed')
+    ], 'Status', readonly=True, index=True)
+    error = fields.Text('Last Error', readonly=True)
+    vehicle_count = fields.Integer('Vehicles', readonly=True)
+    succeeded_count = fields.Integer('Vehicles Synced', readonly=True)
+    failed_count = fields.Integer('Vehicles Failed', readonly=True)
+    request_count = fields.Integer('Requests', readonly=True)
+    retry_count = fields.Integer('Retries', readonly=True)
+    fetched_count = fields.Integer('Records Fetched', readonly=True)
+    inserted_count = fields.Integer('Records Inserted', readonly=True)
+    skipped_count = fields.Integer('Records Skipped', readonly=True)
+    throughput = fields.Float('Throughput (req/s)', digits=(10, 2), readonly=True, aggregator='avg')
+    line_ids = fields.One2many('tamm.sync.run.line', 'run_id', 'Endpoints', readonly=True)
+    
+    @api.model
+    def _log_run(self, config, trigger, date_start, duration, result, latencies, error=None):
+        """Record a sync from the result of ``fleet.vehicle._tamm_sync_vehicles``.
+    
+        ``latencies`` maps every stream to the durations in seconds of its
+        HTTP requests.
+        """
+        streams = result['streams']
+        lines = []
+        for stream, values in streams.items():
+            samples = np.array(latencies.get(stream) or [0.0]) * 1000.0
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            lines.append({
+                'stream': stream,
+                'requests': values['requests'],
+                'failed': values['failed'],
+                'retried': values['retried'],
+                'fetched': values['fetched'],
+                'inserted': values['inserted'],
+                'skipped': values['skipped'],
+                'latency_p50': p50,
+                'latency_p90': p90,
+                'latency_p99': p99,
+                'latency_max': samples.max(),
+                'throughput': values['requests'] / duration if duration else 0.0,
+            })
+        request_count = sum(values['requests'] for values in streams.values())
+        return self.sudo().create({
+            'config_id': config.id,
+            'trigger': trigger,
+            'date_start': date_start,
+            'date_end': date_start + timedelta(seconds=duration),
+            'duration': duration,
+            'status': result['status'],
+            'error': error,
+            'vehicle_count': result['vehicles'],
+            'succeeded_count': result['succeeded'],
+            'failed_count': result['failed'],
+            'request_count': request_count,
+            'retry_count': sum(values['retried'] for values in streams.values()),
+            'fetched_count': sum(values['fetched'] for values in streams.values()),
+            'inserted_count': sum(values['inserted'] for values in streams.values()),
+            'skipped_count': sum(values['skipped'] for values in streams.values()),
+            'throughput': request_count / duration if duration else 0.0,
+            'line_ids': [fields.Command.create(line) for line in lines],
+        })
+    
+    @api.autovacuum
+    def _gc_sync_runs(self):
+        """Delete the runs older than the retention period"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'Tamm_Integrations.sync_run_retention_days', 90))
+        if days > 0:
+            self.sudo().search([
+                ('date_start', '<', fields.Datetime.now() - timedelta(days=days)),
+            ]).unlink()
+
+class TammSyncRunLine(models.Model):
+    _name = 'tamm.sync.run.line'
+    _description = 'Tamm Sync Run Endpoint'
+    _order = 'run_id, stream'
+    _rec_name = 'stream'
+    
+    run_id = fields.Many2one('tamm.sync.run', 'Run',
+                             required=True, ondelete='cascade', index=True)
+    config_id = fields.Many2one(related='run_id.config_id', store=True)
+    date_start = fields.Datetime(related='run_id.date_start', store=True)
+    stream = fields.Selection(SYNC_STREAMS, 'Endpoint', required=True)
+    requests = fields.Integer('Requests')
+    failed = fields.Integer('Failed')
+    retried = fields.Integer('Retried')
+    fetched = fields.Integer('Fetched')
+    inserted = fields.Integer('Inserted')
+    skipped = fields.Integer('Skipped')
+    # Request durations in milliseconds; averaged when grouped
+    latency_p50 = fields.Float('Latency p50 (ms)', digits=(10, 1), aggregator='avg')
+    latency_p90 = fields.Float('Latency p90 (ms)', digits=(10, 1), aggregator='avg')
+    latency_p99 = fields.Float('Latency p99 (ms)', digits=(10, 1), aggregator='avg')
+    latency_max = fields.Float('Latency Max (ms)', digits=(10, 1), aggregator='max')
+    throughput = fields.Float('Throughput (req/s)', digits=(10, 2), aggregator='avg')
@@ -1,28 +1,63 @@
 
 # models/tamm_tracking.py
-from odoo import models, fields, api, _
-import requests
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+from dateutil.relativedelta import relativedelta
+from datetime import datetime
 import logging
+import re
+import time
+
+from ..tools.geo import douglas_peucker, encode_polyline, segment_motion
 
 _logger = logging.getLogger(__name__)
 
+# Monthly partitions created ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+# Rows measured per backfill chunk and seconds a backfill run may take
+MOTION_BACKFILL_CHUNK = 5000
+MOTION_BACKFILL_TIME_BUDGET = 240
+
+# Points read per query when streaming a track
+TRACK_CHUNK = 10000
+
+EPOCH = datetime(1970, 1, 1)
+
 class TammTracking(models.Model):
     _name = 'tamm.tracking'
+    _inherit = ['tamm.ingest.mixin']
     _description = 'Vehicle Tracking'
     _order = 'timestamp desc'
     _rec_name = 'display_name'
+    _tamm_stream = 'location'
+    _tamm_records_key = False
+    _tamm_natural_key = ['vehicle_id', 'timestamp']
+    _tamm_report_date_field = 'timestamp'
+    _tamm_report_fields = ('distance', 'speed', 'engine_status')
+    _tamm_address_field = 'address'
+    _tamm_push_required = ('timestamp', 'latitude', 'longitude')
+    _tamm_key_index_columns = ('tamm_key', 'timestamp')
+    _tamm_driver_fields = ('vehicle_id', 'timestamp', 'driver_id', 'distance', 'engine_status')
     
+    # vehicle_id and timestamp are indexed together in init()
     vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
-                                 required=True, ondelete='cascade', index=True)
+                                 required=True, ondelete='cascade')
     driver_id = fields.Many2one('hr.employee', 'Driver')
     timestamp = fields.Datetime('Timestamp', required=True, 
-                               default=fields.Datetime.now, index=True)
+                               default=fields.Datetime.now)
     latitude = fields.Float('Latitude', required=True, digits=(10, 8))
     longitude = fields.Float('Longitude', required=True, digits=(11, 8))
     speed = fields.Float('Speed (km/h)', digits=(5, 2))
     heading = fields.Float('Heading (degrees)', digits=(5, 2))
     altitude = fields.Float('Altitude (m)', digits=(7, 2))
-    distance = fields.Float('Distance (km)', digits=(10, 2))
+    distance = fields.Float('Distance (km)', digits=(10, 2),
+                            help='Great-circle distance from the previous point of the vehicle.')
+    computed_speed = fields.Float('Computed Speed (km/h)', digits=(7, 2), readonly=True,
+                                  help='Speed implied by the distance and time from the previous point.')
+    gps_jump = fields.Boolean('GPS Jump', readonly=True,
+                              help='The point is too far from the previous one to be reached in time; '
+                                   'its distance is not counted.')
     engine_status = fields.Selection([
         ('on', 'Engine On'),
         ('off', 'Engine Off'),
@@ -31,6 +66,57 @@ class TammTracking(models.Model):
     address = fields.Char('Address')
     display_name = fields.Char('Display Name', compute='_compute_display_name', store=True)
     
+    def init(self):
+        # A (vehicle, time) index serves per-vehicle history in place of
+        # the single column B-trees; a small BRIN index serves time range
+        # scans.
+        super().init()
+        self.env.cr.execute(SQL(
+            "DROP INDEX IF EXISTS tamm_tracking_vehicle_id_index, tamm_tracking_timestamp_index"))
+        tools.create_index(self.env.cr, 'tamm_tracking_vehicle_timestamp_index',
+                           self._table, ['vehicle_id', 'timestamp'])
+        tools.create_index(self.env.cr, 'tamm_tracking_timestamp_brin_index',
+                           self._table, ['timestamp'], method='brin')
+        # Rows still to be measured by the motion backfill
+        tools.create_index(self.env.cr, 'tamm_tracking_motion_pending_index',
+                           self._table, ['vehicle_id', 'timestamp'],
+                           where='computed_speed IS NULL')
+    
+    _tamm_rollup_models = ['tamm.tracking.hourly', 'tamm.tracking.daily']
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.flush_recordset()
+        for model_name in self._tamm_rollup_models:
+            self.env[model_name]._rollup_add(records)
+        self.env['tamm.vehicle.stats']._add_tracking(records)
+        return records
+    
+    def write(self, vals):
+        rollup_fields = {'vehicle_id', 'timestamp', 'distance', 'speed', 'engine_status'}
+        if not rollup_fields.intersection(vals):
+            return super().write(vals)
+        periods = {(record.vehicle_id.id, record.timestamp) for record in self}
+        res = super().write(vals)
+        self.flush_recordset()
+        periods.update((record.vehicle_id.id, record.timestamp) for record in self)
+        self._tamm_refresh_rollups(periods)
+        return res
+    
+    def unlink(self):
+        periods = {(record.vehicle_id.id, record.timestamp) for record in self}
+        res = super().unlink()
+        self._tamm_refresh_rollups(periods)
+        return res
+    
+    @api.model
+    def _tamm_refresh_rollups(self, periods):
+        self.env.flush_all()
+        for model_name in self._tamm_rollup_models:
+            self.env[model_name]._rollup_refresh(periods)
+        self.env['tamm.vehicle.stats']._recompute({vehicle_id for vehicle_id, _timestamp in periods})
+    
     @api.depends('vehicle_id.name', 'timestamp')
     def _compute_display_name(self):
         for record in self:
@@ -43,43 +129,532 @@ class TammTracking(models.Model):
             return False
             
         try:
-            response = requests.get(
-                f'{config.api_url}/api/v1/vehicles/{vehicle.tamm_vehicle_id}/location',
-                headers=config._get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                vals = {
-                    'vehicle_id': vehicle.id,
-                    'timestamp': data.get('timestamp', fields.Datetime.now()),
-                    'latitude': data.get('latitude'),
-                    'longitude': data.get('longitude'),
-                    'speed': data.get('speed', 0.0),
-                    'heading': data.get('heading', 0.0),
-                    'altitude': data.get('altitude', 0.0),
-                    'distance': data.get('distance', 0.0),
-                    'engine_status': data.get('engine_status', 'off'),
-                    'address': data.get('address', ''),
-                }
-                
-                # Create tracking record
-                self.create(vals)
-                
-                # Update vehicle current location
-                vehicle.write({
-                    'current_latitude': data.get('latitude'),
-                    'current_longitude': data.get('longitude'),
-                    'current_speed': data.get('speed', 0.0),
-                    'current_heading': data.get('heading', 0.0),
-                    'last_location_update': fields.Datetime.now(),
-                })
-                
-                return True
+            data = config._tamm_fetch(vehicle.tamm_vehicle_id, self._tamm_stream)
+            self._tamm_process_payload(vehicle, data)
+            return True
                 
         except Exception as e:
             _logger.error(f'Error syncing location for {vehicle.name}: {str(e)}')
             
         return False
+    
+    @api.model
+    def _tamm_prepare_values(self, vehicle, data):
+        """Map a Tamm location payload to tracking values"""
+        return {
+            'vehicle_id': vehicle.id,
+            'timestamp': data.get('timestamp', fields.Datetime.now()),
+            'latitude': data.get('latitude'),
+            'longitude': data.get('longitude'),
+            'speed': data.get('speed', 0.0),
+            'heading': data.get('heading', 0.0),
+            'altitude': data.get('altitude', 0.0),
+            'distance': data.get('distance', 0.0),
+            'engine_status': data.get('engine_status', 'off'),
+            'address': data.get('address', ''),
+        }
+    
+    @api.model
+    def _tamm_process_payload(self, vehicle, data):
+        """Store a location payload, return the (inserted, skipped) counts"""
+        # Create tracking record, unless Tamm sent the same fix again
+        inserted, skipped = self._tamm_ingest([self._tamm_prepare_values(vehicle, data)])
+        return len(inserted), skipped
+    
+    @api.model
+    def _tamm_ingest(self, vals_list):
+        self._tamm_derive_motion(vals_list)
+        records, skipped = super()._tamm_ingest(vals_list)
+        
+        # Update vehicles current location from their newest new point
+        latest = {}
+        for record in records:
+            current = latest.get(record.vehicle_id.id)
+            if not current or record.timestamp > current.timestamp:
+                latest[record.vehicle_id.id] = record
+        self.env['tamm.vehicle.position']._upsert_from_tracking(list(latest.values()))
+        
+        self.env['tamm.geofence']._evaluate_tracking(records)
+        
+        return records, skipped
+    
+    # ------------------------------------------------------------------
+    # Motion
+    # ------------------------------------------------------------------
+    
+    @api.model
+    def _tamm_previous_points(self, first_points):
+        """Return {vehicle id: (timestamp, lat, lon)} of the stored point
+        preceding each given {vehicle id: timestamp}"""
+        if not first_points:
+            return {}
+        values = SQL(", ").join(
+            SQL("(%s, %s::timestamp)", vehicle_id, timestamp)
+            for vehicle_id, timestamp in first_points.items()
+        )
+        self.env.cr.execute(SQL("""
+            SELECT batch.vehicle_id, prev.timestamp, prev.latitude, prev.longitude
+              FROM (VALUES %s) AS batch(vehicle_id, timestamp)
+             CROSS JOIN LATERAL (
+                    SELECT t.timestamp, t.latitude, t.longitude
+                      FROM tamm_tracking t
+                     WHERE t.vehicle_id = batch.vehicle_id
+                       AND t.timestamp < batch.timestamp
+                  ORDER BY t.timestamp DESC
+                     LIMIT 1) AS prev
+        """, values))
+        return {
+            vehicle_id: (timestamp, lat, lon)
+            for vehicle_id, timestamp, lat, lon in self.env.cr.fetchall()
+        }
+    
+    @api.model
+    def _tamm_measure(self, points):
+        """Measure (vehicle id, timestamp, lat, lon) points sorted by vehicle
+        and time against their predecessors.
+
+        Returns a (distance, computed speed, GPS jump) tuple per point.
+        """
+        max_speed = float(self.env['ir.config_parameter'].sudo().get_param(
+            'Tamm_Integrations.max_plausible_speed', 300))
+        first_points = {}
+        for vehicle_id, timestamp, _lat, _lon in points:
+            first_points.setdefault(vehicle_id, timestamp)
+        previous = {
+            vehicle_id: ((timestamp - EPOCH).total_seconds(), lat, lon)
+            for vehicle_id, (timestamp, lat, lon) in self._tamm_previous_points(first_points).items()
+        }
+        distances, speeds, jumps = segment_motion([
+            (vehicle_id, (timestamp - EPOCH).total_seconds(), lat, lon)
+            for vehicle_id, timestamp, lat, lon in points
+        ], previous, max_speed)
+        return [
+            (float(distance), float(speed), bool(jump))
+            for distance, speed, jump in zip(distances, speeds, jumps)
+        ]
+    
+    @api.model
+    def _tamm_derive_motion(self, vals_list):
+        """Fill distance, computed speed and GPS jump of new tracking values
+        from the previous point of their vehicle"""
+        rows = []
+        for vals in vals_list:
+            timestamp = fields.Datetime.to_datetime(vals.get('timestamp'))
+            if not timestamp or vals.get('latitude') is None or vals.get('longitude') is None:
+                continue
+            rows.append((vals['vehicle_id'], timestamp, float(vals['latitude']),
+                         float(vals['longitude']), vals))
+        rows.sort(key=lambda row: (row[0], row[1]))
+        
+        measures = self._tamm_measure([row[:4] for row in rows])
+        for row, (distance, speed, jump) in zip(rows, measures):
+            row[4].update({'distance': distance, 'computed_speed': speed, 'gps_jump': jump})
+    
+    @api.model
+    def _cron_backfill_motion(self):
+        """Measure stored points that have no computed speed yet.
+
+        Rows are processed in (vehicle, time) chunks, each committed with
+        its rollups and ledger refreshed; the cron is re-triggered when the
+        time budget is spent.
+        """
+        started = time.monotonic()
+        while True:
+            self.env.cr.execute(SQL("""
+                SELECT id, vehicle_id, timestamp, latitude, longitude
+                  FROM tamm_tracking
+                 WHERE computed_speed IS NULL
+              ORDER BY vehicle_id, timestamp, id
+                 LIMIT %s
+            """, MOTION_BACKFILL_CHUNK))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return
+            
+            measures = self._tamm_measure([row[1:] for row in rows])
+            self.env.cr.execute(SQL("""
+                UPDATE tamm_tracking t
+                   SET distance = m.distance, computed_speed = m.speed, gps_jump = m.jump
+                  FROM (VALUES %s) AS m(id, distance, speed, jump)
+                 WHERE t.id = m.id
+            """, SQL(", ").join(
+                SQL("(%s, %s::float8, %s::float8, %s::bool)", row[0], distance, speed, jump)
+                for row, (distance, speed, jump) in zip(rows, measures)
+            )))
+            self.invalidate_model(['distance', 'computed_speed', 'gps_jump'])
+            self._tamm_refresh_rollups({(row[1], row[2]) for row in rows})
+            self.env.cr.commit()
+            _logger.info('Tamm motion backfill measured %s tracking points', len(rows))
+            
+            if time.monotonic() - started > MOTION_BACKFILL_TIME_BUDGET:
+                self.env.ref('Tamm_Integrations.ir_cron_backfill_tracking_motion')._trigger()
+                return
+    
+    # ------------------------------------------------------------------
+    # Playback
+    # ------------------------------------------------------------------
+    
+    @api.model
+    def get_track(self, vehicle_id, date_from, date_to, zoom=12):
+        """Return the simplified path of a vehicle between two datetimes.
+
+        Points are read in (vehicle, timestamp) keyset chunks and each chunk
+        is simplified with Douglas-Peucker at about one screen pixel of
+        ``zoom``, so memory stays bounded on long ranges. GPS jumps are left
+        out. The path comes back as an encoded polyline with the time of
+        each point as seconds: the first since the epoch, then deltas.
+        """
+        vehicle = self.env['fleet.vehicle'].browse(vehicle_id)
+        vehicle.check_access('read')
+        self.check_access('read')
+        tolerance = 360.0 / (256 * 2 ** int(zoom))
+        date_from = fields.Datetime.to_datetime(date_from)
+        date_to = fields.Datetime.to_datetime(date_to)
+        
+        lats, lons, seconds = [], [], []
+        source_points = 0
+        after = None
+        while True:
+            self.env.cr.execute(SQL("""
+                SELECT timestamp, latitude::float8, longitude::float8
+                  FROM tamm_tracking
+                 WHERE vehicle_id = %s
+                   AND timestamp %s %s
+                   AND timestamp <= %s
+                   AND gps_jump IS NOT TRUE
+              ORDER BY timestamp
+                 LIMIT %s
+            """, vehicle.id, SQL(">" if after else ">="), after or date_from, date_to, TRACK_CHUNK))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            source_points += len(rows)
+            after = rows[-1][0]
+            
+            # Chunks are simplified separately, joined on their last kept point
+            chunk_lats = lats[-1:] + [row[1] for row in rows]
+            chunk_lons = lons[-1:] + [row[2] for row in rows]
+            chunk_seconds = seconds[-1:] + [int((row[0] - EPOCH).total_seconds()) for row in rows]
+            kept = douglas_peucker(chunk_lats, chunk_lons, tolerance).tolist()
+            if lats:
+                kept = kept[1:]
+            lats.extend(chunk_lats[i] for i in kept)
+            lons.extend(chunk_lons[i] for i in kept)
+            seconds.extend(chunk_seconds[i] for i in kept)
+            if len(rows) < TRACK_CHUNK:
+                break
+        
+        return {
+            'polyline': encode_polyline(lats, lons) if lats else '',
+            'times': seconds[:1] + [b - a for a, b in zip(seconds, seconds[1:])],
+            'points': len(lats),
+            'source_points': source_points,
+        }
+    
+    # ------------------------------------------------------------------
+    # Storage maintenance
+    # ------------------------------------------------------------------
+    
+    @api.model
+    def _tamm_is_partitioned(self):
+        self.env.cr.execute(SQL(
+            "SELECT relkind FROM pg_class WHERE relname = %s AND relkind = 'p'", self._table))
+        return bool(self.env.cr.rowcount)
+    
+    @api.model
+    def _tamm_partitions(self):
+        """Return {partition name: month start} of the monthly partitions"""
+        self.env.cr.execute(SQL("""
+            SELECT child.relname
+              FROM pg_inherits
+              JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+              JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+             WHERE parent.relname = %s
+        """, self._table))
+        prefix = f'{self._table}_p'
+        return {
+            name: fields.Datetime.to_datetime(f'{name[len(prefix):].replace("_", "-")}-01')
+            for name, in self.env.cr.fetchall()
+            if name.startswith(prefix)
+        }
+    
+    @api.model
+    def _tamm_legacy_bound(self):
+        """Return the end of the legacy partition, None if there is none"""
+        self.env.cr.execute(SQL("""
+            SELECT pg_get_expr(child.relpartbound, child.oid)
+              FROM pg_inherits
+              JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+             WHERE child.relname = %s
+        """, f'{self._table}_legacy'))
+        row = self.env.cr.fetchone()
+        bound = row and re.search(r"TO \('([^']+)'\)", row[0])
+        return fields.Datetime.to_datetime(bound.group(1)) if bound else None
+    
+    @api.model
+    def _tamm_create_partitions(self, first_month, last_month):
+        """Create the missing monthly partitions from first to last month"""
+        existing = set(self._tamm_partitions().values())
+        # Months before the end of the legacy partition are stored in it
+        first_month = max(first_month, self._tamm_legacy_bound() or first_month)
+        month = first_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        while month <= last_month:
+            if month not in existing:
+                self.env.cr.execute(SQL(
+                    "CREATE TABLE %s PARTITION OF %s FOR VALUES FROM (%s) TO (%s)",
+                    SQL.identifier(f'{self._table}_p{month:%Y_%m}'),
+                    SQL.identifier(self._table),
+                    month, month + relativedelta(months=1),
+                ))
+            month += relativedelta(months=1)
+    
+    @api.model
+    def _tamm_rebuildable_views(self):
+        """Return the models whose SQL views read tamm_tracking.
+
+        Returns None when the table is referenced by a foreign key or by a
+        view no model can recreate, as the conversion would break them.
+        """
+        cr = self.env.cr
+        cr.execute(SQL("""
+            SELECT conrelid::regclass::text
+              FROM pg_constraint
+             WHERE contype = 'f' AND confrelid = %s::regclass
+        """, self._table))
+        references = [name for name, in cr.fetchall()]
+        cr.execute(SQL("""
+            SELECT DISTINCT view.relname
+              FROM pg_depend dependency
+              JOIN pg_rewrite rule ON rule.oid = dependency.objid
+              JOIN pg_class view ON view.oid = rule.ev_class
+             WHERE dependency.classid = 'pg_rewrite'::regclass
+               AND dependency.refobjid = %s::regclass
+               AND view.oid != dependency.refobjid
+        """, self._table))
+        views = {name for name, in cr.fetchall()}
+        view_models = [
+            self.env[name] for name, model in self.env.registry.items()
+            if not model._auto and not model._abstract and model._table in views
+        ]
+        unmanaged = views - {model._table for model in view_models}
+        if references or unmanaged:
+            _logger.error(f'Cannot partition {self._table}: it is referenced by '
+                          f'{", ".join(sorted(references + list(unmanaged)))}')
+            return None
+        return view_models
+    
+    @api.model
+    def _tamm_build_index_concurrently(self, index, columns):
+        """Build a unique index without blocking writes to the table.
+
+        CREATE INDEX CONCURRENTLY cannot run in a transaction, so it runs on
+        a connection of its own in autocommit mode; the caller must not
+        hold a lock on the table. An invalid index left by an interrupted
+        build is dropped and built again.
+        """
+        with self.env.registry.cursor() as cr:
+            cr._cnx.autocommit = True
+            cr.execute(SQL("""
+                SELECT x.indisvalid
+                  FROM pg_index x
+                  JOIN pg_class i ON i.oid = x.indexrelid
+                 WHERE i.relname = %s
+            """, index))
+            row = cr.fetchone()
+            if row and row[0]:
+                return
+            if row:
+                cr.execute(SQL("DROP INDEX CONCURRENTLY %s", SQL.identifier(index)))
+            cr.execute(SQL("CREATE UNIQUE INDEX CONCURRENTLY %s ON %s (%s)",
+                           SQL.identifier(index), SQL.identifier(self._table),
+                           SQL(", ").join(map(SQL.identifier, columns))))
+    
+    @api.model
+    def _tamm_copy_legacy_indexes(self, legacy):
+        """Give the partitioned table the indexes of its legacy partition.
+
+        Each index is created on the parent only and the legacy index is
+        attached to it, so nothing is built. Unique indexes without
+        ``timestamp`` cannot exist on the partitioned table and are left
+        on the legacy partition.
+        """
+        cr = self.env.cr
+        cr.execute(SQL("""
+            SELECT i.relname, pg_get_indexdef(i.oid),
+                   x.indisunique AND NOT EXISTS (
+                       SELECT 1 FROM pg_attribute a
+                        WHERE a.attrelid = x.indrelid AND a.attname = 'timestamp'
+                          AND a.attnum = ANY(x.indkey))
+              FROM pg_index x
+              JOIN pg_class i ON i.oid = x.indexrelid
+             WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+        """, legacy))
+        for index, definition, unpartitionable in cr.fetchall():
+            if unpartitionable or not index.startswith(f'{legacy}_'):
+                _logger.warning(f'Index {index} is kept on {legacy} only')
+                continue
+            name = self._table + index[len(legacy):]
+            definition = re.sub(
+                r'^(CREATE (?:UNIQUE )?INDEX) \S+ ON (?:\S+\.)?\S+ ',
+                lambda match: f'{match.group(1)} "{name}" ON ONLY "{self._table}" ',
+                definition)
+            cr.execute(SQL(definition))
+            cr.execute(SQL("ALTER INDEX %s ATTACH PARTITION %s",
+                           SQL.identifier(name), SQL.identifier(index)))
+    
+    @api.model
+    def _tamm_convert_to_partitioned(self):
+        """Turn tamm_tracking into a table partitioned by month of timestamp.
+
+        The history is not copied: the existing table is attached as the
+        ``legacy`` partition of every row before the first monthly
+        partition. Its range CHECK constraint is validated and its
+        (id, timestamp) primary key, which PostgreSQL requires on
+        partitioned tables, is built concurrently first, so inserts go on
+        meanwhile and the exclusive lock only covers the swap. Foreign keys
+        and indexes of the table are carried over to the partitioned table;
+        SQL views of other models are dropped and recreated. Foreign keys
+        to the table or views no model owns prevent the conversion.
+
+        The preparation is committed before the swap, which runs in one
+        transaction. When either fails, the range check and the extra index
+        are removed again so the table is left as it was, and the next run
+        of the storage cron starts over.
+
+        Columns added to tamm.tracking later are added to every partition
+        by PostgreSQL, but its unique constraints must include
+        ``timestamp`` and no foreign key can reference it. Returns whether
+        the table was converted.
+        """
+        cr = self.env.cr
+        view_models = self._tamm_rebuildable_views()
+        if view_models is None:
+            return False
+        self.env.flush_all()
+        legacy = f'{self._table}_legacy'
+        range_check = f'{legacy}_range'
+        id_index = f'{self._table}_id_timestamp_index'
+        _logger.info('Converting %s to monthly partitions', self._table)
+        try:
+            self._tamm_swap_partitioned(view_models, legacy, range_check, id_index)
+        except Exception as e:
+            cr.rollback()
+            _logger.error(f'Converting {self._table} to partitions failed, it is left as it was: {str(e)}')
+            if not self._tamm_is_partitioned():
+                cr.execute(SQL("ALTER TABLE %s DROP CONSTRAINT IF EXISTS %s",
+                               SQL.identifier(self._table), SQL.identifier(range_check)))
+                cr.execute(SQL("DROP INDEX IF EXISTS %s", SQL.identifier(id_index)))
+                cr.commit()
+            return False
+        
+        for model in view_models:
+            model.init()
+        return True
+    
+    @api.model
+    def _tamm_swap_partitioned(self, view_models, legacy, range_check, id_index):
+        """Steps of _tamm_convert_to_partitioned"""
+        cr = self.env.cr
+        table = SQL.identifier(self._table)
+        
+        # Monthly partitions start after every stored row and after the
+        # next month, so rows still coming in fit in the legacy range
+        cr.execute(SQL("SELECT MAX(timestamp) FROM %s", table))
+        newest = max(cr.fetchone()[0] or EPOCH, fields.Datetime.now())
+        boundary = newest.replace(day=1, hour=0, minute=0, second=0, microsecond=0) \
+            + relativedelta(months=2)
+        
+        cr.execute(SQL("ALTER TABLE %s DROP CONSTRAINT IF EXISTS %s", table, SQL.identifier(range_check)))
+        cr.execute(SQL("ALTER TABLE %s ADD CONSTRAINT %s CHECK (timestamp < %s) NOT VALID",
+                       table, SQL.identifier(range_check), boundary))
+        cr.commit()
+        cr.execute(SQL("ALTER TABLE %s VALIDATE CONSTRAINT %s", table, SQL.identifier(range_check)))
+        cr.commit()
+        self._tamm_build_index_concurrently(id_index, ['id', 'timestamp'])
+        
+        for model in view_models:
+            tools.drop_view_if_exists(cr, model._table)
+        cr.execute(SQL("ALTER TABLE %s RENAME TO %s", table, SQL.identifier(legacy)))
+        # Free the index names for the partitioned table
+        cr.execute(SQL("SELECT indexname FROM pg_indexes WHERE tablename = %s", legacy))
+        for index, in cr.fetchall():
+            if index.startswith(f'{self._table}_') and not index.startswith(f'{legacy}_'):
+                cr.execute(SQL("ALTER INDEX %s RENAME TO %s", SQL.identifier(index),
+                               SQL.identifier(legacy + index[len(self._table):])))
+        cr.execute(SQL("ALTER TABLE %s DROP CONSTRAINT %s",
+                       SQL.identifier(legacy), SQL.identifier(f'{legacy}_pkey')))
+        cr.execute(SQL("ALTER TABLE %s ADD CONSTRAINT %s PRIMARY KEY USING INDEX %s",
+                       SQL.identifier(legacy), SQL.identifier(f'{legacy}_pkey'),
+                       SQL.identifier(legacy + id_index[len(self._table):])))
+        
+        cr.execute(SQL("""
+            CREATE TABLE %(table)s (LIKE %(legacy)s INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (timestamp)
+        """, table=table, legacy=SQL.identifier(legacy)))
+        cr.execute(SQL("ALTER TABLE %s DROP CONSTRAINT %s", table, SQL.identifier(range_check)))
+        cr.execute(SQL("ALTER SEQUENCE %s OWNED BY %s",
+                       SQL.identifier(f'{self._table}_id_seq'),
+                       SQL.identifier(self._table, 'id')))
+        cr.execute(SQL("ALTER TABLE %s ADD PRIMARY KEY (id, timestamp)", table))
+        # Same names and definitions as the legacy foreign keys, whatever
+        # module added them, so that the attach reuses them
+        cr.execute(SQL("""
+            SELECT conname, pg_get_constraintdef(oid)
+              FROM pg_constraint
+             WHERE conrelid = %s::regclass AND contype = 'f'
+        """, legacy))
+        for name, definition in cr.fetchall():
+            cr.execute(SQL("ALTER TABLE %s ADD CONSTRAINT %s %s",
+                           table, SQL.identifier(name), SQL(definition)))
+        # The validated range check and primary key spare the attach a scan
+        cr.execute(SQL("ALTER TABLE %s ATTACH PARTITION %s FOR VALUES FROM (MINVALUE) TO (%s)",
+                       table, SQL.identifier(legacy), boundary))
+        # Before any other partition, which then gets every index on creation
+        self._tamm_copy_legacy_indexes(legacy)
+        self._tamm_create_partitions(
+            boundary, fields.Datetime.now() + relativedelta(months=PARTITION_MONTHS_AHEAD))
+        cr.execute(SQL("CREATE TABLE %s PARTITION OF %s DEFAULT",
+                       SQL.identifier(f'{self._table}_default'), table))
+        cr.commit()
+    
+    @api.model
+    def _tamm_apply_retention(self, months):
+        """Detach or drop the partitions, legacy one included, older than ``months``"""
+        mode = self.env['ir.config_parameter'].sudo().get_param(
+            'Tamm_Integrations.tracking_retention_mode', 'detach')
+        cutoff = fields.Datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) \
+            - relativedelta(months=months)
+        partitions = {name: month + relativedelta(months=1)
+                      for name, month in self._tamm_partitions().items()}
+        legacy_bound = self._tamm_legacy_bound()
+        if legacy_bound:
+            partitions[f'{self._table}_legacy'] = legacy_bound
+        for name, end in partitions.items():
+            if end > cutoff:
+                continue
+            _logger.info('Tamm tracking retention: %s partition %s', mode, name)
+            self.env.cr.execute(SQL("ALTER TABLE %s DETACH PARTITION %s",
+                                    SQL.identifier(self._table), SQL.identifier(name)))
+            if mode == 'drop':
+                self.env.cr.execute(SQL("DROP TABLE %s", SQL.identifier(name)))
+    
+    @api.model
+    def _cron_maintain_tracking_storage(self):
+        """Apply the configured storage mode of tracking records.
+
+        In ``partitioned`` mode the table is converted on the first run,
+        partitions are created ahead of time and the retention policy is
+        applied. ``heap`` mode keeps a regular table.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        if params.get_param('Tamm_Integrations.tracking_storage', 'heap') != 'partitioned':
+            return
+        
+        if not self._tamm_is_partitioned() and not self._tamm_convert_to_partitioned():
+            return
+        now = fields.Datetime.now()
+        self._tamm_create_partitions(now, now + relativedelta(months=PARTITION_MONTHS_AHEAD))
+        
+        retention_months = int(params.get_param('Tamm_Integrations.tracking_retention_months', 0))
+        if retention_months > 0:
+            self._tamm_apply_retention(retention_months)
@@ -0,0 +1,229 @@
+# models/tamm_tracking_rollup.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+from .tamm_driver import DRIVER_MAX_POINT_GAP
+
+class TammTrackingRollup(models.AbstractModel):
+    _name = 'tamm.tracking.rollup'
+    _description = 'Tracking Rollup'
+    _order = 'period_start desc'
+    _rec_name = 'period_start'
+    
+    # date_trunc() unit of the rollup period
+    _rollup_period = None
+    
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
+                                 required=True, ondelete='cascade', readonly=True)
+    period_start = fields.Datetime('Period Start', required=True, readonly=True)
+    distance = fields.Float('Distance (km)', digits=(12, 2), readonly=True)
+    point_count = fields.Integer('Tracking Points', readonly=True)
+    speed_sum = fields.Float('Speed Sum', readonly=True)
+    average_speed = fields.Float('Average Speed (km/h)', digits=(5, 2), readonly=True,
+                                 aggregator='avg')
+    max_speed = fields.Float('Max Speed (km/h)', digits=(5, 2), readonly=True,
+                             aggregator='max')
+    engine_on_minutes = fields.Float('Engine On (min)', digits=(10, 2), readonly=True,
+                                     help='Time from each point with the engine on to the '
+                                          'next point of the day, capped like the driver metrics.')
+    idle_minutes = fields.Float('Idle (min)', digits=(10, 2), readonly=True,
+                                help='Time from each idling point to the next point of the '
+                                     'day, capped like the driver metrics.')
+    
+    _sql_constraints = [
+        ('vehicle_period_unique', 'unique(vehicle_id, period_start)', 
+         'Only one rollup row per vehicle and period is allowed!')
+    ]
+    
+    def init(self):
+        # Fill rollups from the existing history on first install
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.rowcount:
+            self.action_rebuild()
+    
+    def _rollup_select(self, where, scope=SQL("TRUE")):
+        """Aggregate the tracking rows matching ``where`` per vehicle and period.
+
+        Engine on and idle minutes add up the time until the vehicle's next
+        point of the same day, capped at DRIVER_MAX_POINT_GAP as in the
+        driver metrics. ``scope`` must cover whole days of the matched rows.
+        """
+        return SQL("""
+            SELECT vehicle_id,
+                   date_trunc(%(period)s, timestamp) AS period_start,
+                   COALESCE(SUM(distance), 0) AS distance,
+                   COUNT(*) AS point_count,
+                   COALESCE(SUM(speed), 0) AS speed_sum,
+                   COALESCE(MAX(speed), 0) AS max_speed,
+                   COALESCE(SUM(duration) FILTER (WHERE engine_status = 'on'), 0) / 60.0 AS engine_on_minutes,
+                   COALESCE(SUM(duration) FILTER (WHERE engine_status = 'idle'), 0) / 60.0 AS idle_minutes
+              FROM (
+                  SELECT id, vehicle_id, timestamp, distance, speed, engine_status,
+                         LEAST(EXTRACT(EPOCH FROM LEAD(timestamp) OVER w - timestamp),
+                               %(max_gap)s) AS duration
+                    FROM tamm_tracking
+                   WHERE %(scope)s
+                  WINDOW w AS (PARTITION BY vehicle_id, timestamp::date ORDER BY timestamp, id)
+              ) AS tamm_tracking
+             WHERE %(where)s
+             GROUP BY vehicle_id, date_trunc(%(period)s, timestamp)
+        """, period=self._rollup_period, where=where, scope=scope, max_gap=DRIVER_MAX_POINT_GAP)
+    
+    def _rollup_append_select(self, ids):
+        """Aggregate new tracking rows that follow every stored point of their
+        vehicle's day, with the time each one closes on the point before it.
+
+        That time belongs to the previous point's period and engine status,
+        which is how _rollup_select counts it once the day is complete.
+        """
+        return SQL("""
+            WITH new AS (
+                SELECT id, vehicle_id, timestamp, distance, speed
+                  FROM tamm_tracking
+                 WHERE id = ANY(%(ids)s)
+            ), moves AS (
+                SELECT vehicle_id, timestamp, distance, speed, 1 AS points,
+                       NULL::numeric AS duration, NULL AS engine_status
+                  FROM new
+                UNION ALL
+                SELECT p.vehicle_id, p.timestamp, 0, NULL, 0,
+                       LEAST(EXTRACT(EPOCH FROM n.timestamp - p.timestamp), %(max_gap)s),
+                       p.engine_status
+                  FROM new n
+                 CROSS JOIN LATERAL (
+                       SELECT vehicle_id, timestamp, engine_status
+                         FROM tamm_tracking p
+                        WHERE p.vehicle_id = n.vehicle_id
+                          AND p.timestamp >= n.timestamp::date
+                          AND (p.timestamp, p.id) < (n.timestamp, n.id)
+                        ORDER BY p.timestamp DESC, p.id DESC
+                        LIMIT 1
+                 ) p
+            )
+            SELECT vehicle_id,
+                   date_trunc(%(period)s, timestamp) AS period_start,
+                   COALESCE(SUM(distance), 0) AS distance,
+                   SUM(points) AS point_count,
+                   COALESCE(SUM(speed), 0) AS speed_sum,
+                   COALESCE(MAX(speed), 0) AS max_speed,
+                   COALESCE(SUM(duration) FILTER (WHERE engine_status = 'on'), 0) / 60.0 AS engine_on_minutes,
+                   COALESCE(SUM(duration) FILTER (WHERE engine_status = 'idle'), 0) / 60.0 AS idle_minutes
+              FROM moves
+             GROUP BY vehicle_id, date_trunc(%(period)s, timestamp)
+        """, ids=ids, period=self._rollup_period, max_gap=DRIVER_MAX_POINT_GAP)
+    
+    def _rollup_upsert(self, select, accumulate):
+        """Insert the rows of ``select``, adding to or replacing existing periods"""
+        if accumulate:
+            def merge(fname):
+                return SQL("%s = %s + EXCLUDED.%s", SQL.identifier(fname),
+                           SQL.identifier(self._table, fname), SQL.identifier(fname))
+            merged = SQL(", ").join([
+                merge('distance'), merge('point_count'), merge('speed_sum'),
+                merge('engine_on_minutes'), merge('idle_minutes'),
+                SQL("max_speed = GREATEST(%s, EXCLUDED.max_speed)",
+                    SQL.identifier(self._table, 'max_speed')),
+                SQL("average_speed = (%s + EXCLUDED.speed_sum) / NULLIF(%s + EXCLUDED.point_count, 0)",
+                    SQL.identifier(self._table, 'speed_sum'),
+                    SQL.identifier(self._table, 'point_count')),
+            ])
+        else:
+            merged = SQL("""
+                distance = EXCLUDED.distance, point_count = EXCLUDED.point_count,
+                speed_sum = EXCLUDED.speed_sum, max_speed = EXCLUDED.max_speed,
+                engine_on_minutes = EXCLUDED.engine_on_minutes,
+                idle_minutes = EXCLUDED.idle_minutes, average_speed = EXCLUDED.average_speed
+            """)
+        self.env.cr.execute(SQL("""
+            INSERT INTO %(table)s (vehicle_id, period_start, distance, point_count, speed_sum,
+                                   max_speed, engine_on_minutes, idle_minutes, average_speed,
+                                   create_uid, create_date, write_uid, write_date)
+            SELECT r.vehicle_id, r.period_start, r.distance, r.point_count, r.speed_sum,
+                   r.max_speed, r.engine_on_minutes, r.idle_minutes,
+                   r.speed_sum / NULLIF(r.point_count, 0),
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM (%(select)s) AS r
+            ON CONFLICT (vehicle_id, period_start) DO UPDATE SET
+                %(merged)s,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, table=SQL.identifier(self._table), uid=self.env.uid, select=select, merged=merged))
+        self.invalidate_model()
+    
+    @api.model
+    def _rollup_add(self, tracking):
+        """Add new tracking records to their periods.
+
+        Points after the last stored one of their vehicle's day are added on
+        top of the stored periods; days that got an earlier point are
+        recomputed, as that point changes the time of the one before it.
+        """
+        if not tracking:
+            return
+        self.env.cr.execute(SQL("""
+            SELECT DISTINCT n.vehicle_id, n.timestamp::date
+              FROM tamm_tracking n
+             WHERE n.id = ANY(%(ids)s)
+               AND EXISTS (
+                   SELECT 1
+                     FROM tamm_tracking r
+                    WHERE r.vehicle_id = n.vehicle_id
+                      AND (r.timestamp, r.id) > (n.timestamp, n.id)
+                      AND r.timestamp < n.timestamp::date + 1
+                      AND r.id != ALL(%(ids)s)
+               )
+        """, ids=tracking.ids))
+        late_days = set(self.env.cr.fetchall())
+        appended = tracking.filtered(
+            lambda record: (record.vehicle_id.id, record.timestamp.date()) not in late_days)
+        if appended:
+            self._rollup_upsert(self._rollup_append_select(appended.ids), True)
+        self._rollup_refresh(late_days)
+    
+    @api.model
+    def _rollup_refresh(self, vehicle_periods):
+        """Recompute the days of the given (vehicle id, timestamp or date)
+        periods from the raw rows.
+
+        Used when tracking rows are changed, deleted or arrive out of order.
+        Whole days are recomputed since a point sets the minutes of the one
+        before it; periods left without rows are removed.
+        """
+        if not vehicle_periods:
+            return
+        days = {(vehicle_id, fields.Date.to_date(timestamp))
+                for vehicle_id, timestamp in vehicle_periods}
+        values = SQL(", ").join(SQL("(%s, %s::date)", vehicle_id, day) for vehicle_id, day in days)
+        vehicle_ids = list({vehicle_id for vehicle_id, _day in days})
+        first_day = min(day for _vehicle_id, day in days)
+        last_day = max(day for _vehicle_id, day in days)
+        
+        def scope(column):
+            return SQL("""
+                %(column)s >= %(first)s::date AND %(column)s < %(last)s::date + 1
+                AND vehicle_id = ANY(%(vehicle_ids)s)
+                AND (vehicle_id, %(column)s::date) IN (VALUES %(values)s)
+            """, column=SQL.identifier(column), first=first_day, last=last_day,
+                 vehicle_ids=vehicle_ids, values=values)
+        
+        self.env.cr.execute(SQL("DELETE FROM %s WHERE %s",
+                                SQL.identifier(self._table), scope('period_start')))
+        self._rollup_upsert(self._rollup_select(scope('timestamp'), scope('timestamp')), False)
+    
+    @api.model
+    def action_rebuild(self):
+        """Rebuild every period from the raw tracking history"""
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        self._rollup_upsert(self._rollup_select(SQL("TRUE")), False)
+        return True
+
+class TammTrackingHourly(models.Model):
+    _name = 'tamm.tracking.hourly'
+    _inherit = ['tamm.tracking.rollup']
+    _description = 'Hourly Tracking Rollup'
+    _rollup_period = 'hour'
+
+class TammTrackingDaily(models.Model):
+    _name = 'tamm.tracking.daily'
+    _inherit = ['tamm.tracking.rollup']
+    _description = 'Daily Tracking Rollup'
+    _rollup_period = 'day'
@@ -0,0 +1,223 @@
+# models/tamm_trip_state.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Speed in km/h from which a point with the engine on counts as moving
+TRIP_MOVING_SPEED = 3.0
+
+# Tracking rows segmented per vehicle and chunk, and seconds a segmentation
+# run may take
+TRIP_VEHICLE_CHUNK = 500
+TRIP_TIME_BUDGET = 240
+
+# Age from which points are segmented; later points may still arrive out of order
+TRIP_SETTLE_DELAY = timedelta(minutes=5)
+
+# (stop duration, minimum trip distance in km) of companies without configuration
+DEFAULT_TRIP_SETTINGS = (timedelta(minutes=10), 0.5)
+
+class TammTripState(models.Model):
+    _name = 'tamm.trip.state'
+    _description = 'Vehicle Trip Segmentation State'
+    _rec_name = 'vehicle_id'
+    
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle',
+                                 required=True, ondelete='cascade', readonly=True)
+    # With last_timestamp, the position of the vehicle in its points. Plain
+    # integer: rows may be retired with their partition
+    last_tracking_id = fields.Integer('Last Tracking Row', readonly=True)
+    last_timestamp = fields.Datetime('Last Point', readonly=True)
+    in_trip = fields.Boolean('In Trip', readonly=True)
+    trip_start = fields.Datetime('Trip Start', readonly=True)
+    trip_start_latitude = fields.Float('Trip Start Latitude', digits=(10, 8), readonly=True)
+    trip_start_longitude = fields.Float('Trip Start Longitude', digits=(11, 8), readonly=True)
+    trip_start_address = fields.Char('Trip Start Address', readonly=True)
+    trip_driver_id = fields.Many2one('hr.employee', 'Trip Driver', readonly=True)
+    trip_distance = fields.Float('Trip Distance (km)', digits=(10, 2), readonly=True)
+    pending_distance = fields.Float('Distance Since Last Move (km)', digits=(10, 2), readonly=True)
+    last_moving = fields.Datetime('Last Moving Point', readonly=True)
+    last_moving_latitude = fields.Float('Last Moving Latitude', digits=(10, 8), readonly=True)
+    last_moving_longitude = fields.Float('Last Moving Longitude', digits=(11, 8), readonly=True)
+    last_moving_address = fields.Char('Last Moving Address', readonly=True)
+    
+    _sql_constraints = [
+        ('vehicle_unique', 'unique(vehicle_id)',
+         'Only one trip state per vehicle is allowed!')
+    ]
+    
+    _trip_fields = [
+        'last_tracking_id', 'last_timestamp', 'in_trip', 'trip_start',
+        'trip_start_latitude', 'trip_start_longitude', 'trip_start_address',
+        'trip_driver_id', 'trip_distance', 'pending_distance', 'last_moving',
+        'last_moving_latitude', 'last_moving_longitude', 'last_moving_address',
+    ]
+    
+    @api.model
+    def _get_trip_settings(self):
+        """Return {company id: (stop duration, minimum distance)}"""
+        return {
+            config.company_id.id: (timedelta(minutes=config.trip_stop_minutes),
+                                   config.trip_min_distance)
+            for config in self.env['tamm.config'].search([('active', '=', True)])
+        }
+    
+    def _state_values(self):
+        self.ensure_one()
+        values = {fname: self[fname] for fname in self._trip_fields}
+        values['trip_driver_id'] = self.trip_driver_id.id
+        return values
+    
+    @api.model
+    def _close_trip(self, state, vehicle, settings, routes):
+        """Turn the open trip of ``state`` into route values"""
+        _stop, min_distance = settings
+        if state['last_moving'] > state['trip_start'] and state['trip_distance'] >= min_distance:
+            routes.append({
+                'name': self.env['ir.sequence'].next_by_code('tamm.route') or _('Trip'),
+                'vehicle_id': vehicle.id,
+                'driver_id': state['trip_driver_id'],
+                'start_time': state['trip_start'],
+                'end_time': state['last_moving'],
+                'start_latitude': state['trip_start_latitude'],
+                'start_longitude': state['trip_start_longitude'],
+                'start_location': state['trip_start_address'],
+                'end_latitude': state['last_moving_latitude'],
+                'end_longitude': state['last_moving_longitude'],
+                'end_location': state['last_moving_address'],
+                'actual_distance': state['trip_distance'],
+                'status': 'completed',
+                'detected': True,
+            })
+        state.update(in_trip=False, trip_start=False, trip_distance=0.0, pending_distance=0.0)
+    
+    @api.model
+    def _consume(self, state, vehicle, point, settings, routes):
+        """Advance the trip state machine of a vehicle by one tracking point"""
+        stop_duration, _min_distance = settings
+        moving = point['engine_status'] == 'on' and (point['speed'] or 0.0) >= TRIP_MOVING_SPEED
+    
+        if state['in_trip'] and point['timestamp'] - state['last_moving'] >= stop_duration:
+            self._close_trip(state, vehicle, settings, routes)
+    
+        if moving:
+            if state['in_trip']:
+                state['trip_distance'] += state['pending_distance'] + (point['distance'] or 0.0)
+            else:
+                state.update(
+                    in_trip=True,
+                    trip_start=point['timestamp'],
+                    trip_start_latitude=point['latitude'],
+                    trip_start_longitude=point['longitude'],
+                    trip_start_address=point['address'],
+                    trip_driver_id=point['driver_id'],
+                    trip_distance=0.0,
+                )
+            state.update(
+                pending_distance=0.0,
+                last_moving=point['timestamp'],
+                last_moving_latitude=point['latitude'],
+                last_moving_longitude=point['longitude'],
+                last_moving_address=point['address'],
+            )
+        elif state['in_trip']:
+            state['pending_distance'] += point['distance'] or 0.0
+        state['last_timestamp'] = point['timestamp']
+    
+    @api.model
+    def _segment_chunk(self):
+        """Segment the next points of every vehicle.
+    
+        Each vehicle resumes after the (timestamp, id) of the last point it
+        consumed, so rows committed late by a concurrent sync or push are
+        still replayed. Points of the last TRIP_SETTLE_DELAY are left for a
+        later run, giving out-of-order deliveries time to arrive. Returns
+        the number of rows consumed.
+        """
+        self.env.cr.execute(SQL("""
+            SELECT t.id, v.id AS vehicle_id, t.timestamp, t.latitude, t.longitude, t.speed,
+                   t.distance, t.engine_status, t.driver_id, t.address
+              FROM fleet_vehicle v
+              LEFT JOIN tamm_trip_state s ON s.vehicle_id = v.id
+             CROSS JOIN LATERAL (
+                    SELECT id, timestamp, latitude, longitude, speed, distance,
+                           engine_status, driver_id, address
+                      FROM tamm_tracking
+                     WHERE vehicle_id = v.id
+                       AND timestamp <= %(settled)s
+                       AND timestamp >= COALESCE(s.last_timestamp, '-infinity')
+                       AND (timestamp, id) > (COALESCE(s.last_timestamp, '-infinity'),
+                                              COALESCE(s.last_tracking_id, 0))
+                  ORDER BY timestamp, id
+                     LIMIT %(limit)s
+                   ) t
+          ORDER BY v.id, t.timestamp, t.id
+        """, settled=fields.Datetime.now() - TRIP_SETTLE_DELAY, limit=TRIP_VEHICLE_CHUNK))
+        columns = [column.name for column in self.env.cr.description]
+        rows = [dict(zip(columns, row)) for row in self.env.cr.fetchall()]
+        if not rows:
+            return 0
+    
+        points = {}
+        for row in rows:
+            points.setdefault(row['vehicle_id'], []).append(row)
+        states = {
+            state.vehicle_id.id: state
+            for state in self.search([('vehicle_id', 'in', list(points))])
+        }
+        vehicles = self.env['fleet.vehicle'].browse(list(points))
+        trip_settings = self._get_trip_settings()
+    
+        routes = []
+        new_states = []
+        for vehicle in vehicles:
+            record = states.get(vehicle.id)
+            state = record._state_values() if record else {
+                'last_tracking_id': 0, 'last_timestamp': False, 'in_trip': False,
+                'trip_distance': 0.0, 'pending_distance': 0.0, 'trip_driver_id': False,
+            }
+            settings = trip_settings.get(vehicle.company_id.id, DEFAULT_TRIP_SETTINGS)
+            for point in points[vehicle.id]:
+                self._consume(state, vehicle, point, settings, routes)
+                state['last_tracking_id'] = point['id']
+            if record:
+                record.write(state)
+            else:
+                new_states.append(dict(state, vehicle_id=vehicle.id))
+    
+        if new_states:
+            self.create(new_states)
+        if routes:
+            self.env['tamm.route'].create(routes)
+        return len(rows)
+    
+    @api.model
+    def _close_idle_trips(self):
+        """Close trips of vehicles that stopped reporting for a stop duration"""
+        trip_settings = self._get_trip_settings()
+        # Points newer than the settle delay are not segmented yet
+        settled = fields.Datetime.now() - TRIP_SETTLE_DELAY
+        routes = []
+        for record in self.search([('in_trip', '=', True)]):
+            settings = trip_settings.get(record.vehicle_id.company_id.id, DEFAULT_TRIP_SETTINGS)
+            if settled - record.last_moving >= settings[0]:
+                state = record._state_values()
+                self._close_trip(state, record.vehicle_id, settings, routes)
+                record.write(state)
+        if routes:
+            self.env['tamm.route'].create(routes)
+    
+    @api.model
+    def _cron_segment_trips(self):
+        """Build completed routes from the tracking rows received since the last run"""
+        started = time.monotonic()
+        while self._segment_chunk():
+            self.env.cr.commit()
+            if time.monotonic() - started > TRIP_TIME_BUDGET:
+                self.env.ref('Tamm_Integrations.ir_cron_segment_trips')._trigger()
+                return
+        self._close_idle_trips()
@@ -0,0 +1,155 @@
+# models/tamm_vehicle_position.py
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+from datetime import timezone
+
+# Width in screen pixels of a map cluster cell
+CLUSTER_CELL_PIXELS = 60
+
+# From this zoom level every vehicle is returned on its own
+CLUSTER_MAX_ZOOM = 15
+
+class TammVehiclePosition(models.Model):
+    _name = 'tamm.vehicle.position'
+    _description = 'Vehicle Live Position'
+    _rec_name = 'vehicle_id'
+    
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
+                                 required=True, ondelete='cascade', readonly=True)
+    latitude = fields.Float('Latitude', digits=(10, 8), readonly=True)
+    longitude = fields.Float('Longitude', digits=(11, 8), readonly=True)
+    speed = fields.Float('Speed (km/h)', digits=(5, 2), readonly=True)
+    heading = fields.Float('Heading (°)', digits=(5, 2), readonly=True)
+    timestamp = fields.Datetime('Last Location Update', readonly=True)
+    
+    _sql_constraints = [
+        ('vehicle_unique', 'unique(vehicle_id)', 
+         'Only one live position per vehicle is allowed!')
+    ]
+    
+    def init(self):
+        cr = self.env.cr
+        # Spatial index serving the bounding box lookups of the fleet map
+        tools.create_index(cr, 'tamm_vehicle_position_point_index', self._table,
+                           ['point(longitude, latitude)'], method='gist')
+        
+        # Positions used to be stored on fleet_vehicle, carry them over once
+        if not tools.sql.column_exists(cr, 'fleet_vehicle', 'last_location_update'):
+            return
+        cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if cr.rowcount:
+            return
+        cr.execute(SQL("""
+            INSERT INTO tamm_vehicle_position (vehicle_id, latitude, longitude, speed, heading,
+                                               timestamp, create_uid, create_date,
+                                               write_uid, write_date)
+            SELECT id, current_latitude, current_longitude, current_speed, current_heading,
+                   last_location_update, %(uid)s, now() AT TIME ZONE 'UTC',
+                   %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM fleet_vehicle
+             WHERE last_location_update IS NOT NULL
+        """, uid=self.env.uid))
+    
+    @api.model
+    def _upsert_from_tracking(self, points):
+        """Move vehicles to their given tracking points in a single upsert.
+
+        ``points`` holds at most one ``tamm.tracking`` record per vehicle.
+        Points older than the vehicle's last known position are ignored, so
+        late pushes cannot move a vehicle back.
+        """
+        if not points:
+            return
+        rows = SQL(", ").join(
+            SQL("(%s, %s, %s, %s, %s, %s::timestamp)", point.vehicle_id.id, point.latitude,
+                point.longitude, point.speed, point.heading, point.timestamp)
+            for point in points
+        )
+        self.env.cr.execute(SQL("""
+            WITH moved AS (
+                INSERT INTO tamm_vehicle_position AS p (vehicle_id, latitude, longitude, speed,
+                                                        heading, timestamp, create_uid, create_date,
+                                                        write_uid, write_date)
+                SELECT v.vehicle_id, v.latitude, v.longitude, v.speed, v.heading, v.timestamp,
+                       %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+                  FROM (VALUES %(rows)s) AS v(vehicle_id, latitude, longitude, speed, heading, timestamp)
+                ON CONFLICT (vehicle_id) DO UPDATE SET
+                    latitude = EXCLUDED.latitude,
+                    longitude = EXCLUDED.longitude,
+                    speed = EXCLUDED.speed,
+                    heading = EXCLUDED.heading,
+                    timestamp = EXCLUDED.timestamp,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                 WHERE p.timestamp IS NULL OR p.timestamp <= EXCLUDED.timestamp
+                RETURNING p.vehicle_id, p.latitude, p.longitude, p.speed, p.heading, p.timestamp
+            )
+            SELECT COALESCE(v.company_id, %(company_id)s), m.vehicle_id, m.latitude::float8,
+                   m.longitude::float8, m.speed::float8, m.heading::float8, m.timestamp
+              FROM moved m
+              JOIN fleet_vehicle v ON v.id = m.vehicle_id
+        """, uid=self.env.uid, rows=rows, company_id=self.env.company.id))
+        self._publish_deltas(self.env.cr.fetchall())
+        self.invalidate_model()
+    
+    @api.model
+    def _publish_deltas(self, rows):
+        """Queue moved (company, vehicle, lat, lon, speed, heading, timestamp)
+        rows for the bus.
+
+        Moves are coalesced per vehicle until the end of the transaction,
+        then sent as one compact message per company on the
+        ``tamm_positions`` channel.
+        """
+        if not rows:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get('tamm.position.deltas')
+        if pending is None:
+            pending = data['tamm.position.deltas'] = {}
+            self.env.cr.precommit.add(self._send_deltas)
+        for company_id, vehicle_id, lat, lon, speed, heading, timestamp in rows:
+            pending[vehicle_id] = (company_id, [
+                vehicle_id, round(lat, 6), round(lon, 6), round(speed or 0.0, 1),
+                round(heading or 0.0), int(timestamp.replace(tzinfo=timezone.utc).timestamp()),
+            ])
+    
+    def _send_deltas(self):
+        pending = self.env.cr.precommit.data.pop('tamm.position.deltas', {})
+        by_company = {}
+        for company_id, delta in pending.values():
+            by_company.setdefault(company_id, []).append(delta)
+        for company_id, deltas in by_company.items():
+            company = self.env['res.company'].browse(company_id)
+            self.env['bus.bus']._sendone((company, 'tamm_positions'), 'tamm.positions', deltas)
+    
+    @api.model
+    def _get_clusters(self, vehicle_ids, bounds, zoom):
+        """Group the positions inside ``bounds`` on a grid sized for ``zoom``.
+
+        ``bounds`` is (south, west, north, east). Returns (latitude,
+        longitude, count, vehicle id) rows; the vehicle id is only set for
+        cells holding a single vehicle.
+        """
+        south, west, north, east = (float(value) for value in bounds)
+        in_bounds = SQL(
+            "point(longitude, latitude) <@ box(point(%s, %s), point(%s, %s)) AND vehicle_id = ANY(%s)",
+            west, south, east, north, list(vehicle_ids))
+        if zoom >= CLUSTER_MAX_ZOOM:
+            self.env.cr.execute(SQL("""
+                SELECT latitude::float8, longitude::float8, 1, vehicle_id
+                  FROM tamm_vehicle_position
+                 WHERE %s
+            """, in_bounds))
+            return self.env.cr.fetchall()
+        
+        # Degrees of longitude covered by a cell at this zoom (256 px tiles)
+        cell = 360.0 / (256 * 2 ** zoom) * CLUSTER_CELL_PIXELS
+        self.env.cr.execute(SQL("""
+            SELECT AVG(latitude)::float8, AVG(longitude)::float8, COUNT(*),
+                   CASE WHEN COUNT(*) = 1 THEN MIN(vehicle_id) END
+              FROM tamm_vehicle_position
+             WHERE %(in_bounds)s
+          GROUP BY floor(latitude / %(cell)s), floor(longitude / %(cell)s)
+        """, in_bounds=in_bounds, cell=cell))
+        return self.env.cr.fetchall()
@@ -0,0 +1,159 @@
+# models/tamm_vehicle_stats.py
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+
+class TammVehicleStats(models.Model):
+    _name = 'tamm.vehicle.stats'
+    _description = 'Vehicle Statistics Ledger'
+    _rec_name = 'vehicle_id'
+    
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', 
+                                 required=True, ondelete='cascade', readonly=True)
+    month_start = fields.Date('Month', required=True, readonly=True)
+    lifetime_distance = fields.Float('Lifetime Distance (km)', digits=(12, 2), readonly=True)
+    month_distance = fields.Float('Month Distance (km)', digits=(10, 2), readonly=True)
+    fuel_quantity = fields.Float('Fuel (L)', digits=(12, 2), readonly=True)
+    fuel_cost = fields.Float('Fuel Cost', digits=(12, 2), readonly=True)
+    
+    _sql_constraints = [
+        ('vehicle_unique', 'unique(vehicle_id)', 
+         'Only one statistics ledger per vehicle is allowed!')
+    ]
+    
+    def init(self):
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.rowcount:
+            self._recompute()
+    
+    @api.model
+    def _current_month(self):
+        return fields.Date.today().replace(day=1)
+    
+    def _upsert(self, select, conflict):
+        self.env.cr.execute(SQL("""
+            INSERT INTO tamm_vehicle_stats (vehicle_id, month_start, lifetime_distance,
+                                            month_distance, fuel_quantity, fuel_cost,
+                                            create_uid, create_date, write_uid, write_date)
+            SELECT s.vehicle_id, s.month_start, s.lifetime_distance, s.month_distance,
+                   s.fuel_quantity, s.fuel_cost,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM (%(select)s) AS s
+            ON CONFLICT (vehicle_id) DO UPDATE SET
+                %(conflict)s,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, uid=self.env.uid, select=select, conflict=conflict))
+        self.invalidate_model()
+    
+    @api.model
+    def _add_tracking(self, tracking):
+        """Add the distance of new tracking records to their vehicles"""
+        if not tracking:
+            return
+        month = self._current_month()
+        self._upsert(SQL("""
+            SELECT vehicle_id,
+                   %(month)s::date AS month_start,
+                   COALESCE(SUM(distance), 0) AS lifetime_distance,
+                   COALESCE(SUM(distance) FILTER (WHERE timestamp >= %(month)s), 0) AS month_distance,
+                   0 AS fuel_quantity,
+                   0 AS fuel_cost
+              FROM tamm_tracking
+             WHERE id = ANY(%(ids)s)
+             GROUP BY vehicle_id
+        """, month=month, ids=tracking.ids), SQL("""
+            lifetime_distance = tamm_vehicle_stats.lifetime_distance + EXCLUDED.lifetime_distance,
+            month_distance = CASE
+                WHEN tamm_vehicle_stats.month_start = EXCLUDED.month_start
+                THEN tamm_vehicle_stats.month_distance + EXCLUDED.month_distance
+                ELSE EXCLUDED.month_distance
+            END,
+            month_start = EXCLUDED.month_start
+        """))
+    
+    @api.model
+    def _add_fuel(self, fuel_logs):
+        """Add the quantity and cost of new fuel logs to their vehicles"""
+        if not fuel_logs:
+            return
+        self._upsert(SQL("""
+            SELECT vehicle_id,
+                   %(month)s::date AS month_start,
+                   0 AS lifetime_distance,
+                   0 AS month_distance,
+                   COALESCE(SUM(quantity), 0) AS fuel_quantity,
+                   COALESCE(SUM(total_cost), 0) AS fuel_cost
+              FROM tamm_fuel_log
+             WHERE id = ANY(%(ids)s)
+             GROUP BY vehicle_id
+        """, month=self._current_month(), ids=fuel_logs.ids), SQL("""
+            fuel_quantity = tamm_vehicle_stats.fuel_quantity + EXCLUDED.fuel_quantity,
+            fuel_cost = tamm_vehicle_stats.fuel_cost + EXCLUDED.fuel_cost
+        """))
+    
+    @api.model
+    def _recompute(self, vehicle_ids=None):
+        """Rebuild the ledger of the given vehicles (all when None).
+
+        Distances come from the daily telemetry rollups, so this reads one
+        row per vehicle and day rather than the raw tracking history.
+        """
+        self.env.flush_all()
+        if vehicle_ids is None:
+            restrict = SQL("TRUE")
+        elif not vehicle_ids:
+            return
+        else:
+            restrict = SQL("vehicle_id = ANY(%s)", list(vehicle_ids))
+        self._upsert(SQL("""
+            SELECT v.id AS vehicle_id,
+                   %(month)s::date AS month_start,
+                   COALESCE(d.lifetime_distance, 0) AS lifetime_distance,
+                   COALESCE(d.month_distance, 0) AS month_distance,
+                   COALESCE(f.fuel_quantity, 0) AS fuel_quantity,
+                   COALESCE(f.fuel_cost, 0) AS fuel_cost
+              FROM fleet_vehicle v
+              LEFT JOIN (
+                  SELECT vehicle_id,
+                         SUM(distance) AS lifetime_distance,
+                         SUM(distance) FILTER (WHERE period_start >= %(month)s) AS month_distance
+                    FROM tamm_tracking_daily
+                   WHERE %(restrict)s
+                   GROUP BY vehicle_id
+              ) d ON d.vehicle_id = v.id
+              LEFT JOIN (
+                  SELECT vehicle_id,
+                         SUM(quantity) AS fuel_quantity,
+                         SUM(total_cost) AS fuel_cost
+                    FROM tamm_fuel_log
+                   WHERE %(restrict)s
+                   GROUP BY vehicle_id
+              ) f ON f.vehicle_id = v.id
+             WHERE v.id IN (SELECT vehicle_id FROM tamm_tracking_daily WHERE %(restrict)s
+                            UNION SELECT vehicle_id FROM tamm_fuel_log WHERE %(restrict)s
+                            UNION SELECT vehicle_id FROM tamm_vehicle_stats WHERE %(restrict)s)
+        """, month=self._current_month(), restrict=restrict), SQL("""
+            month_start = EXCLUDED.month_start,
+            lifetime_distance = EXCLUDED.lifetime_distance,
+            month_distance = EXCLUDED.month_distance,
+            fuel_quantity = EXCLUDED.fuel_quantity,
+            fuel_cost = EXCLUDED.fuel_cost
+        """))
+    
+    @api.model
+    def _cron_roll_month(self):
+        """Start the new month for vehicles that had no tracking in it yet"""
+        month = self._current_month()
+        self.env.cr.execute(SQL("""
+            UPDATE tamm_vehicle_stats s
+               SET month_start = %(month)s,
+                   month_distance = COALESCE((
+                       SELECT SUM(d.distance)
+                         FROM tamm_tracking_daily d
+                        WHERE d.vehicle_id = s.vehicle_id
+                          AND d.period_start >= %(month)s
+                   ), 0),
+                   write_date = now() AT TIME ZONE 'UTC'
+             WHERE s.month_start < %(month)s
+        """, month=month))
+        self.invalidate_model()
@@ -1,30 +1,96 @@
 /** @odoo-module **/
 
-import { Component } from "@odoo/owl";
+import { Component, onWillStart, onWillUnmount, useState } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { standardActionServiceProps } from "@web/webclient/actions/action_service";
+
+// Vehicles listed, most recently moved first
+const DASHBOARD_LIMIT = 50;
 
 export class TammDashboard extends Component {
     setup() {
         this.orm = useService("orm");
         this.action = useService("action");
-    }
+        this.busService = useService("bus_service");
+        this.state = useState({ vehicles: [] });
+        this.onPositions = this.onPositions.bind(this);
 
-    async refreshData() {
-        await this.orm.call("fleet.vehicle", "sync_with_tamm", [[]]);
-
-        // بدل reload، افتح الـ kanban view
-        this.action.doAction({
-            type: "ir.actions.act_window",
-            name: "Fleet Dashboard",
-            res_model: "fleet.vehicle",
-            view_mode: "kanban,list,form",
-            domain: [["tamm_vehicle_id", "!=", false]],
-            context: { create: false },
+        onWillStart(async () => {
+            const positions = await this.orm.searchRead(
+                "tamm.vehicle.position",
+                [],
+                ["vehicle_id", "latitude", "longitude", "speed", "heading", "timestamp"],
+                { order: "timestamp desc", limit: DASHBOARD_LIMIT }
+            );
+            this.state.vehicles = positions.map((p) => ({
+                id: p.vehicle_id[0],
+                name: p.vehicle_id[1],
+                latitude: p.latitude,
+                longitude: p.longitude,
+                speed: p.speed,
+                heading: p.heading,
+                timestamp: p.timestamp,
+            }));
+            this.busService.addChannel("tamm_positions");
+            this.busService.subscribe("tamm.positions", this.onPositions);
         });
+
+        onWillUnmount(() => {
+            this.busService.unsubscribe("tamm.positions", this.onPositions);
+            this.busService.deleteChannel("tamm_positions");
+        });
+    }
+
+    /**
+     * Apply position deltas pushed on the bus. Each delta is
+     * [vehicle id, latitude, longitude, speed, heading, epoch seconds];
+     * vehicles not listed yet are added once their name is read.
+     */
+    async onPositions(deltas) {
+        const byId = new Map(this.state.vehicles.map((v) => [v.id, v]));
+        const unknown = [];
+        for (const [id, latitude, longitude, speed, heading, epoch] of deltas) {
+            const values = {
+                latitude,
+                longitude,
+                speed,
+                heading,
+                timestamp: new Date(epoch * 1000).toISOString().slice(0, 19).replace("T", " "),
+            };
+            const vehicle = byId.get(id);
+            if (vehicle) {
+                Object.assign(vehicle, values);
+            } else {
+                unknown.push({ id, ...values });
+            }
+        }
+        if (unknown.length) {
+            const names = await this.orm.read("fleet.vehicle", unknown.map((v) => v.id), ["display_name"]);
+            const nameById = new Map(names.map((n) => [n.id, n.display_name]));
+            for (const vehicle of unknown) {
+                if (nameById.has(vehicle.id) && !byId.has(vehicle.id)) {
+                    vehicle.name = nameById.get(vehicle.id);
+                    this.state.vehicles.push(vehicle);
+                }
+            }
+        }
+        this.state.vehicles.sort((a, b) => (a.timestamp < b.timestamp ? 1 : -1));
+        this.state.vehicles.splice(DASHBOARD_LIMIT);
+    }
+
+    async syncNow() {
+        // Queue a background sync; new positions arrive on the bus
+        const action = await this.orm.call("tamm.config", "action_queue_sync", []);
+        this.action.doAction(action);
+    }
+
+    openVehicles() {
+        this.action.doAction("Tamm_Integrations.action_tamm_dashboard");
     }
 }
 
 TammDashboard.template = "tamm_fleet.Dashboard";
+TammDashboard.props = { ...standardActionServiceProps };
 
 registry.category("actions").add("tamm_fleet.dashboard", TammDashboard);
@@ -1,34 +1,105 @@
 /** @odoo-module **/
-import { Component, onMounted } from "@odoo/owl";
+import { Component, onMounted, onWillStart, onWillUnmount, useRef } from "@odoo/owl";
+import { loadCSS, loadJS } from "@web/core/assets";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+import { standardActionServiceProps } from "@web/webclient/actions/action_service";
+
+// Leaflet is loaded on first use only, like the OpenStreetMap tiles
+const LEAFLET_URL = "https://unpkg.com/leaflet@1.9.4/dist";
 
 export class TammMapView extends Component {
     setup() {
         this.orm = useService("orm");
+        this.busService = useService("bus_service");
+        this.mapRef = useRef("map");
+        // Markers of the vehicles shown on their own, by vehicle id
+        this.markers = new Map();
+        this.onPositions = this.onPositions.bind(this);
+        // Only the latest viewport request may draw
+        this.requestId = 0;
+        this.loadViewport = debounce(this.loadViewport.bind(this), 250);
+
+        onWillStart(() => Promise.all([
+            loadJS(`${LEAFLET_URL}/leaflet.js`),
+            loadCSS(`${LEAFLET_URL}/leaflet.css`),
+        ]));
+
+        onMounted(() => {
+            this.map = L.map(this.mapRef.el).setView([24.7136, 46.6753], 6); // Center Saudi Arabia
+            L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
+                maxZoom: 18,
+                attribution: "© OpenStreetMap"
+            }).addTo(this.map);
+            this.layer = L.layerGroup().addTo(this.map);
+            this.map.on("moveend", this.loadViewport);
+            this.loadViewport();
+            this.busService.addChannel("tamm_positions");
+            this.busService.subscribe("tamm.positions", this.onPositions);
+        });
+
+        onWillUnmount(() => {
+            this.busService.unsubscribe("tamm.positions", this.onPositions);
+            this.busService.deleteChannel("tamm_positions");
+            this.loadViewport.cancel();
+            this.map.remove();
+        });
     }
 
-    async willStart() {
-        this.vehicles = await this.orm.searchRead("fleet.vehicle", [
-            ["tamm_vehicle_id", "!=", false]
-        ], ["name", "license_plate", "current_latitude", "current_longitude", "current_speed"]);
+    async loadViewport() {
+        const requestId = ++this.requestId;
+        const bounds = this.map.getBounds();
+        const result = await this.orm.call("fleet.vehicle", "get_map_clusters", [
+            [bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast()],
+            this.map.getZoom(),
+        ]);
+        if (requestId !== this.requestId) {
+            return;
+        }
+
+        this.layer.clearLayers();
+        this.markers.clear();
+        result.clusters.forEach(c => {
+            const marker = L.marker([c.latitude, c.longitude], {
+                icon: L.divIcon({
+                    className: "o_tamm_map_cluster",
+                    html: `<span>${c.count}</span>`,
+                    iconSize: [36, 36],
+                }),
+            });
+            marker.on("click", () => this.map.setView([c.latitude, c.longitude], this.map.getZoom() + 2));
+            this.layer.addLayer(marker);
+        });
+        result.vehicles.forEach(v => {
+            const marker = L.marker([v.latitude, v.longitude]);
+            marker.vehicle = v;
+            marker.bindPopup(() => this.popupContent(marker.vehicle));
+            this.markers.set(v.id, marker);
+            this.layer.addLayer(marker);
+        });
     }
 
-    onMounted() {
-        const map = L.map("tamm_map").setView([24.7136, 46.6753], 6); // Center Saudi Arabia
-        L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
-            maxZoom: 18,
-            attribution: "© OpenStreetMap"
-        }).addTo(map);
-
-        this.vehicles.forEach(v => {
-            if (v.current_latitude && v.current_longitude) {
-                const marker = L.marker([v.current_latitude, v.current_longitude]).addTo(map);
-                marker.bindPopup(`<b>${v.name}</b><br>${v.license_plate}<br>Speed: ${v.current_speed} km/h`);
+    popupContent(v) {
+        return `<b>${v.name}</b><br>${v.license_plate || ""}<br>Speed: ${v.speed} km/h`;
+    }
+
+    /**
+     * Move the markers of the vehicles shown on their own. Each delta is
+     * [vehicle id, latitude, longitude, speed, heading, epoch seconds];
+     * clusters are refreshed by the next pan or zoom.
+     */
+    onPositions(deltas) {
+        for (const [id, latitude, longitude, speed, heading] of deltas) {
+            const marker = this.markers.get(id);
+            if (marker) {
+                marker.setLatLng([latitude, longitude]);
+                Object.assign(marker.vehicle, { latitude, longitude, speed, heading });
             }
-        });
+        }
     }
 }
 
 TammMapView.template = "tamm_fleet.MapView";
+TammMapView.props = { ...standardActionServiceProps };
 registry.category("actions").add("tamm_fleet.map_view", TammMapView);
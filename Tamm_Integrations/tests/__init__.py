@@ -0,0 +1,10 @@
+from . import test_geo
+from . import test_geofence
+from . import test_route_optimizer
+from . import test_distance_cache
+from . import test_geocoder
+from . import test_rate_limit
+from . import test_sync_scheduler
+from . import test_ingest
+from . import test_sync
+from . import test_rollup
@@ -0,0 +1,30 @@
+# tests/common.py
+from datetime import datetime, timedelta
+
+from odoo.tests import TransactionCase
+
+
+class TammTestCommon(TransactionCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env['fleet.vehicle.model.brand'].create({'name': 'Tamm Test'})
+        model = cls.env['fleet.vehicle.model'].create({'name': 'Van', 'brand_id': brand.id})
+        cls.vehicle = cls.env['fleet.vehicle'].create({
+            'model_id': model.id,
+            'license_plate': 'TAMM 1',
+            'tamm_vehicle_id': 'V1',
+        })
+        # Recent enough to land in a current partition of tamm_tracking
+        cls.start = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+    
+    def _track(self, points, vehicle=None):
+        """Ingest (minutes after start, latitude, longitude) fixes"""
+        vehicle = vehicle or self.vehicle
+        return self.env['tamm.tracking']._tamm_ingest([{
+            'vehicle_id': vehicle.id,
+            'timestamp': self.start + timedelta(minutes=minutes),
+            'latitude': latitude,
+            'longitude': longitude,
+        } for minutes, latitude, longitude in points])
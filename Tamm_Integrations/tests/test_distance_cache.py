@@ -0,0 +1,93 @@
+# tests/test_distance_cache.py
+import numpy as np
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools.distance_cache import DistanceCache
+from ..tools.geo import geohash_center, geohash_encode, haversine_km
+
+CELLS = ['th3jx4p', 'th3jx5p', 'th3jxhp']
+
+
+@tagged('post_install', '-at_install')
+class TestGeohash(BaseCase):
+    
+    def test_encode(self):
+        # Reference cell of the geohash format
+        self.assertEqual(geohash_encode(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+        self.assertEqual(geohash_encode(24.7136, 46.6753, precision=3), 'th3')
+    
+    def test_center(self):
+        lat, lon = geohash_center(geohash_encode(24.7136, 46.6753))
+        # A precision 7 cell is about 150 m by 150 m
+        self.assertLess(haversine_km(lat, lon, 24.7136, 46.6753), 0.11)
+        self.assertEqual(geohash_encode(lat, lon), geohash_encode(24.7136, 46.6753))
+
+
+@tagged('post_install', '-at_install')
+class TestDistanceCache(BaseCase):
+    
+    def test_matrix(self):
+        cache = DistanceCache()
+        matrix, computed = cache.matrix(CELLS + CELLS[:1])
+        self.assertEqual(matrix.shape, (4, 4))
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0.0)
+        self.assertEqual(matrix[0, 3], 0.0)
+        self.assertEqual(len(computed), 3)
+        a, b = geohash_center(CELLS[0]), geohash_center(CELLS[1])
+        self.assertAlmostEqual(matrix[0, 1], haversine_km(*a, *b), places=9)
+    
+    def test_hits(self):
+        cache = DistanceCache()
+        cache.matrix(CELLS)
+        matrix, computed = cache.matrix(CELLS[::-1])
+        self.assertEqual(computed, {})
+        self.assertEqual(cache.statistics()['hits'], 3)
+        self.assertEqual(cache.statistics()['misses'], 3)
+        a, b = geohash_center(CELLS[0]), geohash_center(CELLS[2])
+        self.assertAlmostEqual(matrix[0, 2], haversine_km(*a, *b), places=9)
+    
+    def test_loader(self):
+        # Entries the loader knows are neither computed nor measured again
+        requested = []
+        
+        def loader(keys):
+            requested.extend(keys)
+            return {DistanceCache.key(CELLS[0], CELLS[1]): 42.0}
+        
+        cache = DistanceCache()
+        matrix, computed = cache.matrix(CELLS, loader=loader)
+        self.assertEqual(len(requested), 3)
+        self.assertEqual(matrix[0, 1], 42.0)
+        self.assertNotIn(DistanceCache.key(CELLS[0], CELLS[1]), computed)
+        self.assertEqual(len(computed), 2)
+        requested.clear()
+        cache.matrix(CELLS, loader=loader)
+        self.assertEqual(requested, [])
+    
+    def test_lru_eviction(self):
+        cache = DistanceCache(max_entries=2)
+        cache.matrix(CELLS[:2])
+        cache.matrix(CELLS[1:])
+        # Reading the first pair makes the second one the least recent
+        cache.matrix(CELLS[:2])
+        cache.matrix([CELLS[0], CELLS[2]])
+        self.assertEqual(list(cache.entries), [
+            DistanceCache.key(CELLS[0], CELLS[1]),
+            DistanceCache.key(CELLS[0], CELLS[2]),
+        ])
+        self.assertEqual(cache.statistics()['evictions'], 1)
+        cache.clear()
+        self.assertEqual(cache.statistics()['entries'], 0)
+    
+    def test_same_cell_points(self):
+        # Two stops of one cell are measured exactly, not 0 km apart
+        lat, lon = geohash_center(geohash_encode(24.7136, 46.6753))
+        lats, lons = [lat - 0.0003, lat + 0.0003, 24.8], [lon - 0.0003, lon + 0.0003, 46.7]
+        cells = [geohash_encode(lat, lon) for lat, lon in zip(lats, lons)]
+        self.assertEqual(cells[0], cells[1])
+        matrix, _computed = DistanceCache().matrix(cells, latitudes=lats, longitudes=lons)
+        self.assertAlmostEqual(matrix[0, 1], haversine_km(lats[0], lons[0], lats[1], lons[1]))
+        self.assertGreater(matrix[0, 1], 0.0)
+        self.assertEqual(matrix[1, 1], 0.0)
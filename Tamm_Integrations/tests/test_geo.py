@@ -0,0 +1,170 @@
+# tests/test_geo.py
+import math
+
+import numpy as np
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools.geo import (
+    GeofenceIndex,
+    douglas_peucker,
+    encode_polyline,
+    haversine_km,
+    haversine_km_array,
+    point_in_polygon,
+    segment_motion,
+)
+
+# A square of about 1.1 km around central Riyadh
+SQUARE = [(24.70, 46.67), (24.71, 46.67), (24.71, 46.68), (24.70, 46.68)]
+
+
+@tagged('post_install', '-at_install')
+class TestHaversine(BaseCase):
+    
+    def test_known_distances(self):
+        self.assertEqual(haversine_km(24.7, 46.7, 24.7, 46.7), 0.0)
+        # One degree of latitude, and a quarter of the equator
+        self.assertAlmostEqual(haversine_km(0, 0, 1, 0), 111.195, places=2)
+        self.assertAlmostEqual(haversine_km(0, 0, 0, 90), 10007.56, places=1)
+        # Riyadh to Jeddah
+        self.assertAlmostEqual(haversine_km(24.7136, 46.6753, 21.4858, 39.1925), 845.0, delta=1.0)
+    
+    def test_antipodes(self):
+        self.assertAlmostEqual(haversine_km(0, 0, 0, 180), math.pi * 6371.0088, places=3)
+    
+    def test_array_matches_scalar(self):
+        lat1, lon1 = [24.7, 0.0, -33.9], [46.7, 0.0, 151.2]
+        lat2, lon2 = [21.5, 1.0, 51.5], [39.2, 1.0, -0.1]
+        expected = [haversine_km(*args) for args in zip(lat1, lon1, lat2, lon2)]
+        np.testing.assert_allclose(haversine_km_array(lat1, lon1, lat2, lon2), expected)
+
+
+@tagged('post_install', '-at_install')
+class TestSegmentMotion(BaseCase):
+    
+    def test_empty(self):
+        distances, speeds, jumps = segment_motion([], {}, 250.0)
+        self.assertEqual((len(distances), len(speeds), len(jumps)), (0, 0, 0))
+    
+    def test_consecutive_points(self):
+        # About 1.11 km north every minute: 66.7 km/h
+        points = [(1, 0, 24.70, 46.67), (1, 60, 24.71, 46.67), (1, 120, 24.72, 46.67)]
+        distances, speeds, jumps = segment_motion(points, {}, 250.0)
+        self.assertEqual(distances[0], 0.0)
+        self.assertEqual(speeds[0], 0.0)
+        np.testing.assert_allclose(distances[1:], 1.112, atol=1e-3)
+        np.testing.assert_allclose(speeds[1:], 66.7, atol=0.1)
+        self.assertFalse(jumps.any())
+    
+    def test_previous_point(self):
+        # Each vehicle is measured from its own previous fix only
+        points = [(1, 60, 24.71, 46.67), (2, 60, 24.70, 46.67)]
+        distances, _speeds, jumps = segment_motion(points, {1: (0, 24.70, 46.67)}, 250.0)
+        self.assertAlmostEqual(distances[0], 1.112, places=3)
+        self.assertEqual(distances[1], 0.0)
+        self.assertFalse(jumps.any())
+    
+    def test_gps_jump(self):
+        # 111 km in one minute is a jump: no distance, no speed
+        points = [(1, 0, 24.70, 46.67), (1, 60, 25.70, 46.67), (1, 120, 25.71, 46.67)]
+        distances, speeds, jumps = segment_motion(points, {}, 250.0)
+        self.assertEqual(jumps.tolist(), [False, True, False])
+        self.assertEqual(distances[1], 0.0)
+        self.assertEqual(speeds[1], 0.0)
+        self.assertAlmostEqual(distances[2], 1.112, places=3)
+    
+    def test_same_time(self):
+        # A move without elapsed time is a jump, standing still is not
+        points = [(1, 0, 24.70, 46.67), (1, 0, 24.70, 46.67), (1, 0, 24.71, 46.67)]
+        distances, _speeds, jumps = segment_motion(points, {}, 250.0)
+        self.assertEqual(jumps.tolist(), [False, False, True])
+        self.assertEqual(distances.tolist(), [0.0, 0.0, 0.0])
+
+
+@tagged('post_install', '-at_install')
+class TestTrackSimplification(BaseCase):
+    
+    def test_douglas_peucker_straight(self):
+        # Points on a straight line collapse to its ends
+        lats = np.linspace(24.70, 24.80, 11)
+        self.assertEqual(douglas_peucker(lats, np.full(11, 46.67), 1e-5).tolist(), [0, 10])
+    
+    def test_douglas_peucker_corner(self):
+        lats = [24.70, 24.71, 24.72, 24.72, 24.72]
+        lons = [46.67, 46.67, 46.67, 46.68, 46.69]
+        self.assertEqual(douglas_peucker(lats, lons, 1e-4).tolist(), [0, 2, 4])
+    
+    def test_douglas_peucker_tolerance(self):
+        # A 0.001 degree detour is kept below the tolerance only
+        lats = [24.70, 24.701, 24.70]
+        lons = [46.67, 46.68, 46.69]
+        self.assertEqual(douglas_peucker(lats, lons, 1e-4).tolist(), [0, 1, 2])
+        self.assertEqual(douglas_peucker(lats, lons, 1e-2).tolist(), [0, 2])
+    
+    def test_douglas_peucker_few_points(self):
+        self.assertEqual(douglas_peucker([], [], 1e-4).tolist(), [])
+        self.assertEqual(douglas_peucker([24.7, 24.8], [46.6, 46.7], 1e-4).tolist(), [0, 1])
+    
+    def test_douglas_peucker_loop(self):
+        # A closed loop starts and ends on the same point
+        lats = [24.70, 24.71, 24.71, 24.70, 24.70]
+        lons = [46.67, 46.67, 46.68, 46.68, 46.67]
+        self.assertEqual(douglas_peucker(lats, lons, 1e-4).tolist(), [0, 1, 2, 3, 4])
+    
+    def test_encode_polyline(self):
+        # The example of the encoded polyline algorithm format
+        encoded = encode_polyline([38.5, 40.7, 43.252], [-120.2, -120.95, -126.453])
+        self.assertEqual(encoded, '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+        self.assertEqual(encode_polyline([], []), '')
+    
+    def test_encode_polyline_precision(self):
+        self.assertEqual(encode_polyline([38.5], [-120.2], precision=6), '_izlhA~rlgdF')
+
+
+@tagged('post_install', '-at_install')
+class TestGeofenceIndex(BaseCase):
+    
+    def test_point_in_polygon(self):
+        self.assertTrue(point_in_polygon(24.705, 46.675, SQUARE))
+        self.assertFalse(point_in_polygon(24.715, 46.675, SQUARE))
+        self.assertFalse(point_in_polygon(24.705, 46.685, SQUARE))
+    
+    def test_point_in_concave_polygon(self):
+        # An L shape: the notch at the top right is outside
+        shape = [(0.0, 0.0), (2.0, 0.0), (2.0, 1.0), (1.0, 1.0), (1.0, 2.0), (0.0, 2.0)]
+        self.assertTrue(point_in_polygon(0.5, 1.5, shape))
+        self.assertTrue(point_in_polygon(1.5, 0.5, shape))
+        self.assertFalse(point_in_polygon(1.5, 1.5, shape))
+    
+    def test_lookup_circle(self):
+        index = GeofenceIndex()
+        index.add_circle(1, False, 24.70, 46.67, 500.0)
+        self.assertEqual(index.lookup(24.70, 46.67), {1})
+        # About 330 m north, then about 670 m north
+        self.assertEqual(index.lookup(24.703, 46.67), {1})
+        self.assertEqual(index.lookup(24.706, 46.67), set())
+    
+    def test_lookup_across_cells(self):
+        # The circle straddles grid cells; points of every cell find it
+        index = GeofenceIndex(cell_size=0.001)
+        index.add_circle(1, False, 24.70, 46.67, 300.0)
+        index.add_polygon(2, False, SQUARE)
+        self.assertEqual(index.lookup(24.7015, 46.6715), {1, 2})
+        self.assertEqual(index.lookup(24.6985, 46.6685), {1})
+        self.assertEqual(index.lookup(24.709, 46.679), {2})
+    
+    def test_lookup_large_fence(self):
+        index = GeofenceIndex(cell_size=0.001, max_cells=4)
+        index.add_polygon(1, False, SQUARE)
+        self.assertEqual(index.large, [1])
+        self.assertEqual(index.lookup(24.705, 46.675), {1})
+        self.assertEqual(index.lookup(24.715, 46.675), set())
+    
+    def test_lookup_company(self):
+        index = GeofenceIndex()
+        index.add_polygon(1, 1, SQUARE)
+        index.add_polygon(2, 2, SQUARE)
+        index.add_polygon(3, False, SQUARE)
+        self.assertEqual(index.lookup(24.705, 46.675, company_id=1), {1, 3})
+        self.assertEqual(index.lookup(24.705, 46.675), {1, 2, 3})
@@ -0,0 +1,47 @@
+# tests/test_geocoder.py
+from odoo.tests import BaseCase, tagged
+
+from ..tools.geocoder import Gazetteer
+
+PLACES = [
+    ('road', 'King Fahd Road', 24.68, 46.685, 24.76, 46.655),
+    ('road', 'Olaya Street', 24.68, 46.69, 24.74, 46.69),
+    ('district', 'Al Olaya', 24.70, 46.68, None, None),
+    ('district', 'Al Malaz', 24.66, 46.73, None, None),
+    ('city', 'Riyadh', 24.71, 46.68, None, None),
+]
+
+
+@tagged('post_install', '-at_install')
+class TestGazetteer(BaseCase):
+    
+    def test_resolve(self):
+        gazetteer = Gazetteer(PLACES)
+        self.assertEqual(gazetteer.resolve(24.72, 46.6705), 'King Fahd Road, Al Olaya, Riyadh')
+    
+    def test_nearest_road(self):
+        # Roads are measured to their segment, not to their ends
+        gazetteer = Gazetteer(PLACES)
+        self.assertTrue(gazetteer.resolve(24.71, 46.6895).startswith('Olaya Street, '))
+    
+    def test_too_far(self):
+        gazetteer = Gazetteer(PLACES)
+        # Away from every road, close to a district
+        self.assertEqual(gazetteer.resolve(24.66, 46.74), 'Al Malaz, Riyadh')
+        # Out of the city
+        self.assertEqual(gazetteer.resolve(26.0, 50.0), '')
+    
+    def test_empty(self):
+        self.assertFalse(Gazetteer([]))
+        self.assertTrue(Gazetteer(PLACES[-1:]))
+        self.assertEqual(Gazetteer([]).resolve(24.71, 46.68), '')
+    
+    def test_cache(self):
+        gazetteer = Gazetteer(PLACES, cache_size=2)
+        gazetteer.store({'a': 'Road A', 'b': 'Road B'})
+        self.assertEqual(gazetteer.get_cached(['a', 'c']), {'a': 'Road A'})
+        self.assertEqual((gazetteer.hits, gazetteer.misses), (1, 1))
+        # 'a' was read last, 'b' is evicted
+        gazetteer.store({'c': 'Road C'})
+        self.assertEqual(list(gazetteer.cache), ['a', 'c'])
+        self.assertEqual(gazetteer.get_cached(['b']), {})
@@ -0,0 +1,62 @@
+# tests/test_geofence.py
+from odoo.tests import tagged
+
+from .common import TammTestCommon
+
+OUTSIDE = (24.72, 46.67)
+INSIDE = (24.701, 46.671)
+
+
+@tagged('post_install', '-at_install')
+class TestGeofence(TammTestCommon):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fence = cls.env['tamm.geofence'].create({
+            'name': 'Depot',
+            'shape': 'circle',
+            'center_latitude': 24.70,
+            'center_longitude': 46.67,
+            'radius': 500.0,
+        })
+    
+    def _alerts(self):
+        return self.env['tamm.alert'].search(
+            [('geofence_id', '=', self.fence.id)], order='timestamp')
+    
+    def test_entry_and_exit(self):
+        self._track([(0, *OUTSIDE), (1, *INSIDE), (2, *INSIDE), (3, *OUTSIDE)])
+        alerts = self._alerts()
+        self.assertEqual(alerts.mapped('geofence_event'), ['entry', 'exit'])
+        self.assertEqual(set(alerts.mapped('alert_type')), {'geofence_violation'})
+        self.assertEqual(alerts.vehicle_id, self.vehicle)
+        self.assertEqual(alerts[0].latitude, INSIDE[0])
+    
+    def test_exit_across_batches(self):
+        # The fences the vehicle was in come from its previous stored point
+        self._track([(0, *OUTSIDE), (1, *INSIDE)])
+        self._track([(2, *INSIDE)])
+        self.assertEqual(self._alerts().mapped('geofence_event'), ['entry'])
+        self._track([(3, *OUTSIDE)])
+        self.assertEqual(self._alerts().mapped('geofence_event'), ['entry', 'exit'])
+    
+    def test_alert_on_entry_only(self):
+        self.fence.alert_on = 'entry'
+        self._track([(0, *OUTSIDE), (1, *INSIDE), (2, *OUTSIDE)])
+        self.assertEqual(self._alerts().mapped('geofence_event'), ['entry'])
+    
+    def test_redelivered_points(self):
+        # A sync repeating fixes already stored raises no new alert
+        points = [(0, *OUTSIDE), (1, *INSIDE)]
+        self._track(points)
+        records, skipped = self._track(points)
+        self.assertFalse(records)
+        self.assertEqual(skipped, 2)
+        self.assertEqual(len(self._alerts()), 1)
+    
+    def test_other_company(self):
+        company = self.env['res.company'].create({'name': 'Other Fleet'})
+        self.fence.company_id = company
+        self._track([(0, *OUTSIDE), (1, *INSIDE)])
+        self.assertFalse(self._alerts())
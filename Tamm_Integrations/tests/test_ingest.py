@@ -0,0 +1,167 @@
+# tests/test_ingest.py
+from datetime import timedelta
+from unittest.mock import patch
+
+from psycopg2.errors import UniqueViolation
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import TammTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestIngest(TammTestCommon):
+    
+    def _alert_vals(self, minutes, alert_type='speeding', **vals):
+        return {
+            'vehicle_id': self.vehicle.id,
+            'timestamp': self.start + timedelta(minutes=minutes),
+            'alert_type': alert_type,
+            'description': 'Test alert',
+            **vals,
+        }
+    
+    def test_redelivered_tracking(self):
+        points = [(0, 24.70, 46.67), (1, 24.71, 46.67)]
+        records, skipped = self._track(points)
+        self.assertEqual((len(records), skipped), (2, 0))
+        records, skipped = self._track(points + [(2, 24.72, 46.67)])
+        self.assertEqual((len(records), skipped), (1, 2))
+        self.assertEqual(self.env['tamm.tracking'].search_count(
+            [('vehicle_id', '=', self.vehicle.id)]), 3)
+    
+    def test_duplicates_in_batch(self):
+        records, skipped = self._track([(0, 24.70, 46.67), (0, 24.70, 46.67)])
+        self.assertEqual((len(records), skipped), (1, 1))
+    
+    def test_alert_natural_key(self):
+        Alert = self.env['tamm.alert']
+        records, skipped = Alert._tamm_ingest([
+            self._alert_vals(0),
+            self._alert_vals(0, alert_type='low_fuel'),
+        ])
+        self.assertEqual((len(records), skipped), (2, 0))
+        # An empty geofence matches a missing one
+        records, skipped = Alert._tamm_ingest([self._alert_vals(0, geofence_id=False)])
+        self.assertEqual((len(records), skipped), (0, 1))
+    
+    @mute_logger('odoo.sql_db')
+    def test_unique_index(self):
+        records, _skipped = self._track([(0, 24.70, 46.67)])
+        with self.assertRaises(UniqueViolation), self.env.cr.savepoint():
+            self.env['tamm.tracking'].create({
+                'vehicle_id': self.vehicle.id,
+                'timestamp': self.start,
+                'latitude': 24.80,
+                'longitude': 46.80,
+                'tamm_key': records.tamm_key,
+            })
+    
+    def test_manual_records(self):
+        # Records entered by hand are not constrained by the natural key
+        Maintenance = self.env['tamm.maintenance']
+        today = fields.Date.today()
+        vals = {'vehicle_id': self.vehicle.id, 'name': 'Oil Change', 'date': today}
+        records, _skipped = Maintenance._tamm_ingest([vals])
+        self.assertTrue(records.tamm_key)
+        manual = Maintenance.create([vals, vals])
+        manual.action_complete()
+        self.assertEqual(manual.mapped('state'), ['completed', 'completed'])
+        self.assertFalse(any(manual.mapped('tamm_key')))
+        # A synced record edited to the key of another one is accepted too
+        other, _skipped = Maintenance._tamm_ingest([{**vals, 'date': today - timedelta(days=1)}])
+        other.action_complete()
+        self.assertEqual(other.date, today)
+        # Tamm sending a record entered by hand does not duplicate it
+        fuel = self.env['tamm.fuel.log'].create({
+            'vehicle_id': self.vehicle.id,
+            'date': self.start,
+            'quantity': 40.0,
+        })
+        records, skipped = fuel._tamm_ingest([{
+            'vehicle_id': self.vehicle.id,
+            'date': self.start,
+            'quantity': 40.0,
+        }])
+        self.assertEqual((len(records), skipped), (0, 1))
+    
+    @mute_logger('odoo.sql_db')
+    def test_concurrent_ingest(self):
+        # A row stored by another transaction after the prefetch makes the
+        # batch fail; the rows are then created one by one
+        self._track([(0, 24.70, 46.67)])
+        Tracking = self.env['tamm.tracking']
+        vals_list = [{
+            'vehicle_id': self.vehicle.id,
+            'timestamp': self.start + timedelta(minutes=minutes),
+            'latitude': 24.70,
+            'longitude': 46.67,
+        } for minutes in (0, 1)]
+        with patch.object(type(Tracking), 'search_fetch', lambda self, *args, **kwargs: self.browse()):
+            records, skipped = Tracking._tamm_bulk_ingest(vals_list)
+        self.assertEqual((len(records), skipped), (1, 1))
+        self.assertEqual(records.timestamp, self.start + timedelta(minutes=1))
+
+
+@tagged('post_install', '-at_install')
+class TestPush(TammTestCommon):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.config = cls.env['tamm.config'].create({
+            'name': 'Tamm Test',
+            'api_url': 'https://tamm.example.com',
+            'api_key': 'key',
+            'api_secret': 'secret',
+        })
+    
+    def _fix(self, minutes, **record):
+        return {
+            'vehicle_id': 'V1',
+            'timestamp': self.start + timedelta(minutes=minutes),
+            'latitude': 24.70,
+            'longitude': 46.67,
+            **record,
+        }
+    
+    def test_push(self):
+        result = self.env['tamm.tracking']._tamm_ingest_push(self.config, [
+            self._fix(0),
+            # On the equator and the prime meridian
+            self._fix(1, latitude=0.0, longitude=0.0),
+            self._fix(2, vehicle_id='V2'),
+        ])
+        self.assertEqual(result, {
+            'inserted': 2,
+            'skipped': 0,
+            'unknown_vehicles': 1,
+            'rejected': 0,
+            'errors': [],
+        })
+        result = self.env['tamm.tracking']._tamm_ingest_push(self.config, [self._fix(0)])
+        self.assertEqual((result['inserted'], result['skipped']), (0, 1))
+    
+    def test_push_rejected(self):
+        fix_without_time = self._fix(0)
+        del fix_without_time['timestamp']
+        result = self.env['tamm.tracking']._tamm_ingest_push(self.config, [
+            fix_without_time,
+            self._fix(1, latitude='north'),
+            self._fix(2, vehicle_id=None),
+            self._fix(3),
+        ])
+        self.assertEqual(result['inserted'], 1)
+        self.assertEqual(result['rejected'], 3)
+        self.assertEqual([error['index'] for error in result['errors']], [0, 1, 2])
+        self.assertEqual(result['errors'][0]['error'], 'missing timestamp')
+        self.assertTrue(result['errors'][1]['error'].startswith('invalid latitude'))
+        self.assertEqual(result['errors'][2]['error'], 'missing vehicle_id')
+    
+    def test_push_other_company(self):
+        company = self.env['res.company'].create({'name': 'Other Fleet'})
+        self.config.company_id = company
+        result = self.env['tamm.tracking']._tamm_ingest_push(self.config, [self._fix(0)])
+        self.assertEqual((result['inserted'], result['unknown_vehicles']), (0, 1))
@@ -0,0 +1,79 @@
+# tests/test_rate_limit.py
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import requests
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools.rate_limit import (
+    MAX_RETRY_AFTER,
+    AIMDLimiter,
+    backoff_delay,
+    error_status,
+    is_retryable,
+    retry_after,
+)
+
+
+def http_error(status, retry_after_header=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after_header is not None:
+        response.headers['Retry-After'] = retry_after_header
+    return requests.HTTPError(f'{status} error', response=response)
+
+
+@tagged('post_install', '-at_install')
+class TestRateLimit(BaseCase):
+    
+    def test_aimd_window(self):
+        limiter = AIMDLimiter(8, initial=4)
+        self.assertEqual(limiter.window, 4)
+        # A window of successes grows it by about one
+        for _i in range(5):
+            limiter.on_success()
+        self.assertEqual(limiter.window, 5)
+        limiter.on_overload()
+        self.assertEqual(limiter.window, 2)
+    
+    def test_aimd_bounds(self):
+        limiter = AIMDLimiter(4)
+        self.assertEqual(limiter.window, 4)
+        for _i in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.window, 4)
+        for _i in range(10):
+            limiter.on_overload()
+        self.assertEqual(limiter.window, 1)
+        self.assertEqual(AIMDLimiter(0, minimum=2).window, 2)
+    
+    def test_retryable(self):
+        self.assertTrue(is_retryable(http_error(429)))
+        self.assertTrue(is_retryable(http_error(503)))
+        self.assertFalse(is_retryable(http_error(400)))
+        self.assertFalse(is_retryable(http_error(404)))
+        self.assertTrue(is_retryable(requests.ConnectionError('refused')))
+        self.assertTrue(is_retryable(requests.Timeout('timed out')))
+        self.assertIsNone(error_status(requests.ConnectionError('refused')))
+        self.assertEqual(error_status(http_error(502)), 502)
+    
+    def test_retry_after_seconds(self):
+        self.assertEqual(retry_after(http_error(429, '5')), 5.0)
+        self.assertEqual(retry_after(http_error(429, '-3')), 0.0)
+        self.assertEqual(retry_after(http_error(503, '86400')), MAX_RETRY_AFTER)
+        self.assertIsNone(retry_after(http_error(429)))
+        self.assertIsNone(retry_after(http_error(429, 'soon')))
+        self.assertIsNone(retry_after(requests.ConnectionError('refused')))
+    
+    def test_retry_after_date(self):
+        date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(retry_after(http_error(503, date)), 60.0, delta=2.0)
+        past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+        self.assertEqual(retry_after(http_error(503, past)), 0.0)
+    
+    def test_backoff_delay(self):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base=1.0, cap=30.0)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, min(30.0, 2 ** attempt))
@@ -0,0 +1,66 @@
+# tests/test_rollup.py
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import TammTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRollup(TammTestCommon):
+    
+    def setUp(self):
+        super().setUp()
+        # Keep every point within one hour and one day
+        self.hour = self.start.replace(minute=0, second=0)
+    
+    def _create(self, points):
+        """Create (minutes after the hour, engine status) points"""
+        return self.env['tamm.tracking'].create([{
+            'vehicle_id': self.vehicle.id,
+            'timestamp': self.hour + timedelta(minutes=minutes),
+            'latitude': 24.7,
+            'longitude': 46.67,
+            'engine_status': status,
+        } for minutes, status in points])
+    
+    def _rollup(self, model_name):
+        return self.env[model_name].search([('vehicle_id', '=', self.vehicle.id)])
+    
+    def _assert_minutes(self, engine_on, idle):
+        for model_name in ('tamm.tracking.hourly', 'tamm.tracking.daily'):
+            rollup = self._rollup(model_name)
+            self.assertEqual(len(rollup), 1)
+            self.assertAlmostEqual(rollup.engine_on_minutes, engine_on)
+            self.assertAlmostEqual(rollup.idle_minutes, idle)
+    
+    def test_minutes_from_durations(self):
+        # The last point has no duration yet; the 30 minute gap is capped
+        self._create([(0, 'on'), (5, 'on'), (8, 'idle'), (10, 'on'), (40, 'on')])
+        self._assert_minutes(5 + 3 + 10, 2)
+    
+    def test_appended_batches(self):
+        self._create([(0, 'on'), (5, 'idle')])
+        self._create([(7, 'on')])
+        self._create([(9, 'on'), (12, 'off')])
+        self._assert_minutes(5 + 2 + 3, 2)
+        self.assertEqual(self._rollup('tamm.tracking.hourly').point_count, 5)
+    
+    def test_late_point(self):
+        self._create([(0, 'on'), (10, 'off')])
+        self._create([(4, 'idle')])
+        self._assert_minutes(4, 6)
+        self.assertEqual(self._rollup('tamm.tracking.daily').point_count, 3)
+    
+    def test_unlink(self):
+        points = self._create([(0, 'on'), (4, 'idle'), (10, 'off')])
+        points[1].unlink()
+        self._assert_minutes(10, 0)
+    
+    def test_rebuild_matches(self):
+        self._create([(0, 'on'), (5, 'idle')])
+        self._create([(2, 'on'), (20, 'on'), (25, 'off')])
+        hourly = self._rollup('tamm.tracking.hourly')
+        engine_on, idle = hourly.engine_on_minutes, hourly.idle_minutes
+        self.env['tamm.tracking.hourly'].action_rebuild()
+        self._assert_minutes(engine_on, idle)
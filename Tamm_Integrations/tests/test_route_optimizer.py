@@ -0,0 +1,111 @@
+# tests/test_route_optimizer.py
+import numpy as np
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools.route_optimizer import (
+    distance_matrix,
+    or_opt,
+    schedule,
+    solve_route,
+    tour_length,
+    two_opt,
+)
+
+
+def line_matrix(positions):
+    """Distances between points of a straight road"""
+    positions = np.asarray(positions, dtype=float)
+    return np.abs(positions[:, None] - positions[None, :])
+
+
+def always(candidate, current):
+    return True
+
+
+@tagged('post_install', '-at_install')
+class TestRouteOptimizer(BaseCase):
+    
+    def test_distance_matrix(self):
+        matrix = distance_matrix([24.70, 24.71, 24.72], [46.67, 46.67, 46.67])
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0.0)
+        self.assertAlmostEqual(matrix[0, 2], 2 * matrix[0, 1], places=6)
+    
+    def test_schedule(self):
+        matrix = line_matrix([0, 10, 20])
+        # 10 km at 10 km/h, wait for the window opening at 2 h, then
+        # arrive 1 h after the 2.5 h closing time
+        arrivals, lateness = schedule([0, 1, 2], matrix, 10.0,
+                                      windows=np.array([[0, 24], [2, 3], [0, 2.5]]))
+        self.assertEqual(arrivals, [0.0, 2.0, 3.0])
+        self.assertAlmostEqual(lateness, 0.5)
+    
+    def test_schedule_service(self):
+        matrix = line_matrix([0, 10, 20])
+        arrivals, lateness = schedule([0, 1, 2], matrix, 10.0, service=np.array([0.0, 0.5, 0.0]))
+        self.assertEqual(arrivals, [0.0, 1.0, 2.5])
+        self.assertEqual(lateness, 0.0)
+    
+    def test_two_opt(self):
+        # Going back and forth along the road is uncrossed into one pass
+        matrix = line_matrix([0, 1, 2, 3, 4, 5])
+        order = two_opt([0, 3, 2, 1, 4, 5], matrix, always)
+        self.assertEqual(order.tolist(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(tour_length(order, matrix), 5.0)
+    
+    def test_or_opt(self):
+        # A stop visited out of place is moved between its neighbours
+        matrix = line_matrix([0, 1, 2, 3, 4, 5])
+        order = or_opt([0, 1, 4, 2, 3, 5], matrix, always)
+        self.assertEqual(order.tolist(), [0, 1, 2, 3, 4, 5])
+    
+    def test_local_search_keeps_ends(self):
+        matrix = line_matrix([5, 1, 2, 3, 4, 0])
+        for improve in (two_opt, or_opt):
+            order = improve([0, 1, 2, 3, 4, 5], matrix, always)
+            self.assertEqual((order[0], order[-1]), (0, 5))
+    
+    def test_local_search_rejected(self):
+        matrix = line_matrix([0, 1, 2, 3, 4, 5])
+        for improve in (two_opt, or_opt):
+            order = improve([0, 3, 2, 1, 4, 5], matrix, lambda candidate, current: False)
+            self.assertEqual(order.tolist(), [0, 3, 2, 1, 4, 5])
+    
+    def test_solve_route(self):
+        lats = [24.70, 24.74, 24.71, 24.73, 24.72, 24.75]
+        order, length, arrivals, lateness = solve_route(lats, [46.67] * 6, 40.0)
+        self.assertEqual(order, [0, 2, 4, 3, 1, 5])
+        self.assertAlmostEqual(length, distance_matrix(lats, [46.67] * 6)[0, 5], places=6)
+        self.assertEqual(len(arrivals), 6)
+        self.assertEqual(lateness, 0.0)
+    
+    def test_solve_route_time_windows(self):
+        # The farthest stop closes before the others could be served on
+        # the way: it is visited first, although the route gets longer
+        matrix = line_matrix([0, 10, 20, 30, 0])
+        windows = np.array([[0, 24], [0, 24], [0, 24], [0, 1], [0, 24]])
+        service = np.array([0, 0.5, 0.5, 0.5, 0])
+        order, length, arrivals, lateness = solve_route(None, None, 30.0, windows=windows,
+                                                        service=service, matrix=matrix)
+        self.assertEqual(order[:2], [0, 3])
+        self.assertEqual(lateness, 0.0)
+        self.assertAlmostEqual(arrivals[1], 1.0)
+        self.assertEqual(length, 60.0)
+    
+    def test_solve_route_late_windows(self):
+        # Windows no order can meet are missed by as little as possible
+        matrix = line_matrix([0, 10, 20, 0])
+        windows = np.array([[0, 24], [0, 0.5], [0, 0.5], [0, 24]])
+        _order, _length, _arrivals, lateness = solve_route(None, None, 10.0, windows=windows,
+                                                           matrix=matrix)
+        self.assertAlmostEqual(lateness, 2.0)
+    
+    def test_solve_route_open(self):
+        # An open route ends at its last stop
+        matrix = line_matrix([0, 3, 1, 2])
+        order, length, arrivals, _lateness = solve_route(None, None, 10.0, fixed_end=False,
+                                                         matrix=matrix)
+        self.assertEqual(order, [0, 2, 3, 1])
+        self.assertEqual(length, 3.0)
+        self.assertEqual(len(arrivals), 4)
@@ -0,0 +1,104 @@
+# tests/test_sync.py
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import TammTestCommon
+from ..tools.tamm_client import TammClient
+
+PAGE_SIZE = 2
+
+
+@tagged('post_install', '-at_install')
+class TestSyncPages(TammTestCommon):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.config = cls.env['tamm.config'].create({
+            'name': 'Tamm Test',
+            'api_url': 'https://tamm.example.com',
+            'api_key': 'key',
+            'api_secret': 'secret',
+        })
+        cls.alerts = [{
+            'timestamp': (cls.start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+            'alert_type': 'speeding',
+            'description': f'Alert {i}',
+        } for i in range(5)]
+    
+    def setUp(self):
+        super().setUp()
+        self.requests = []
+        
+        def fetch(client, tamm_vehicle_id, stream, params=None):
+            self.requests.append((stream, params))
+            if stream == 'location':
+                return {'timestamp': self.start, 'latitude': 24.70, 'longitude': 46.67}
+            if stream != 'alerts':
+                return {}
+            start = int(params['cursor']) if params and params.get('cursor') else 0
+            end = min(start + PAGE_SIZE, len(self.alerts))
+            return {
+                'alerts': self.alerts[start:end],
+                'next_cursor': str(end) if end < len(self.alerts) else None,
+            }
+        
+        # Requests are answered locally and never wait for tokens
+        RateLimit = type(self.env['tamm.rate.limit'])
+        for target, method, value in [
+            (TammClient, 'fetch_vehicle_stream', fetch),
+            (RateLimit, '_acquire', lambda self, config, wanted: (wanted, 0.0)),
+            (RateLimit, '_release', lambda self, config, tokens: None),
+            (RateLimit, '_record_outcome', lambda self, config, succeeded, failures: None),
+            (RateLimit, '_is_open', lambda self, config: False),
+        ]:
+            patcher = patch.object(target, method, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def _cursor(self):
+        return self.env['tamm.sync.cursor'].search([
+            ('vehicle_id', '=', self.vehicle.id), ('stream', '=', 'alerts'),
+        ])
+    
+    def _alert_count(self):
+        return self.env['tamm.alert'].search_count([('vehicle_id', '=', self.vehicle.id)])
+    
+    def test_follow_pages(self):
+        # Every page is fetched in the same sync
+        result = self.vehicle._tamm_sync_vehicles(self.config)
+        self.assertEqual(result['streams']['alerts']['requests'], 3)
+        self.assertEqual(self._alert_count(), 5)
+        self.assertFalse(self._cursor().cursor)
+        self.assertEqual(self._cursor().since, self.start + timedelta(minutes=4))
+        # The next sync asks for newer records only
+        self.requests.clear()
+        self.vehicle._tamm_sync_vehicles(self.config)
+        self.assertEqual([params for stream, params in self.requests if stream == 'alerts'],
+                         [{'since': fields.Datetime.to_string(self.start + timedelta(minutes=4))}])
+    
+    def test_page_budget(self):
+        # Pages beyond the budget wait for the next sync, from the saved cursor
+        with patch('odoo.addons.Tamm_Integrations.models.fleet_vehicle.SYNC_MAX_PAGES', 2):
+            self.vehicle._tamm_sync_vehicles(self.config)
+            self.assertEqual(self._alert_count(), 4)
+            self.assertEqual(self._cursor().cursor, '4')
+            self.vehicle._tamm_sync_vehicles(self.config)
+        self.assertEqual(self._alert_count(), 5)
+        self.assertFalse(self._cursor().cursor)
+    
+    def test_reset(self):
+        self.vehicle._tamm_sync_vehicles(self.config)
+        self.env['tamm.alert'].search([('vehicle_id', '=', self.vehicle.id)]).unlink()
+        self._cursor().action_reset()
+        self.vehicle._tamm_sync_vehicles(self.config)
+        self.assertEqual(self._alert_count(), 5)
+    
+    def test_stream_sync(self):
+        inserted, skipped = self.env['tamm.sync.cursor']._sync_stream(
+            self.env['tamm.alert'], self.vehicle, self.config)
+        self.assertEqual((inserted, skipped), (5, 0))
+        self.assertFalse(self._cursor().cursor)
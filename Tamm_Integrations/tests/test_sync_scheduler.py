@@ -0,0 +1,73 @@
+# tests/test_sync_scheduler.py
+from odoo.tests import BaseCase, tagged
+
+from ..tools.sync_scheduler import SyncScheduler
+
+
+class FakeClock:
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@tagged('post_install', '-at_install')
+class TestSyncScheduler(BaseCase):
+    
+    def test_window_and_tokens(self):
+        scheduler = SyncScheduler(range(5), 2, clock=FakeClock())
+        self.assertFalse(scheduler.take())
+        # Tokens are asked a whole window at a time
+        self.assertEqual(scheduler.wanted_tokens(), 2)
+        scheduler.add_tokens(2, 0.0)
+        self.assertEqual(scheduler.wanted_tokens(), 0)
+        items = scheduler.take()
+        self.assertEqual(items, [0, 1])
+        for item in items:
+            scheduler.start(f'future {item}', item)
+        # The window is full until a request completes
+        self.assertEqual(scheduler.wanted_tokens(), 0)
+        self.assertEqual(scheduler.finish('future 0'), 0)
+        self.assertEqual(scheduler.wanted_tokens(), 2)
+        self.assertTrue(scheduler)
+    
+    def test_bucket_wait(self):
+        clock = FakeClock()
+        scheduler = SyncScheduler(range(3), 2, clock=clock)
+        scheduler.add_tokens(0, 5.0)
+        # The bucket is not asked again before its announced wait
+        self.assertEqual(scheduler.wanted_tokens(), 0)
+        self.assertEqual(scheduler.timeout(), 5.0)
+        clock.now = 5.0
+        self.assertEqual(scheduler.wanted_tokens(), 2)
+    
+    def test_retry(self):
+        clock = FakeClock()
+        scheduler = SyncScheduler(['a', 'b'], 2, clock=clock)
+        scheduler.add_tokens(2, 0.0)
+        for item in scheduler.take():
+            scheduler.start(item, item)
+        scheduler.finish('b')
+        scheduler.retry('b', 3.0)
+        scheduler.finish('a')
+        scheduler.retry('a', 1.0)
+        self.assertEqual(scheduler.timeout(), 1.0)
+        clock.now = 2.0
+        scheduler.release_due()
+        self.assertEqual(list(scheduler.pending), ['a'])
+        self.assertEqual(scheduler.timeout(), 1.0)
+        self.assertEqual(sorted(scheduler.drop_waiting()), ['a', 'b'])
+        self.assertFalse(scheduler)
+        self.assertIsNone(scheduler.timeout())
+    
+    def test_add(self):
+        # A next page waits behind the items already queued
+        scheduler = SyncScheduler(['a', 'b'], 1, clock=FakeClock())
+        scheduler.add_tokens(1, 0.0)
+        item = scheduler.take()[0]
+        scheduler.start(item, item)
+        scheduler.finish(item)
+        scheduler.add('a2')
+        self.assertEqual(list(scheduler.pending), ['b', 'a2'])
@@ -0,0 +1,7 @@
+from . import tamm_client
+from . import geo
+from . import route_optimizer
+from . import distance_cache
+from . import geocoder
+from . import rate_limit
+from . import sync_scheduler
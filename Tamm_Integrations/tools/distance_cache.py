@@ -0,0 +1,110 @@
+# tools/distance_cache.py
+from collections import OrderedDict
+import threading
+
+import numpy as np
+
+from .geo import geohash_center, haversine_km_array
+
+
+class DistanceCache:
+    """Size-bounded LRU of distances between geohash cells.
+
+    Keys are ordered (cell, cell) pairs, distances are symmetric. Entries
+    missing from memory are handed in one batch to a loader, which returns
+    the ones it knows (e.g. from a persistent table); the rest are computed
+    in a single vectorized pass between cell centers. Points sharing a cell
+    are measured exactly, as their centers would put them 0 km apart.
+    """
+
+    def __init__(self, max_entries=200000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(cell_a, cell_b):
+        return (cell_a, cell_b) if cell_a <= cell_b else (cell_b, cell_a)
+
+    def _store(self, values):
+        with self.lock:
+            for key, value in values.items():
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def matrix(self, cells, loader=None, latitudes=None, longitudes=None):
+        """Return the distance matrix (km) of a list of cells, and the
+        entries that were computed rather than found.
+
+        With the coordinates of the points the cells were taken from, the
+        distances between points of the same cell are exact.
+        """
+        unique = sorted(set(cells))
+        position = {cell: i for i, cell in enumerate(unique)}
+        result = np.zeros((len(unique), len(unique)))
+        
+        missing = []
+        with self.lock:
+            for i, cell_a in enumerate(unique):
+                for j in range(i + 1, len(unique)):
+                    key = (cell_a, unique[j])
+                    value = self.entries.get(key)
+                    if value is None:
+                        missing.append(key)
+                        continue
+                    self.entries.move_to_end(key)
+                    result[i, j] = result[j, i] = value
+            self.hits += len(unique) * (len(unique) - 1) // 2 - len(missing)
+            self.misses += len(missing)
+        
+        found = loader(missing) if (loader and missing) else {}
+        computed = {}
+        pending = [key for key in missing if key not in found]
+        if pending:
+            centers_a = np.array([geohash_center(cell_a) for cell_a, _cell_b in pending])
+            centers_b = np.array([geohash_center(cell_b) for _cell_a, cell_b in pending])
+            distances = haversine_km_array(centers_a[:, 0], centers_a[:, 1],
+                                           centers_b[:, 0], centers_b[:, 1])
+            computed = dict(zip(pending, distances.tolist()))
+        
+        loaded = {**found, **computed}
+        for (cell_a, cell_b), value in loaded.items():
+            i, j = position[cell_a], position[cell_b]
+            result[i, j] = result[j, i] = value
+        self._store(loaded)
+        
+        indexes = np.array([position[cell] for cell in cells], dtype=int)
+        matrix = result[np.ix_(indexes, indexes)]
+        if latitudes is not None and longitudes is not None:
+            same_cell = indexes[:, None] == indexes[None, :]
+            np.fill_diagonal(same_cell, False)
+            rows, cols = np.nonzero(same_cell)
+            if len(rows):
+                latitudes = np.asarray(latitudes, dtype=float)
+                longitudes = np.asarray(longitudes, dtype=float)
+                matrix[rows, cols] = haversine_km_array(latitudes[rows], longitudes[rows],
+                                                        latitudes[cols], longitudes[cols])
+        return matrix, computed
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def statistics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,226 @@
+# tools/geo.py
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two points in degrees"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km_array(lat1, lon1, lat2, lon2):
+    """Element-wise great-circle distances in kilometres of degree arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def segment_motion(points, previous, max_speed):
+    """Distances, implied speeds and GPS jumps of consecutive fixes.
+
+    ``points`` is a list of (key, seconds, lat, lon) sorted by key then
+    time, ``previous`` maps a key to the (seconds, lat, lon) fix preceding
+    its first point. Each point is measured from the one before it; a
+    segment needing more than ``max_speed`` km/h is a GPS jump and gets no
+    distance. Returns three arrays aligned with ``points``.
+    """
+    if not points:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+    keys = [point[0] for point in points]
+    seconds = np.array([point[1] for point in points], dtype=float)
+    lats = np.array([point[2] for point in points], dtype=float)
+    lons = np.array([point[3] for point in points], dtype=float)
+    
+    prev_seconds, prev_lats, prev_lons = np.roll(seconds, 1), np.roll(lats, 1), np.roll(lons, 1)
+    has_prev = np.ones(len(points), dtype=bool)
+    for i, key in enumerate(keys):
+        if i and keys[i - 1] == key:
+            continue
+        if key in previous:
+            prev_seconds[i], prev_lats[i], prev_lons[i] = previous[key]
+        else:
+            has_prev[i] = False
+    
+    distances = np.where(has_prev, haversine_km_array(prev_lats, prev_lons, lats, lons), 0.0)
+    hours = (seconds - prev_seconds) / 3600.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speeds = np.where(hours > 0, distances / hours, np.where(distances > 0, np.inf, 0.0))
+    jumps = has_prev & (speeds > max_speed)
+    distances[jumps] = 0.0
+    speeds[jumps | ~has_prev] = 0.0
+    return distances, speeds, jumps
+
+
+def douglas_peucker(lats, lons, tolerance):
+    """Indexes of the points kept by Douglas-Peucker simplification.
+
+    ``tolerance`` is in degrees of latitude; longitudes are scaled by the
+    cosine of the mean latitude so both axes weigh the same distance.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    count = len(lats)
+    if count < 3:
+        return np.arange(count)
+    points = np.column_stack([lons * math.cos(math.radians(float(lats.mean()))), lats])
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        dx, dy = b - a
+        norm = math.hypot(dx, dy)
+        if norm:
+            distances = np.abs(dx * (inner[:, 1] - a[1]) - dy * (inner[:, 0] - a[0])) / norm
+        else:
+            distances = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            index = start + 1 + k
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return np.flatnonzero(keep)
+
+
+def encode_polyline(lats, lons, precision=5):
+    """Encode points with the Google encoded polyline algorithm"""
+    factor = 10 ** precision
+    lats = np.round(np.asarray(lats, dtype=float) * factor).astype(np.int64)
+    lons = np.round(np.asarray(lons, dtype=float) * factor).astype(np.int64)
+    deltas = np.column_stack([np.diff(lats, prepend=0), np.diff(lons, prepend=0)]).ravel()
+    chars = []
+    for value in deltas.tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return ''.join(chars)
+
+
+def geohash_encode(lat, lon, precision=7):
+    """Geohash of a point; ``precision`` 7 cells are about 150 m wide"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            bounds[0] = mid
+        else:
+            bits <<= 1
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def geohash_center(geohash):
+    """Center (lat, lon) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if bits >> shift & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def point_in_polygon(lat, lon, polygon):
+    """Ray casting test of a point against a [(lat, lon), ...] ring"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            lon_cross = (lon_j - lon_i) * (lat - lat_i) / (lat_j - lat_i) + lon_i
+            if lon < lon_cross:
+                inside = not inside
+        j = i
+    return inside
+
+
+class GeofenceIndex:
+    """Uniform grid over lat/lon buckets of geofence bounding boxes.
+
+    Each fence is registered in every cell its bounding box touches; a
+    lookup tests the exact shape of the fences of one cell only. Fences
+    covering more than ``max_cells`` cells are kept aside and always
+    tested.
+    """
+
+    def __init__(self, cell_size=0.05, max_cells=400):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.cells = {}
+        self.large = []
+        self.fences = {}
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size))
+
+    def add_circle(self, fence_id, company_id, lat, lon, radius_m):
+        dlat = radius_m / 1000.0 / EARTH_RADIUS_KM * 180 / math.pi
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        self._add(fence_id, company_id, ('circle', lat, lon, radius_m / 1000.0),
+                  (lat - dlat, lon - dlon, lat + dlat, lon + dlon))
+
+    def add_polygon(self, fence_id, company_id, polygon):
+        lats = [point[0] for point in polygon]
+        lons = [point[1] for point in polygon]
+        self._add(fence_id, company_id, ('polygon', polygon),
+                  (min(lats), min(lons), max(lats), max(lons)))
+
+    def _add(self, fence_id, company_id, shape, bbox):
+        self.fences[fence_id] = (company_id, shape, bbox)
+        min_i, min_j = self._cell(bbox[0], bbox[1])
+        max_i, max_j = self._cell(bbox[2], bbox[3])
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > self.max_cells:
+            self.large.append(fence_id)
+            return
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                self.cells.setdefault((i, j), []).append(fence_id)
+
+    def _contains(self, fence_id, lat, lon):
+        _company_id, shape, bbox = self.fences[fence_id]
+        if not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+            return False
+        if shape[0] == 'circle':
+            return haversine_km(lat, lon, shape[1], shape[2]) <= shape[3]
+        return point_in_polygon(lat, lon, shape[1])
+
+    def lookup(self, lat, lon, company_id=None):
+        """Return the set of fence ids containing the point"""
+        candidates = self.cells.get(self._cell(lat, lon), []) + self.large
+        return {
+            fence_id for fence_id in candidates
+            if (company_id is None or self.fences[fence_id][0] in (False, company_id))
+            and self._contains(fence_id, lat, lon)
+        }
@@ -0,0 +1,115 @@
+# tools/geocoder.py
+from collections import OrderedDict
+import math
+import threading
+
+import numpy as np
+
+from .geo import EARTH_RADIUS_KM
+
+# Grid cell size in degrees and largest match distance in km per place type,
+# in the order they appear in an address
+PLACE_TYPES = [
+    ('road', 0.01, 0.15),
+    ('district', 0.05, 5.0),
+    ('city', 0.5, 50.0),
+]
+
+
+class Gazetteer:
+    """Nearest-place reverse geocoder over a local list of places.
+
+    Places are (type, name, lat, lon, end_lat, end_lon) tuples; roads are
+    segments from (lat, lon) to (end_lat, end_lon), other places points.
+    Each type has its own grid so a lookup only measures the places of the
+    3x3 cells around the point. Resolved addresses are kept in a bounded
+    LRU by cache key (a geohash).
+    """
+
+    def __init__(self, places, cache_size=100000):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.layers = {}
+        for place_type, cell_size, max_km in PLACE_TYPES:
+            rows = [place for place in places if place[0] == place_type]
+            if not rows:
+                continue
+            names = [row[1] for row in rows]
+            coords = np.array([
+                [row[2], row[3],
+                 row[4] if row[4] is not None else row[2],
+                 row[5] if row[5] is not None else row[3]]
+                for row in rows
+            ], dtype=float)
+            grid = {}
+            for index, (lat1, lon1, lat2, lon2) in enumerate(coords):
+                for i in range(*self._span(lat1, lat2, cell_size)):
+                    for j in range(*self._span(lon1, lon2, cell_size)):
+                        grid.setdefault((i, j), []).append(index)
+            self.layers[place_type] = (cell_size, max_km, names, coords, grid)
+
+    @staticmethod
+    def _span(a, b, cell_size):
+        return int(math.floor(min(a, b) / cell_size)), int(math.floor(max(a, b) / cell_size)) + 1
+
+    def __bool__(self):
+        return bool(self.layers)
+
+    def _nearest(self, place_type, lat, lon):
+        cell_size, max_km, names, coords, grid = self.layers[place_type]
+        ci, cj = int(math.floor(lat / cell_size)), int(math.floor(lon / cell_size))
+        candidates = {
+            index
+            for i in (ci - 1, ci, ci + 1)
+            for j in (cj - 1, cj, cj + 1)
+            for index in grid.get((i, j), ())
+        }
+        if not candidates:
+            return None
+        candidates = np.fromiter(candidates, dtype=int)
+        # Equirectangular projection around the point, in km
+        scale = math.radians(1) * EARTH_RADIUS_KM
+        cos_lat = math.cos(math.radians(lat))
+        seg = coords[candidates]
+        ax, ay = (seg[:, 1] - lon) * scale * cos_lat, (seg[:, 0] - lat) * scale
+        bx, by = (seg[:, 3] - lon) * scale * cos_lat, (seg[:, 2] - lat) * scale
+        dx, dy = bx - ax, by - ay
+        length = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(length > 0, np.clip(-(ax * dx + ay * dy) / length, 0.0, 1.0), 0.0)
+        distances = np.hypot(ax + t * dx, ay + t * dy)
+        k = int(np.argmin(distances))
+        return names[candidates[k]] if distances[k] <= max_km else None
+
+    def resolve(self, lat, lon):
+        """Return the address of a point, '' when no place is close enough"""
+        parts = []
+        for place_type, _cell_size, _max_km in PLACE_TYPES:
+            if place_type in self.layers:
+                name = self._nearest(place_type, lat, lon)
+                if name and name not in parts:
+                    parts.append(name)
+        return ', '.join(parts)
+
+    def get_cached(self, keys):
+        """Return the cached addresses of ``keys``"""
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    found[key] = self.cache[key]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, values):
+        with self.lock:
+            for key, address in values.items():
+                self.cache[key] = address
+                self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
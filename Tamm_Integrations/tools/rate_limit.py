@@ -0,0 +1,68 @@
+# tools/rate_limit.py
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+
+import requests
+
+# Status codes worth retrying; 429 and 503 may come with a Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest Retry-After honoured, in seconds
+MAX_RETRY_AFTER = 300
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency window.
+
+    Every success grows the window by about one request per round trip,
+    every overload signal (429 or 5xx) halves it.
+    """
+
+    def __init__(self, maximum, minimum=1, initial=None):
+        self.maximum = max(maximum, minimum)
+        self.minimum = minimum
+        self.limit = float(initial or self.maximum)
+
+    @property
+    def window(self):
+        return max(self.minimum, int(self.limit))
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_overload(self):
+        self.limit = max(self.minimum, self.limit / 2.0)
+
+
+def error_status(error):
+    """HTTP status code of a failed request, None for network errors"""
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def is_retryable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return error_status(error) in RETRY_STATUSES
+
+
+def retry_after(error):
+    """Seconds asked by the Retry-After header of a failed request, or None"""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,154 @@
+# tools/route_optimizer.py
+import numpy as np
+
+from .geo import haversine_km_array
+
+# Improvement passes after which the local search stops
+MAX_PASSES = 50
+EPSILON = 1e-9
+
+
+def distance_matrix(lats, lons):
+    """Pairwise great-circle distances in kilometres"""
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    return haversine_km_array(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+
+
+def tour_length(order, matrix):
+    order = np.asarray(order)
+    return float(matrix[order[:-1], order[1:]].sum())
+
+
+def schedule(order, matrix, speed, windows=None, service=None, start_time=0.0):
+    """Arrival time (hours) at each node of ``order`` and the total lateness.
+
+    Vehicles wait for the opening of a time window; arriving after its
+    close counts as lateness.
+    """
+    time = start_time
+    arrivals = [start_time]
+    lateness = 0.0
+    for prev, node in zip(order, order[1:]):
+        time += matrix[prev, node] / speed
+        if service is not None:
+            time += service[prev]
+        if windows is not None:
+            opens, closes = windows[node]
+            time = max(time, opens)
+            lateness += max(0.0, time - closes)
+        arrivals.append(time)
+    return arrivals, lateness
+
+
+def nearest_neighbour(matrix, start, end, nodes):
+    order = [start]
+    remaining = np.asarray(nodes)
+    while len(remaining):
+        k = int(np.argmin(matrix[order[-1], remaining]))
+        order.append(int(remaining[k]))
+        remaining = np.delete(remaining, k)
+    order.append(end)
+    return np.asarray(order)
+
+
+def two_opt(order, matrix, accept):
+    """Reverse segments while it shortens the tour; both ends stay fixed"""
+    order = np.asarray(order)
+    n = len(order)
+    for _pass in range(MAX_PASSES):
+        improved = False
+        for i in range(n - 3):
+            a, b = order[i], order[i + 1]
+            js = np.arange(i + 2, n - 1)
+            c, d = order[js], order[js + 1]
+            delta = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+            k = int(np.argmin(delta))
+            if delta[k] < -EPSILON:
+                j = js[k]
+                candidate = np.concatenate([order[:i + 1], order[i + 1:j + 1][::-1], order[j + 1:]])
+                if accept(candidate, order):
+                    order = candidate
+                    improved = True
+        if not improved:
+            break
+    return order
+
+
+def or_opt(order, matrix, accept, max_segment=3):
+    """Move segments of up to ``max_segment`` nodes, possibly reversed, to
+    their cheapest position; both ends stay fixed"""
+    order = np.asarray(order)
+    n = len(order)
+    for _pass in range(MAX_PASSES):
+        improved = False
+        for length in range(1, max_segment + 1):
+            for i in range(1, n - length):
+                segment = order[i:i + length]
+                first, last = segment[0], segment[-1]
+                prev, nxt = order[i - 1], order[i + length]
+                gain = matrix[prev, first] + matrix[last, nxt] - matrix[prev, nxt]
+                rest = np.concatenate([order[:i], order[i + length:]])
+                a, b = rest[:-1], rest[1:]
+                forward = matrix[a, first] + matrix[last, b] - matrix[a, b]
+                backward = matrix[a, last] + matrix[first, b] - matrix[a, b]
+                costs = np.minimum(forward, backward)
+                k = int(np.argmin(costs))
+                if costs[k] - gain < -EPSILON:
+                    moved = segment if forward[k] <= backward[k] else segment[::-1]
+                    candidate = np.concatenate([rest[:k + 1], moved, rest[k + 1:]])
+                    if accept(candidate, order):
+                        order = candidate
+                        improved = True
+        if not improved:
+            break
+    return order
+
+
+def solve_route(lats, lons, speed, windows=None, service=None, start_time=0.0, fixed_end=True,
+                matrix=None):
+    """Order the stops of a route.
+
+    Node 0 is the start and, when ``fixed_end``, the last node is the end;
+    the others are stops. ``windows`` holds an (opens, closes) pair in hours
+    per node and ``service`` the hours spent at each node. Returns the
+    visiting order of the nodes, its length in km, the arrival times and
+    the total lateness. A precomputed distance ``matrix`` of the nodes may
+    be given.
+    """
+    if matrix is None:
+        matrix = distance_matrix(lats, lons)
+    count = len(matrix)
+    if not fixed_end:
+        # An open route ends anywhere: a free dummy end node
+        matrix = np.pad(matrix, ((0, 1), (0, 1)))
+        if windows is not None:
+            windows = np.vstack([windows, [[-np.inf, np.inf]]])
+        if service is not None:
+            service = np.append(service, 0.0)
+    end = len(matrix) - 1
+    stops = np.arange(1, end)
+    
+    def cost(order):
+        return schedule(order, matrix, speed, windows, service, start_time)[1], tour_length(order, matrix)
+    
+    candidates = [nearest_neighbour(matrix, 0, end, stops)]
+    if windows is not None:
+        by_deadline = stops[np.lexsort((windows[stops, 0], windows[stops, 1]))]
+        candidates.append(np.concatenate([[0], by_deadline, [end]]))
+    order = min(candidates, key=cost)
+    
+    def accept(candidate, current):
+        # Shorter is only better when no time window is missed by more
+        return windows is None or cost(candidate)[0] <= cost(current)[0] + EPSILON
+    
+    for _pass in range(MAX_PASSES):
+        length = tour_length(order, matrix)
+        order = or_opt(two_opt(order, matrix, accept), matrix, accept)
+        if tour_length(order, matrix) >= length - EPSILON:
+            break
+    
+    arrivals, lateness = schedule(order, matrix, speed, windows, service, start_time)
+    if not fixed_end:
+        order, arrivals = order[:-1], arrivals[:-1]
+    return [int(node) for node in order], tour_length(order, matrix[:count, :count]), arrivals, lateness
@@ -0,0 +1,92 @@
+# tools/sync_scheduler.py
+from collections import deque
+from itertools import count
+import heapq
+import time
+
+from .rate_limit import AIMDLimiter
+
+
+class SyncScheduler:
+    """Queues of the requests of one sync.
+
+    Items wait in ``pending`` until a slot of the AIMD concurrency window
+    and a rate limit token are free, then stay in ``in_flight``, keyed by
+    their future, until they complete. Items to retry wait in a heap
+    ordered by the time they may be sent again.
+
+    Tokens are taken from the shared bucket a whole window at a time and
+    spent locally. When the bucket grants none, the wait it announced is
+    kept so that the bucket is not asked again before then.
+    """
+
+    def __init__(self, items, window, clock=time.monotonic):
+        self.limiter = AIMDLimiter(window)
+        self.pending = deque(items)
+        self.delayed = []
+        self.sequence = count()
+        self.in_flight = {}
+        self.tokens = 0
+        self.tokens_at = 0.0
+        self.clock = clock
+
+    def __bool__(self):
+        return bool(self.pending or self.delayed or self.in_flight)
+
+    def _free(self):
+        return max(min(self.limiter.window - len(self.in_flight), len(self.pending)), 0)
+
+    def release_due(self):
+        """Move the retries whose delay is over back to ``pending``"""
+        now = self.clock()
+        while self.delayed and self.delayed[0][0] <= now:
+            self.pending.append(heapq.heappop(self.delayed)[2])
+
+    def wanted_tokens(self):
+        """Tokens to ask the shared bucket for, 0 when the local ones are
+        enough or the bucket's announced wait is not over"""
+        if self._free() <= self.tokens or self.clock() < self.tokens_at:
+            return 0
+        return self.limiter.window - self.tokens
+
+    def add_tokens(self, granted, wait):
+        """Keep the tokens granted by the bucket, or the wait it announced"""
+        self.tokens += granted
+        if not granted:
+            self.tokens_at = self.clock() + wait
+
+    def take(self):
+        """Pop the items that may be sent now, spending their tokens"""
+        ready = min(self._free(), self.tokens)
+        self.tokens -= ready
+        return [self.pending.popleft() for _i in range(ready)]
+
+    def start(self, future, item):
+        self.in_flight[future] = item
+
+    def finish(self, future):
+        return self.in_flight.pop(future)
+
+    def add(self, item):
+        """Queue an item behind the waiting ones"""
+        self.pending.append(item)
+    
+    def retry(self, item, delay):
+        heapq.heappush(self.delayed, (self.clock() + delay, next(self.sequence), item))
+
+    def drop_waiting(self):
+        """Remove and return the items not sent yet"""
+        items = list(self.pending) + [entry[2] for entry in self.delayed]
+        self.pending.clear()
+        self.delayed.clear()
+        return items
+
+    def timeout(self):
+        """Seconds until an item may be sent, None when none waits on time"""
+        now = self.clock()
+        waits = []
+        if self._free() and not self.tokens and self.tokens_at > now:
+            waits.append(self.tokens_at - now)
+        if self.delayed:
+            waits.append(max(self.delayed[0][0] - now, 0.0))
+        return min(waits) if waits else None
@@ -0,0 +1,59 @@
+# tools/tamm_client.py
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+
+
+class TammClient:
+    """HTTP client for the Tamm API.
+
+    Holds one pooled keep-alive ``requests.Session`` so that repeated calls
+    reuse TCP/TLS connections. The client only works on plain values and is
+    safe to share between threads; ``tamm.config`` caches one per worker
+    process (see ``tamm.config._get_tamm_client``).
+    """
+
+    def __init__(self, api_url, api_key, api_secret, pool_size=10, timeouts=None):
+        self.api_url = (api_url or '').rstrip('/')
+        self.timeouts = dict(timeouts or {})
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'X-API-Secret': api_secret,
+        })
+
+    def get(self, path, endpoint, params=None):
+        """GET ``path`` with the timeout configured for ``endpoint``"""
+        return self.session.get(
+            f'{self.api_url}{path}',
+            params=params,
+            timeout=self.timeouts.get(endpoint) or DEFAULT_TIMEOUT,
+        )
+
+    def health(self):
+        """Call the health endpoint and return the raw response"""
+        return self.get('/api/v1/health', 'health')
+
+    def fetch_vehicle_stream(self, tamm_vehicle_id, stream, params=None):
+        """Fetch one vehicle endpoint and return its decoded JSON payload"""
+        path = f'/api/v1/vehicles/{tamm_vehicle_id}/{stream}'
+        response = self.get(path, stream, params=params)
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f'{path} returned status code {response.status_code}',
+                response=response)
+        return response.json()
+
+    def close(self):
+        self.session.close()